@@ -1,13 +1,16 @@
-from flask import Flask, render_template, request, jsonify # type: ignore
+from flask import Flask, Response, render_template, request, jsonify, stream_with_context # type: ignore
 from pymongo import MongoClient # type: ignore
 import os
+import base64
+import hashlib
+import json
+from bson import json_util # type: ignore
 from dotenv import load_dotenv # type: ignore
-import requests # type: ignore
-from bs4 import BeautifulSoup as bs # type: ignore
 import math
-from rapidfuzz import fuzz, process # type: ignore
-from collections import defaultdict
-import re
+from article_fetcher import hydrate_articles, iter_hydrated
+from article_hydrator import HYDRATOR_ENABLED, ArticleHydrator
+from name_index import FuzzyIndexManager, NameIndexManager
+from response_cache import TTLCache
 
 load_dotenv()
 
@@ -23,6 +26,24 @@ mongo_db = os.getenv('mongo_db')
 client = MongoClient(f"mongodb://{mongo_user}:{mongo_password}@{mongo_host}:{mongo_port}/{mongo_db}")
 db = client[mongo_db]
 
+# Autocomplete answers from an in-process index of every profile name,
+# rebuilt in the background instead of a regex scan per keystroke
+name_index = NameIndexManager(
+    db.qid_level_tab, refresh_interval=int(os.getenv('name_index_refresh_seconds', 300))
+)
+name_index.start()
+
+# Misspelled /get_articles names; kept current from the profile change stream
+fuzzy_index = FuzzyIndexManager(
+    db.qid_level_tab, refresh_interval=int(os.getenv('name_index_refresh_seconds', 300))
+)
+fuzzy_index.start()
+
+# Stores each article's WebUrl/Title in item_level_tab so views stop refetching it
+if HYDRATOR_ENABLED:
+    article_hydrator = ArticleHydrator(db.item_level_tab)
+    article_hydrator.start()
+
 @app.route('/')
 def search_page():
     return render_template('search.html')
@@ -37,24 +58,8 @@ def search_names():
     if not query:
         return jsonify([])
     
-    matches = db.qid_level_tab.find(
-        {"$or": [
-            {"data.FB_name": {"$regex": f"^{query}", "$options": "i"}},  # Match from start
-            {"data.aka": {"$regex": f"^{query}", "$options": "i"}},  # Match from start
-            {"data.OI_name": {"$regex": f"^{query}", "$options": "i"}}
-        ]},
-        {"data.FB_name": 1, "data.OI_name": 1, "_id": 0}
-    )
-    
-    names = set()
-    for doc in matches:
-        if "data" in doc:
-            if "FB_name" in doc["data"]:
-                names.add(doc["data"]["FB_name"])
-            if "OI_name" in doc["data"]:
-                names.add(doc["data"]["OI_name"])
-    
-    return jsonify(list(names))
+    limit = max(1, min(request.args.get('limit', 10, type=int), 50))
+    return jsonify(name_index.current().search(query, limit))
 
 def sanitize_data(data):
     if isinstance(data, dict):
@@ -65,104 +70,202 @@ def sanitize_data(data):
         return ""
     return data
     
-def normalize(text):
-    text = text.lower()
-    text = re.sub(r'[^\w\s]', '', text)
-    text = re.sub(r'\s+', ' ', text)     # collapse multiple spaces
-    text = re.sub(r'(.)\1+', r'\1', text)  # reduce repeated letters: rahmaan → rahman
-    return text.strip()
+# name -> QID, and (QID, limit, after) -> rendered /get_articles response
+RESPONSE_CACHE_TTL = int(os.getenv('response_cache_ttl', 300))
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv('response_cache_max_entries', 1000))
+qid_cache = TTLCache(RESPONSE_CACHE_TTL, RESPONSE_CACHE_MAX_ENTRIES * 4)
+response_cache = TTLCache(RESPONSE_CACHE_TTL, RESPONSE_CACHE_MAX_ENTRIES)
+
+MAX_PAGE_SIZE = 500
+ARTICLE_FIELDS = {"_id": 1, "domain": 1, "publish_date": 1, "article_url": 1, "web_url": 1, "title": 1}
+
+class BadRequest(ValueError):
+    pass
+
+def encode_cursor(article):
+    position = json_util.dumps([article.get("publish_date"), article["_id"]])
+    return base64.urlsafe_b64encode(position.encode("utf-8")).decode("ascii")
+
+def decode_cursor(cursor):
+    try:
+        publish_date, article_id = json_util.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except Exception:
+        raise BadRequest("Invalid after cursor")
+    return publish_date, article_id
+
+def page_args():
+    """``(limit, after)`` of the request; limit None means every article."""
+    limit = request.args.get('limit', type=int)
+    if limit is not None:
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+    after = request.args.get('after') or None
+    if after is not None and limit is None:
+        raise BadRequest("after requires limit")
+    return limit, after
+
+def name_match(name):
+    return {"$or": [{"data.FB_name": name}, {"data.OI_name": name}, {"data.aka": name}]}
+
+def profile_pipeline(match, limit=None, after=None):
+    """Profile plus one page of its articles, newest first, in one round trip."""
+    same_qid = {"$eq": ["$qid", "$$qid"]}
+    article_match = {"$expr": same_qid}
+    if after is not None:
+        publish_date, article_id = decode_cursor(after)
+        # Compared as expressions, which order across BSON types like $sort
+        # does, so articles with a null or missing date (sorted last) and
+        # dates of another type are still reached; a query-language $lt
+        # would only match dates
+        date = {"$ifNull": ["$publish_date", None]}
+        article_match["$expr"] = {"$and": [same_qid, {"$or": [
+            {"$lt": [date, publish_date]},
+            {"$and": [{"$eq": [date, publish_date]}, {"$lt": ["$_id", article_id]}]},
+        ]}]}
+    article_stages = [{"$match": article_match}, {"$sort": {"publish_date": -1, "_id": -1}}]
+    if limit is not None:
+        # One extra tells whether there is a next page
+        article_stages.append({"$limit": limit + 1})
+    article_stages.append({"$project": ARTICLE_FIELDS})
+    return [
+        {"$match": match},
+        {"$limit": 1},
+        {"$project": {"data.FB_id": 0, "data.OI_id": 0}},
+        {"$lookup": {
+            "from": "item_level_tab",
+            "let": {"qid": "$_id"},
+            "pipeline": article_stages,
+            "as": "articles",
+        }},
+    ]
+
+def load_profile(name, limit=None, after=None):
+    """``(qid, payload)`` for an exact name match, else ``(None, None)``.
+
+    ``payload`` holds the sanitized profile, the page of articles and, when
+    paginating, the ``next_cursor`` (None on the last page). Articles the
+    background hydrator has reached carry their title and web URL (as
+    ``article_url``); the rest still need a live fetch.
+    """
+    qid = qid_cache.get(name)
+    match = {"_id": qid} if qid is not None else name_match(name)
+    docs = list(db.qid_level_tab.aggregate(profile_pipeline(match, limit, after)))
+    if not docs:
+        return None, None
+
+    qid_details = docs[0]
+    qid = qid_details.pop("_id")
+    articles = qid_details.pop("articles")
+    qid_cache.set(name, qid)
+
+    for article in articles:
+        web_url = article.pop("web_url", None)
+        if web_url is not None:
+            article["article_url"] = web_url
 
+    payload = {"qid_details": sanitize_data(qid_details), "articles": articles}
+    if limit is not None:
+        payload["next_cursor"] = encode_cursor(articles[limit - 1]) if len(articles) > limit else None
+        del articles[limit:]
+    return qid, payload
+
+def not_found_response(name):
+    # "Did you mean" from the long-lived fuzzy index of every profile name
+    suggestions = fuzzy_index.current().suggest(name)
+
+    if suggestions:
+        return jsonify({
+            "error": "No exact match found",
+            "did_you_mean": suggestions
+        }), 200
+    else:
+        return jsonify({"error": "No match found"}), 404
+
+def cache_response(key, payload):
+    body = app.json.dumps(payload)
+    entry = {"payload": payload, "body": body, "etag": hashlib.sha1(body.encode("utf-8")).hexdigest()}
+    response_cache.set(key, entry)
+    return entry
+
+def cached_entry(name, limit, after):
+    qid = qid_cache.get(name)
+    return None if qid is None else response_cache.get((qid, limit, after))
+
+def conditional(response, entry):
+    """Tag ``response`` with the entry's ETag; 304 if the client already has it."""
+    if request.if_none_match.contains(entry["etag"]):
+        response = app.response_class(status=304)
+    response.set_etag(entry["etag"])
+    # Let browsers keep the body but revalidate it on every visit
+    response.headers["Cache-Control"] = "no-cache"
+    return response
 
 @app.route('/get_articles', methods=['GET'])
 def get_articles():
     name = request.args.get('name', '').strip()
     if not name:
         return jsonify({"error": "No name provided"}), 400
+    try:
+        limit, after = page_args()
 
-    # Step 1: Direct match lookup
-    qid_doc = db.qid_level_tab.find_one(
-        {"$or": [{"data.FB_name": name}, {"data.OI_name": name}, {"data.aka": name}]}
-    )
-
-    if not qid_doc:
-        # Step 2: Build name map (for reverse mapping aka → FB/OI)
-        all_names_cursor = db.qid_level_tab.find({}, {"data.FB_name": 1, "data.OI_name": 1, "data.aka": 1})
-        
-        name_map = defaultdict(set)
-        normalized_name_map = {}  # key: normalized name, value: original name(s)
-
-        for doc in all_names_cursor:
-            fb = doc["data"].get("FB_name")
-            oi = doc["data"].get("OI_name")
-            akas = doc["data"].get("aka", [])
-
-            if isinstance(akas, str):
-                akas = [akas]
-
-            canonical_name = fb or oi
-            for n in filter(None, [fb, oi] + akas):
-                name_map[n].add(canonical_name)
-                normalized = normalize(n)
-                normalized_name_map[normalized] = n
-        
-       
-        normalized_input = normalize(name)
-        matches = process.extract(
-            normalized_input,
-            list(normalized_name_map.keys()),
-            scorer=fuzz.token_set_ratio,
-            limit=5
-        )
-        
-        suggestions = []
-        for norm_key, score, _ in matches:
-            if score >= 60:
-                original_name = normalized_name_map[norm_key]
-                for canonical in name_map[original_name]:
-                    if canonical not in suggestions:
-                        suggestions.append(canonical)
-            if len(suggestions) >= 3:
-                break
-
-        if suggestions:
-            return jsonify({
-                "error": "No exact match found",
-                "did_you_mean": suggestions
-            }), 200
-        else:
-            return jsonify({"error": "No match found"}), 404
-
-    # Step 4: Get QID
-    qid = qid_doc["_id"]
-
-    # Step 5: Fetch articles
-    articles = list(db.item_level_tab.find(
-        {"qid": qid},
-        {"_id": 1, "domain": 1, "publish_date": 1, "article_url": 1}
-    ))
-
-    # Step 6: Get profile data
-    qid_details = db.qid_level_tab.find_one(
-        {"_id": qid},
-        {"data.FB_id": 0, "data.OI_id": 0, "_id": 0}
-    )
-
-    qid_details = sanitize_data(qid_details)
-
-    # Step 7: Parse article URLs
-    for article in articles:
-        if "article_url" in article:
-            try:
-                response = requests.get(article["article_url"])
-                response.encoding = "utf-8"
-                if response.status_code == 200:
-                    soup = bs(response.text, "xml")
-                    article["article_url"] = soup.find("WebUrl").text if soup.find("WebUrl") else "No WebLink found"
-                    article["title"] = soup.find("Title").text if soup.find("Title") else "No Title found"
-            except Exception as e:
-                print(f"Error fetching article: {e}")
-
-    return jsonify({"qid_details": qid_details, "articles": articles})
+        # A hot profile is answered without touching Mongo
+        entry = cached_entry(name, limit, after)
+        if entry is None:
+            qid, payload = load_profile(name, limit, after)
+            if qid is None:
+                return not_found_response(name)
+
+            # Live-fetch WebUrl/Title of articles not yet hydrated, concurrently on the shared pool
+            hydrate_articles(payload["articles"])
+            entry = cache_response((qid, limit, after), payload)
+    except BadRequest as e:
+        return jsonify({"error": str(e)}), 400
+
+    return conditional(app.response_class(entry["body"], mimetype="application/json"), entry)
+
+def ndjson_line(payload):
+    return json.dumps(payload, default=str) + "\n"
+
+@app.route('/get_articles/stream', methods=['GET'])
+def get_articles_stream():
+    """/get_articles as NDJSON: the profile first, then each article as it resolves.
+
+    Lines are ``{"qid_details": ..., "total": n}`` (plus ``next_cursor``
+    with ``limit``), then ``{"index": i, "article": {...}}`` in completion
+    order, then ``{"done": true}``. A cached profile is replayed in order
+    with its ETag; a live one is cached once its last article resolves.
+    Lookup failures answer the same JSON as /get_articles.
+    """
+    name = request.args.get('name', '').strip()
+    if not name:
+        return jsonify({"error": "No name provided"}), 400
+    try:
+        limit, after = page_args()
+        entry = cached_entry(name, limit, after)
+        if entry is None:
+            qid, payload = load_profile(name, limit, after)
+            if qid is None:
+                return not_found_response(name)
+    except BadRequest as e:
+        return jsonify({"error": str(e)}), 400
+
+    def generate(payload, articles):
+        header = {"qid_details": payload["qid_details"], "total": len(payload["articles"])}
+        if "next_cursor" in payload:
+            header["next_cursor"] = payload["next_cursor"]
+        yield ndjson_line(header)
+        for index, article in articles:
+            yield ndjson_line({"index": index, "article": article})
+        yield ndjson_line({"done": True})
+
+    def generate_live():
+        yield from generate(payload, iter_hydrated(payload["articles"]))
+        cache_response((qid, limit, after), payload)
+
+    headers = {"X-Accel-Buffering": "no"}
+    if entry is not None:
+        lines = generate(entry["payload"], enumerate(entry["payload"]["articles"]))
+        return conditional(Response(lines, mimetype="application/x-ndjson", headers=headers), entry)
+    return Response(stream_with_context(generate_live()), mimetype="application/x-ndjson", headers=headers)
 
 
 if __name__ == '__main__':
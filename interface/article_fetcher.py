@@ -0,0 +1,119 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import requests # type: ignore
+from requests.adapters import HTTPAdapter # type: ignore
+from bs4 import BeautifulSoup as bs # type: ignore
+from dotenv import load_dotenv # type: ignore
+from http_cache import HTTPCache
+
+load_dotenv()
+
+# Shared by every request: at most this many article XML fetches in flight
+HYDRATION_WORKERS = int(os.getenv('hydration_workers', 16))
+# (connect, read) seconds for one article XML
+FETCH_TIMEOUT = (
+    float(os.getenv('article_connect_timeout', 3)),
+    float(os.getenv('article_read_timeout', 5)),
+)
+
+# Article XML on disk, revalidated with ETag/Last-Modified; may be the producer's http_cache.db
+HTTP_CACHE_PATH = os.getenv('http_cache_path', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'http_cache.db'))
+HTTP_CACHE_MAX_MB = int(os.getenv('http_cache_max_mb', 256))
+# Seconds an article XML without validators or Cache-Control is reused
+HTTP_CACHE_TTL = int(os.getenv('http_cache_ttl', 24 * 3600))
+
+NO_WEBLINK = "No WebLink found"
+NO_TITLE = "No Title found"
+
+_session = None
+_session_lock = threading.Lock()
+executor = ThreadPoolExecutor(max_workers=HYDRATION_WORKERS, thread_name_prefix="hydrate")
+http_cache = HTTPCache(HTTP_CACHE_PATH, max_bytes=HTTP_CACHE_MAX_MB * 2**20, default_ttl=HTTP_CACHE_TTL)
+
+
+def get_session():
+    """Keep-alive session whose pool holds a connection per hydration worker."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=8, pool_maxsize=HYDRATION_WORKERS)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                _session = session
+    return _session
+
+
+def parse_article_xml(text):
+    """(WebUrl, Title) of an article detail XML."""
+    soup = bs(text, "xml")
+    web_url = soup.find("WebUrl")
+    title = soup.find("Title")
+    return (
+        web_url.text if web_url else NO_WEBLINK,
+        title.text if title else NO_TITLE,
+    )
+
+
+def fetch_article_details(url):
+    """(WebUrl, Title) for an article XML URL, or None if it could not be fetched.
+
+    Served from ``http_cache`` while fresh; a stale copy is revalidated.
+    """
+    try:
+        entry = http_cache.lookup(url)
+        if entry is not None and entry.fresh:
+            body = entry.body
+        else:
+            response = get_session().get(url, timeout=FETCH_TIMEOUT, headers=http_cache.validators(entry))
+            if response.status_code == 304 and entry is not None:
+                body = http_cache.revalidated(url, response.headers, entry)
+            elif response.status_code == 200:
+                body = response.content
+                http_cache.store(url, response.headers, body)
+            else:
+                return None
+        return parse_article_xml(body.decode("utf-8", "replace"))
+    except Exception as e:
+        print(f"Error fetching article {url}: {e}")
+        return None
+
+
+def apply_details(article, details):
+    if details is None:
+        # Keep the XML link; the page still needs a title to render
+        article.setdefault("title", NO_TITLE)
+    else:
+        article["article_url"], article["title"] = details
+    return article
+
+
+def iter_hydrated(articles):
+    """Yield ``(index, article)`` for each article as its details resolve.
+
+    Articles that already have a title (stored by the background hydrator)
+    or have no ``article_url`` are yielded first, without a fetch.
+    """
+    futures = {}
+    for index, article in enumerate(articles):
+        if "article_url" in article and "title" not in article:
+            futures[executor.submit(fetch_article_details, article["article_url"])] = index
+        else:
+            yield index, apply_details(article, None)
+    try:
+        for future in as_completed(futures):
+            index = futures[future]
+            yield index, apply_details(articles[index], future.result())
+    finally:
+        # The client went away: drop fetches that have not started
+        for future in futures:
+            future.cancel()
+
+
+def hydrate_articles(articles):
+    """Fill in WebUrl/Title of the articles that lack them, concurrently; returns ``articles``."""
+    for _ in iter_hydrated(articles):
+        pass
+    return articles
@@ -0,0 +1,123 @@
+"""Background backfill of article titles and web URLs into item_level_tab.
+
+An article's WebUrl and Title never change after publication, so instead of
+fetching its XML on every profile view they are fetched once and stored on
+the item_level_tab document as ``web_url`` and ``title``. ``ArticleHydrator``
+walks the collection in ``_id`` order, fetches the documents still missing
+them with bounded concurrency and writes each batch back with one
+``bulk_write``. The app runs it on a daemon thread; for a one-off backfill:
+
+    python article_hydrator.py
+"""
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pymongo import UpdateOne # type: ignore
+from dotenv import load_dotenv # type: ignore
+from article_fetcher import fetch_article_details
+
+load_dotenv()
+
+HYDRATOR_ENABLED = os.getenv('article_hydrator_enabled', 'true').lower() == 'true'
+HYDRATOR_CONCURRENCY = int(os.getenv('article_hydrator_concurrency', 8))
+HYDRATOR_BATCH_SIZE = int(os.getenv('article_hydrator_batch_size', 200))
+# Seconds between sweeps once every document has been tried
+HYDRATOR_INTERVAL = int(os.getenv('article_hydrator_interval', 300))
+# Failed fetches before a document is left for live fetching only
+HYDRATOR_MAX_ATTEMPTS = int(os.getenv('article_hydrator_max_attempts', 3))
+
+
+def missing_details_filter(max_attempts=HYDRATOR_MAX_ATTEMPTS):
+    return {
+        "article_url": {"$exists": True},
+        "web_url": {"$exists": False},
+        "hydration_attempts": {"$not": {"$gte": max_attempts}},
+    }
+
+
+class ArticleHydrator:
+    def __init__(
+        self,
+        collection,
+        fetch=fetch_article_details,
+        concurrency=HYDRATOR_CONCURRENCY,
+        batch_size=HYDRATOR_BATCH_SIZE,
+        interval=HYDRATOR_INTERVAL,
+        max_attempts=HYDRATOR_MAX_ATTEMPTS,
+    ):
+        self.collection = collection
+        self.fetch = fetch
+        self.batch_size = batch_size
+        self.interval = interval
+        self.max_attempts = max_attempts
+        # Separate from the request-time pool so a backfill never delays a page
+        self.executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="hydrator")
+        self.hydrated = 0
+        self.failed = 0
+        self._thread = None
+        self._stop = threading.Event()
+
+    def run_batch(self, after_id=None):
+        """Hydrate the next batch after ``after_id``; returns its last ``_id`` or None when done."""
+        query = missing_details_filter(self.max_attempts)
+        if after_id is not None:
+            query["_id"] = {"$gt": after_id}
+        docs = list(
+            self.collection.find(query, {"article_url": 1}).sort("_id", 1).limit(self.batch_size)
+        )
+        if not docs:
+            return None
+
+        details = self.executor.map(self.fetch, [doc["article_url"] for doc in docs])
+        updates = []
+        for doc, result in zip(docs, details):
+            if result is None:
+                self.failed += 1
+                updates.append(UpdateOne({"_id": doc["_id"]}, {"$inc": {"hydration_attempts": 1}}))
+            else:
+                self.hydrated += 1
+                web_url, title = result
+                updates.append(UpdateOne(
+                    {"_id": doc["_id"]},
+                    {"$set": {"web_url": web_url, "title": title}, "$unset": {"hydration_attempts": ""}},
+                ))
+        self.collection.bulk_write(updates, ordered=False)
+        return docs[-1]["_id"]
+
+    def sweep(self):
+        """One pass over every document missing its details."""
+        after_id = None
+        while not self._stop.is_set():
+            after_id = self.run_batch(after_id)
+            if after_id is None:
+                break
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.sweep()
+            except Exception as e:
+                print(f"Article hydration sweep failed: {e}")
+            self._stop.wait(self.interval)
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+
+if __name__ == '__main__':
+    from pymongo import MongoClient # type: ignore
+
+    client = MongoClient(
+        f"mongodb://{os.getenv('mongo_user')}:{os.getenv('mongo_password')}@"
+        f"{os.getenv('mongo_host')}:{os.getenv('mongo_port')}/{os.getenv('mongo_db')}"
+    )
+    hydrator = ArticleHydrator(client[os.getenv('mongo_db')].item_level_tab)
+    start = time.perf_counter()
+    hydrator.sweep()
+    print(f"Hydrated {hydrator.hydrated} articles ({hydrator.failed} failed) in {time.perf_counter() - start:.1f}s")
@@ -0,0 +1,99 @@
+"""Article hydrator against a stand-in article XML server.
+
+Starts a local HTTP server that serves oneindia-style article XML (with
+--latency-ms per response; every --fail-every'th article answers 404),
+seeds ``item_level_tab`` in mongomock (or a scratch mongod with
+--mongo-uri; the collection is dropped first) with --articles documents
+pointing at it, runs one ``ArticleHydrator.sweep`` and checks that every
+served article got its stored ``web_url``/``title`` and every failing one
+a ``hydration_attempts`` count. Run from interface/:
+
+    python -m benchmarks.hydration_benchmark --articles 2000 --concurrency 8
+"""
+import argparse
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from article_hydrator import ArticleHydrator
+
+ARTICLE_XML = """<?xml version="1.0" encoding="UTF-8"?>
+<Items><Item><ContentId>{id}</ContentId><Title>Article {id} title</Title>
+<WebUrl>https://www.example.com/news/article-{id}.html</WebUrl>
+<Content>&lt;p&gt;Body of article {id}.&lt;/p&gt;</Content></Item></Items>"""
+
+
+def start_article_server(latency, fail_every):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            article_id = int(self.path.rstrip("/").rsplit("/", 1)[-1])
+            time.sleep(latency)
+            if fail_every and article_id % fail_every == 0:
+                self.send_response(404)
+                self.end_headers()
+                return
+            body = ARTICLE_XML.format(id=article_id).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/xml")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--articles", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--batch-size", type=int, default=200)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--fail-every", type=int, default=50)
+    parser.add_argument("--mongo-uri", help="real mongod to seed instead of mongomock")
+    args = parser.parse_args()
+
+    server, base_url = start_article_server(args.latency_ms / 1000, args.fail_every)
+    if args.mongo_uri:
+        from pymongo import MongoClient  # type: ignore
+        collection = MongoClient(args.mongo_uri).get_default_database()["item_level_tab"]
+    else:
+        import mongomock  # type: ignore
+        collection = mongomock.MongoClient()["bench"]["item_level_tab"]
+    collection.drop()
+    collection.insert_many([
+        {"_id": i, "qid": f"Q{i % 100}", "domain": "example", "publish_date": "2024-01-01",
+         "article_url": f"{base_url}/article/{i}"}
+        for i in range(1, args.articles + 1)
+    ])
+
+    hydrator = ArticleHydrator(collection, concurrency=args.concurrency, batch_size=args.batch_size)
+    start = time.perf_counter()
+    hydrator.sweep()
+    elapsed = time.perf_counter() - start
+    server.shutdown()
+
+    wrong = 0
+    for doc in collection.find({}):
+        failing = args.fail_every and doc["_id"] % args.fail_every == 0
+        if failing:
+            wrong += doc.get("hydration_attempts") != 1 or "web_url" in doc
+        else:
+            wrong += (
+                doc.get("web_url") != f"https://www.example.com/news/article-{doc['_id']}.html"
+                or doc.get("title") != f"Article {doc['_id']} title"
+            )
+    print(
+        f"{hydrator.hydrated} hydrated, {hydrator.failed} failed in {elapsed:.2f}s "
+        f"({args.articles / elapsed:.0f} articles/s at concurrency {args.concurrency})"
+    )
+    if wrong:
+        raise SystemExit(f"{wrong} documents have wrong stored details")
+    print("stored details: ok")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+"""Name lookup cost: per-request Mongo scans vs the in-process indexes.
+
+Seeds ``qid_level_tab`` with --profiles synthetic personalities (FB_name,
+OI_name and a few aka values each) in mongomock, or in a real mongod with
+--mongo-uri (the collection is dropped first, so point it at a scratch
+database). Then times, on the same inputs:
+
+- /search_names: the old case-insensitive ``$regex`` query against
+  ``PrefixIndex.search`` for typed prefixes;
+- the /get_articles "did you mean" fallback: rebuilding the normalized name
+  maps and running ``process.extract`` over all of them (without the
+  collection read) against ``FuzzyNameIndex.suggest`` for misspelled names,
+  and how often the two share a suggestion.
+
+Run from interface/:
+
+    python -m benchmarks.name_index_benchmark --profiles 200000
+    python -m benchmarks.name_index_benchmark --mongo-uri mongodb://localhost:27017/bench
+    python -m benchmarks.name_index_benchmark --no-mongo   # index only
+"""
+import argparse
+import random
+import re
+import time
+from collections import defaultdict
+from rapidfuzz import fuzz, process  # type: ignore
+from name_index import FuzzyNameIndex, PrefixIndex, normalize
+
+FIRST_NAMES = [
+    "Aarav", "Abhishek", "Aditi", "Aishwarya", "Ajay", "Akshay", "Alia", "Amitabh", "Anil", "Anushka",
+    "Arjun", "Ayushmann", "Deepika", "Dhanush", "Farhan", "Hrithik", "Jasprit", "Kajol", "Kareena", "Kartik",
+    "Katrina", "Kiara", "Madhuri", "Mahesh", "Mohanlal", "Nayanthara", "Priyanka", "Rahul", "Rajinikanth", "Ranbir",
+    "Ranveer", "Rashmika", "Ravi", "Rohit", "Salman", "Samantha", "Sanjay", "Shah Rukh", "Shahid", "Shraddha",
+    "Shreya", "Smriti", "Sonam", "Sunil", "Suriya", "Taapsee", "Tiger", "Varun", "Vicky", "Virat", "Vijay", "Yash",
+]
+LAST_NAMES = [
+    "Agarwal", "Bachchan", "Bhatt", "Chopra", "Dhawan", "Dixit", "Gandhi", "Iyer", "Joshi", "Kapoor",
+    "Kaif", "Khan", "Khanna", "Kohli", "Kumar", "Menon", "Mehta", "Nair", "Padukone", "Pandey",
+    "Patel", "Prabhu", "Rao", "Reddy", "Roshan", "Shetty", "Sharma", "Singh", "Sinha", "Tendulkar",
+]
+
+
+def synthetic_profiles(n, seed=5):
+    rng = random.Random(seed)
+    docs = []
+    for i in range(n):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        fb_name = f"{first} {last}" if i < len(FIRST_NAMES) * len(LAST_NAMES) else f"{first} {last} {i}"
+        oi_name = fb_name if rng.random() < 0.7 else f"{first[0]}. {last} {i}"
+        akas = [f"{first}{rng.randint(1, 99)}", f"{last} {rng.choice(['Ji', 'Sir', 'Bhai'])}"][: rng.randint(0, 2)]
+        docs.append({"_id": f"Q{i}", "data": {"FB_name": fb_name, "OI_name": oi_name, "aka": akas}})
+    return docs
+
+
+def typed_prefixes(docs, n, seed=9):
+    """Prefixes of 2-8 characters of random profile names, as a user types them."""
+    rng = random.Random(seed)
+    prefixes = []
+    for doc in rng.sample(docs, min(n, len(docs))):
+        name = doc["data"]["FB_name"]
+        prefixes.append(name[: rng.randint(2, min(8, len(name)))])
+    return prefixes
+
+
+def misspelled(docs, n, seed=13):
+    """Profile names with one character dropped, doubled or swapped."""
+    rng = random.Random(seed)
+    names = []
+    for doc in rng.sample(docs, min(n, len(docs))):
+        name = rng.choice([doc["data"]["FB_name"]] + doc["data"]["aka"])
+        i = rng.randrange(len(name) - 1)
+        edit = rng.choice(["drop", "double", "swap"])
+        if edit == "drop":
+            name = name[:i] + name[i + 1:]
+        elif edit == "double":
+            name = name[:i] + name[i] + name[i:]
+        else:
+            name = name[:i] + name[i + 1] + name[i] + name[i + 2:]
+        names.append(name)
+    return names
+
+
+def scan_suggest(docs, name):
+    # The fallback /get_articles ran before the index, minus the Mongo read
+    name_map = defaultdict(set)
+    normalized_name_map = {}
+    for doc in docs:
+        fb = doc["data"].get("FB_name")
+        oi = doc["data"].get("OI_name")
+        akas = doc["data"].get("aka", [])
+        if isinstance(akas, str):
+            akas = [akas]
+        canonical_name = fb or oi
+        for n in filter(None, [fb, oi] + akas):
+            name_map[n].add(canonical_name)
+            normalized_name_map[normalize(n)] = n
+    matches = process.extract(normalize(name), list(normalized_name_map.keys()), scorer=fuzz.token_set_ratio, limit=5)
+    suggestions = []
+    for norm_key, score, _ in matches:
+        if score >= 60:
+            for canonical in name_map[normalized_name_map[norm_key]]:
+                if canonical not in suggestions:
+                    suggestions.append(canonical)
+        if len(suggestions) >= 3:
+            break
+    return suggestions
+
+
+def regex_search(collection, query):
+    # The query /search_names ran before the index
+    matches = collection.find(
+        {"$or": [
+            {"data.FB_name": {"$regex": f"^{re.escape(query)}", "$options": "i"}},
+            {"data.aka": {"$regex": f"^{re.escape(query)}", "$options": "i"}},
+            {"data.OI_name": {"$regex": f"^{re.escape(query)}", "$options": "i"}},
+        ]},
+        {"data.FB_name": 1, "data.OI_name": 1, "_id": 0},
+    )
+    names = set()
+    for doc in matches:
+        names.update(n for n in (doc["data"].get("FB_name"), doc["data"].get("OI_name")) if n)
+    return names
+
+
+def timings(func, queries):
+    samples = []
+    for query in queries:
+        start = time.perf_counter()
+        func(query)
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+    return {
+        "p50_us": samples[len(samples) // 2] * 1e6,
+        "p95_us": samples[int(len(samples) * 0.95)] * 1e6,
+        "mean_us": sum(samples) / len(samples) * 1e6,
+    }
+
+
+def report(label, stats):
+    print(f"{label:<28} p50 {stats['p50_us']:>12.1f} us   p95 {stats['p95_us']:>12.1f} us   mean {stats['mean_us']:>12.1f} us")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--profiles", type=int, default=200000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--regex-queries", type=int, default=20, help="the scan is slow; time fewer")
+    parser.add_argument("--fuzzy-queries", type=int, default=200)
+    parser.add_argument("--scan-queries", type=int, default=5, help="the old fallback is slow; time fewer")
+    parser.add_argument("--mongo-uri", help="real mongod to seed instead of mongomock")
+    parser.add_argument("--no-mongo", action="store_true", help="skip the regex baseline")
+    args = parser.parse_args()
+
+    docs = synthetic_profiles(args.profiles)
+    queries = typed_prefixes(docs, args.queries)
+
+    start = time.perf_counter()
+    index = PrefixIndex(docs)
+    print(f"{args.profiles} profiles, {len(index)} names, index built in {time.perf_counter() - start:.2f}s")
+    report("PrefixIndex.search", timings(lambda q: index.search(q, 10), queries))
+
+    typos = misspelled(docs, args.fuzzy_queries)
+    start = time.perf_counter()
+    fuzzy = FuzzyNameIndex(docs)
+    print(f"{len(fuzzy)} normalized names, fuzzy index built in {time.perf_counter() - start:.2f}s")
+    report("FuzzyNameIndex.suggest", timings(fuzzy.suggest, typos))
+    scanned = typos[: args.scan_queries]
+    report("rebuild + extract (old)", timings(lambda q: scan_suggest(docs, q), scanned))
+    # Names with equal scores can come back in a different order
+    overlapping = sum(bool(set(fuzzy.suggest(q)) & set(scan_suggest(docs, q))) for q in scanned)
+    print(f"suggestions shared with the old fallback: {overlapping}/{len(scanned)} queries")
+
+    if args.no_mongo:
+        return
+    if args.mongo_uri:
+        from pymongo import MongoClient  # type: ignore
+        client = MongoClient(args.mongo_uri)
+        collection = client.get_default_database()["qid_level_tab"]
+    else:
+        import mongomock  # type: ignore
+        collection = mongomock.MongoClient()["bench"]["qid_level_tab"]
+    collection.drop()
+    collection.insert_many([dict(doc) for doc in docs])
+    report("$regex scan (old)", timings(lambda q: regex_search(collection, q), queries[: args.regex_queries]))
+
+
+if __name__ == "__main__":
+    main()
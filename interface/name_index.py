@@ -0,0 +1,368 @@
+import heapq
+from array import array
+from collections import defaultdict
+import re
+import threading
+import time
+from bisect import bisect_left
+import numpy as np  # type: ignore
+from rapidfuzz import fuzz, process  # type: ignore
+
+# Sorts after every character a normalized name can contain
+PREFIX_END = "\U0010ffff"
+
+
+def normalize(text):
+    text = text.lower()
+    text = re.sub(r'[^\w\s]', '', text)
+    text = re.sub(r'\s+', ' ', text)     # collapse multiple spaces
+    text = re.sub(r'(.)\1+', r'\1', text)  # reduce repeated letters: rahmaan → rahman
+    return text.strip()
+
+
+def normalize_prefix(text):
+    """Case- and spacing-insensitive form used for prefix matching."""
+    return re.sub(r"\s+", " ", text).strip().casefold()
+
+
+def profile_names(doc):
+    """(FB_name, OI_name, aka list) of a qid_level_tab document."""
+    data = doc.get("data") or {}
+    akas = data.get("aka") or []
+    if isinstance(akas, str):
+        akas = [akas]
+    return data.get("FB_name"), data.get("OI_name"), [a for a in akas if isinstance(a, str)]
+
+
+class PrefixIndex:
+    """Sorted array of normalized FB_name/OI_name/aka values.
+
+    Each entry points at the canonical names (FB_name and OI_name) of its
+    profile. A query is a binary search for the block of keys starting with
+    the prefix; results are ranked by (alias?, name length, name) so the
+    shortest primary names come first. Ranked results of every prefix whose
+    block is larger than ``max_block`` are precomputed, so a query never
+    ranks more than ``max_block`` entries.
+    """
+
+    def __init__(self, docs, max_block=128, precomputed_limit=50):
+        entries = []
+        for doc in docs:
+            fb, oi, akas = profile_names(doc)
+            canonical = tuple(dict.fromkeys(n for n in (fb, oi) if isinstance(n, str) and n))
+            if not canonical:
+                continue
+            for name, is_alias in [(fb, False), (oi, False)] + [(a, True) for a in akas]:
+                if isinstance(name, str) and name.strip():
+                    key = normalize_prefix(name)
+                    entries.append((key, (is_alias, len(key), key), canonical))
+        entries.sort(key=lambda entry: entry[0])
+
+        self.keys = [key for key, _, _ in entries]
+        self.ranks = [rank for _, rank, _ in entries]
+        self.canonical = [canonical for _, _, canonical in entries]
+        self.precomputed_limit = precomputed_limit
+        self._top = {}
+        # Walk down from the empty prefix one character at a time, only into
+        # large blocks; positions stay in rank order as they are split
+        ranked_positions = sorted(range(len(self.keys)), key=self.ranks.__getitem__)
+        large = [("", ranked_positions)]
+        while large:
+            prefix, positions = large.pop()
+            depth = len(prefix) + 1
+            children = defaultdict(list)
+            for position in positions:
+                key = self.keys[position]
+                if len(key) >= depth:
+                    children[key[:depth]].append(position)
+            for child, child_positions in children.items():
+                if len(child_positions) > max_block:
+                    self._top[child] = self._names(child_positions, precomputed_limit)
+                    large.append((child, child_positions))
+
+    def __len__(self):
+        return len(self.keys)
+
+    def _block(self, prefix):
+        """Positions ``[start, end)`` of the keys starting with ``prefix``."""
+        start = bisect_left(self.keys, prefix)
+        return start, bisect_left(self.keys, prefix + PREFIX_END, lo=start)
+
+    def _ranked(self, prefix, limit):
+        start, end = self._block(prefix)
+        # Several entries of one profile can share the block; widen until enough names
+        count = limit
+        while True:
+            names = self._names(heapq.nsmallest(count, range(start, end), key=self.ranks.__getitem__), limit)
+            if len(names) >= limit or count >= end - start:
+                return names
+            count *= 4
+
+    def _names(self, positions, limit):
+        """Up to ``limit`` distinct canonical names of ranked ``positions``."""
+        names = []
+        for position in positions:
+            for name in self.canonical[position]:
+                if name not in names:
+                    names.append(name)
+                    if len(names) == limit:
+                        return names
+        return names
+
+    def search(self, query, limit=10):
+        """Canonical names of profiles with a name or alias starting with ``query``."""
+        prefix = normalize_prefix(query)
+        if not prefix:
+            return []
+        top = self._top.get(prefix)
+        if top is not None and limit <= self.precomputed_limit:
+            return top[:limit]
+        return self._ranked(prefix, limit)
+
+
+def trigrams(text):
+    padded = f" {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class FuzzyNameIndex:
+    """Normalized name corpus for the /get_articles "did you mean" fallback.
+
+    Holds every distinct ``normalize()``d FB_name/OI_name/aka with the
+    canonical names of the profiles using it, plus trigram postings over
+    those keys. A lookup ranks keys by trigrams shared with the query, keeps
+    the best ``candidates`` of them and scores only those with rapidfuzz's
+    ``token_set_ratio`` and a score cutoff.
+
+    Suggestions are therefore approximate: when more than ``candidates`` keys
+    share a trigram with the query (short or common words), a key outside
+    the top ``candidates`` by shared trigrams is never scored, even if its
+    ``token_set_ratio`` would have ranked it first. Raise ``candidates`` to
+    trade lookup time for recall.
+
+    Profiles are added, changed and removed one at a time with ``upsert`` and
+    ``remove``. A removed key's id is only marked dead; ids are compacted
+    once a quarter of them are dead.
+    """
+
+    def __init__(self, docs=(), candidates=2000):
+        self.candidates = candidates
+        self._lock = threading.RLock()
+        self._reset()
+        for doc in docs:
+            self.upsert(doc)
+
+    def _reset(self):
+        self.keys = []  # key id -> normalized name, None once dead
+        self.canonicals = []  # key id -> {canonical name: number of names using it}
+        self.alive = bytearray()
+        self.key_ids = {}
+        self.postings = defaultdict(lambda: array("i"))
+        self.profiles = {}  # _id -> [(key, canonical), ...]
+        self.dead = 0
+
+    def __len__(self):
+        return len(self.key_ids)
+
+    def _add(self, key, canonical):
+        key_id = self.key_ids.get(key)
+        if key_id is None:
+            key_id = self.key_ids[key] = len(self.keys)
+            self.keys.append(key)
+            self.canonicals.append({})
+            self.alive.append(1)
+            for gram in trigrams(key):
+                self.postings[gram].append(key_id)
+        counts = self.canonicals[key_id]
+        counts[canonical] = counts.get(canonical, 0) + 1
+
+    def _discard(self, key, canonical):
+        key_id = self.key_ids[key]
+        counts = self.canonicals[key_id]
+        counts[canonical] -= 1
+        if not counts[canonical]:
+            del counts[canonical]
+        if not counts:
+            del self.key_ids[key]
+            self.keys[key_id] = None
+            self.alive[key_id] = 0
+            self.dead += 1
+
+    def upsert(self, doc):
+        """Add a qid_level_tab document, replacing its previous names."""
+        with self._lock:
+            self._remove(doc.get("_id"))
+            fb, oi, akas = profile_names(doc)
+            canonical = fb or oi
+            if not canonical:
+                return
+            entries = []
+            for name in filter(None, [fb, oi] + akas):
+                key = normalize(name)
+                if key:
+                    entries.append((key, canonical))
+                    self._add(key, canonical)
+            self.profiles[doc.get("_id")] = entries
+
+    def remove(self, doc_id):
+        with self._lock:
+            self._remove(doc_id)
+
+    def _remove(self, doc_id):
+        for key, canonical in self.profiles.pop(doc_id, ()):
+            self._discard(key, canonical)
+        if self.dead > 1000 and self.dead * 4 > len(self.keys):
+            self._compact()
+
+    def _compact(self):
+        profiles = self.profiles
+        self._reset()
+        for doc_id, entries in profiles.items():
+            for key, canonical in entries:
+                self._add(key, canonical)
+            self.profiles[doc_id] = entries
+
+    def _candidate_ids(self, query):
+        postings = [self.postings[gram] for gram in trigrams(query) if gram in self.postings]
+        if not postings:
+            return []
+        shared = np.bincount(
+            np.concatenate([np.frombuffer(ids, dtype=np.int32) for ids in postings]),
+            minlength=len(self.keys),
+        )
+        shared[np.frombuffer(self.alive, dtype=np.uint8) == 0] = 0
+        ids = np.flatnonzero(shared)
+        if len(ids) > self.candidates:
+            ids = ids[np.argpartition(-shared[ids], self.candidates)[: self.candidates]]
+        return ids.tolist()
+
+    def suggest(self, name, limit=3, score_cutoff=60):
+        """Canonical names whose normalized names best match ``name``, among the trigram candidates."""
+        query = normalize(name)
+        if not query:
+            return []
+        with self._lock:
+            choices = {key_id: self.keys[key_id] for key_id in self._candidate_ids(query)}
+            matches = process.extract(
+                query, choices, scorer=fuzz.token_set_ratio, score_cutoff=score_cutoff, limit=5
+            )
+            suggestions = []
+            for _, _, key_id in matches:
+                for canonical in self.canonicals[key_id]:
+                    if canonical not in suggestions:
+                        suggestions.append(canonical)
+                if len(suggestions) >= limit:
+                    break
+        # An alias shared by many profiles must not flood the suggestions
+        return suggestions[:limit]
+
+
+class NameIndexManager:
+    """Keeps a PrefixIndex over qid_level_tab current.
+
+    The index is built from one projected scan of the collection on a daemon
+    thread, then rebuilt every ``refresh_interval`` seconds and swapped in
+    whole, so requests never see a half-built index. Requests that arrive
+    before the first build wait for it rather than starting their own; only
+    a manager that was never started builds on first use.
+    """
+
+    def __init__(self, collection, refresh_interval=300, index_class=PrefixIndex):
+        self.collection = collection
+        self.refresh_interval = refresh_interval
+        self.index_class = index_class
+        self._index = None
+        # Held for every build; reentrant so current() can build under it
+        self._lock = threading.RLock()
+        self._initial_build = threading.Event()
+        self._thread = None
+        self._stop = threading.Event()
+
+    def load_docs(self):
+        return list(self.collection.find({}, {"data.FB_name": 1, "data.OI_name": 1, "data.aka": 1}))
+
+    def refresh(self):
+        with self._lock:
+            start = time.perf_counter()
+            index = self.index_class(self.load_docs())
+            self._index = index
+        print(f"Built {self.index_class.__name__} with {len(index)} names in {time.perf_counter() - start:.2f}s")
+        return index
+
+    def current(self):
+        index = self._index
+        if index is None:
+            if self._thread is not None:
+                # The background thread is building it; don't build a second copy
+                self._initial_build.wait()
+            with self._lock:
+                index = self._index if self._index is not None else self.refresh()
+        return index
+
+    def _build_initial(self):
+        """First build on the background thread; waiting requests go ahead even if it fails."""
+        try:
+            with self._lock:
+                if self._index is None:
+                    self.refresh()
+        except Exception as e:
+            print(f"Name index build failed: {e}")
+        finally:
+            self._initial_build.set()
+
+    def _run(self):
+        self._build_initial()
+        while not self._stop.wait(self.refresh_interval):
+            try:
+                self.refresh()
+            except Exception as e:
+                # Keep answering from the previous index
+                print(f"Name index refresh failed: {e}")
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+
+class FuzzyIndexManager(NameIndexManager):
+    """Keeps a FuzzyNameIndex current from the qid_level_tab change stream.
+
+    Inserts, updates, replaces and deletes are applied to the live index one
+    profile at a time. Without a change stream (standalone mongod) it falls
+    back to rebuilding every ``refresh_interval`` seconds.
+    """
+
+    def __init__(self, collection, refresh_interval=300):
+        super().__init__(collection, refresh_interval, index_class=FuzzyNameIndex)
+
+    def apply_change(self, change):
+        operation = change.get("operationType")
+        if operation in ("insert", "update", "replace"):
+            doc = change.get("fullDocument")
+            if doc is None:
+                # Deleted again before the lookup
+                self.current().remove(change["documentKey"]["_id"])
+            else:
+                self.current().upsert(doc)
+        elif operation == "delete":
+            self.current().remove(change["documentKey"]["_id"])
+        else:
+            # drop, rename, invalidate
+            self.refresh()
+
+    def _run(self):
+        try:
+            # Opened before the initial build so no change in between is lost
+            with self.collection.watch(full_document="updateLookup") as stream:
+                self._build_initial()
+                for change in stream:
+                    if self._stop.is_set():
+                        return
+                    self.apply_change(change)
+        except Exception as e:
+            print(f"Profile change stream unavailable ({e}); rebuilding the fuzzy index every {self.refresh_interval}s")
+            super()._run()
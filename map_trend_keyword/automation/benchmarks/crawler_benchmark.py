@@ -0,0 +1,167 @@
+"""Sweep wall time and articles/s of the async crawler against a stand-in feed server.
+
+Starts a local HTTP server that answers oneindia-style feed pages (30 items
+each; --recent-pages pages inside the cutoff, then one older page) and item
+detail XML, each after --latency-ms, with a --fail-rate share of 503s.
+Sweeps --feeds feeds with ``Crawler`` and a scratch ``CheckpointStore``,
+then publishes --new-items items per feed and sweeps again with a fresh
+crawler on the same store, as after a restart, checking that it sends only
+what the first sweep did not. Unless --serial-feeds 0, also times the old
+one-request-at-a-time loop (with its 1s sleep per page) on a few feeds and
+extrapolates it to all of them. Run from automation/:
+
+    python -m benchmarks.crawler_benchmark --feeds 55 --concurrency 20 --per-host-rate 0
+"""
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+import requests  # type: ignore
+from bs4 import BeautifulSoup as bs  # type: ignore
+from checkpoints import CheckpointStore
+from crawler import Crawler, make_client
+
+ITEM_XML = "<Item><Link>{base}/article/{site}/{n}</Link><PublishDate>{date}</PublishDate><CategoryName>News</CategoryName></Item>"
+DETAIL_XML = """<?xml version="1.0" encoding="UTF-8"?>
+<Items><Item><ContentId>{site}-{n}</ContentId><Title>Article {n}</Title>
+<Content>&lt;p&gt;Body of {site} article {n}.&lt;/p&gt;</Content></Item></Items>"""
+
+
+def start_feed_server(latency, fail_rate, recent_pages, seed=3):
+    """Feeds list articles newest first; article n > 0 is n minutes newer than n - 1, n <= 0 are old.
+
+    ``server.published`` more articles can be added to the top of every feed.
+    """
+    rng = random.Random(seed)
+    anchor = datetime.now() - timedelta(days=1)
+    old = (datetime.now() - timedelta(days=30)).strftime("%Y-%m-%d %H:%M:%S")
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(latency)
+            if rng.random() < fail_rate:
+                self.send_response(503)
+                self.end_headers()
+                return
+            url = urlsplit(self.path)
+            base = f"http://{self.headers['Host']}"
+            if url.path == "/feed":
+                query = parse_qs(url.query)
+                site, page = query["site"][0], int(query["page"][0])
+                top = recent_pages * 30 + server.published
+                items = ""
+                for i in range(30):
+                    n = top - ((page - 1) * 30 + i)
+                    date = (anchor + timedelta(minutes=n)).strftime("%Y-%m-%d %H:%M:%S") if n > 0 else old
+                    items += ITEM_XML.format(base=base, site=site, n=n, date=date)
+                body = f'<?xml version="1.0" encoding="UTF-8"?><Items>{items}</Items>'
+            else:
+                _, _, site, n = url.path.split("/")
+                body = DETAIL_XML.format(site=site, n=n)
+            body = body.encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/xml")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    ThreadingHTTPServer.daemon_threads = True
+    ThreadingHTTPServer.request_queue_size = 128
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.published = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+
+def serial_feed(feed_url, domain, language, cutoff_date):
+    # The loop producer.fetch_articles ran before the crawler
+    articles = []
+    page_number = 1
+    while True:
+        response = requests.get(feed_url.format(site=f"{language}.{domain}", page=page_number), timeout=10)
+        if response.status_code != 200:
+            break
+        for item in bs(response.text, "xml").find_all("Item"):
+            if datetime.strptime(item.find("PublishDate").text, "%Y-%m-%d %H:%M:%S") < cutoff_date:
+                return articles
+            detail = requests.get(item.find("Link").text, timeout=10)
+            if detail.status_code == 200:
+                articles.append(bs(detail.text, "xml").find("ContentId").text)
+        page_number += 1
+        time.sleep(1)
+    return articles
+
+
+async def sweep(feeds, feed_url, checkpoints, sent, args):
+    async with make_client(args.concurrency) as client:
+        crawler = Crawler(
+            client,
+            concurrency=args.concurrency,
+            per_host_rate=args.per_host_rate,
+            backoff=args.backoff,
+            feed_url=feed_url,
+            checkpoints=checkpoints,
+        )
+        return await crawler.sweep(feeds, on_articles=lambda articles: sent.extend(a["ArticleID"] for a in articles))
+
+
+def report(label, stats, expected, args):
+    print(
+        f"{label}: {stats['articles']}/{expected} articles from {stats['feeds']} feeds "
+        f"({stats['pages']} pages, {stats['requests']} requests, {stats['skipped']} known items skipped) "
+        f"in {stats['seconds']:.2f}s, {stats['articles_per_second']:.0f} articles/s at concurrency {args.concurrency}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--feeds", type=int, default=55)
+    parser.add_argument("--recent-pages", type=int, default=2)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--per-host-rate", type=float, default=0.0, help="requests/s to the one stand-in host; 0 = unlimited")
+    parser.add_argument("--backoff", type=float, default=0.2)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--fail-rate", type=float, default=0.01)
+    parser.add_argument("--new-items", type=int, default=5, help="items published per feed before the second sweep")
+    parser.add_argument("--serial-feeds", type=int, default=2, help="feeds to time the old serial loop on")
+    args = parser.parse_args()
+
+    server, base_url = start_feed_server(args.latency_ms / 1000, args.fail_rate, args.recent_pages)
+    feed_url = base_url + "/feed?site={site}&page={page}"
+    feeds = [(f"site{i}.com", "www") for i in range(args.feeds)]
+    expected = args.feeds * args.recent_pages * 30
+
+    sent = []
+    with tempfile.TemporaryDirectory() as tmp:
+        checkpoints = CheckpointStore(os.path.join(tmp, "checkpoints.db"))
+        report("first sweep", asyncio.run(sweep(feeds, feed_url, checkpoints, sent, args)), expected, args)
+        server.published = args.new_items
+        report("after restart", asyncio.run(sweep(feeds, feed_url, checkpoints, sent, args)), args.feeds * args.new_items, args)
+        checkpoints.close()
+    duplicates = len(sent) - len(set(sent))
+    missing = expected + args.feeds * args.new_items - len(set(sent))
+    print(f"across both sweeps: {duplicates} articles sent twice, {missing} never sent")
+
+    if args.serial_feeds:
+        start = time.perf_counter()
+        cutoff_date = datetime.now() - timedelta(days=2)
+        count = sum(len(serial_feed(feed_url, domain, "www", cutoff_date)) for domain, _ in feeds[: args.serial_feeds])
+        elapsed = time.perf_counter() - start
+        print(
+            f"serial (old): {count} articles from {args.serial_feeds} feeds in {elapsed:.2f}s, "
+            f"{count / elapsed:.0f} articles/s; ~{elapsed / args.serial_feeds * args.feeds:.0f}s for {args.feeds} feeds"
+        )
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
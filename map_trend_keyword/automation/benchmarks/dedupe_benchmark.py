@@ -0,0 +1,92 @@
+"""Memory and lookup cost of the producer's dedupe store at --ids article IDs.
+
+Fills a ``RotatingBloomFilter`` sized for --ids with that many IDs and
+times adds, lookups of IDs it holds and of IDs it never saw (whose hit
+share is the false positive rate), plus a snapshot round trip. The
+unbounded ``set`` it replaced is measured (with tracemalloc) on
+--set-sample IDs and extrapolated. Run from automation/:
+
+    python -m benchmarks.dedupe_benchmark --ids 10000000 --error-rate 0.001
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+from dedupe import RotatingBloomFilter
+
+
+def article_id(i):
+    # Shaped like a oneindia ContentId
+    return str(100_000_000 + i)
+
+
+def per_op_us(func, keys):
+    start = time.perf_counter()
+    for key in keys:
+        func(key)
+    return (time.perf_counter() - start) / len(keys) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ids", type=int, default=10_000_000)
+    parser.add_argument("--error-rate", type=float, default=0.001)
+    parser.add_argument("--generations", type=int, default=6)
+    parser.add_argument("--probes", type=int, default=200_000)
+    parser.add_argument("--set-sample", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    seen = RotatingBloomFilter(capacity=args.ids, error_rate=args.error_rate, generations=args.generations)
+    start = time.perf_counter()
+    for i in range(args.ids):
+        seen.add(article_id(i))
+    add_seconds = time.perf_counter() - start
+    print(
+        f"RotatingBloomFilter: {len(seen)} IDs in {len(seen.generations)} generations of "
+        f"{seen.num_bits} cells x {seen.num_hashes} hashes; fixed {seen.memory_ceiling / 2**20:.1f} MiB"
+    )
+    print(f"  add     {add_seconds / args.ids * 1e6:6.2f} us/op")
+
+    rng = random.Random(7)
+    present = [article_id(rng.randrange(args.ids)) for _ in range(args.probes)]
+    absent = [article_id(args.ids + i) for i in range(args.probes)]
+    print(f"  lookup  {per_op_us(seen.__contains__, present):6.2f} us/op (seen IDs)")
+    print(f"  lookup  {per_op_us(seen.__contains__, absent):6.2f} us/op (new IDs)")
+    missed = sum(key not in seen for key in present)
+    false_positives = sum(key in seen for key in absent)
+    print(f"  false negatives {missed}, false positive rate {false_positives / len(absent):.5f} (target {args.error_rate})")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        seen.path = os.path.join(tmp, "seen.bloom")
+        start = time.perf_counter()
+        seen.snapshot()
+        written = time.perf_counter() - start
+        start = time.perf_counter()
+        restored = RotatingBloomFilter(
+            capacity=args.ids, error_rate=args.error_rate, generations=args.generations, path=seen.path
+        )
+        loaded = time.perf_counter() - start
+        size = os.path.getsize(seen.path)
+    restored_ok = all(key in restored for key in present[:10_000])
+    print(
+        f"  snapshot {size / 2**20:.1f} MiB written in {written:.2f}s, loaded in {loaded:.2f}s "
+        f"(restored lookups {'ok' if restored_ok else 'WRONG'})"
+    )
+
+    sample = min(args.set_sample, args.ids)
+    tracemalloc.start()
+    baseline = set()
+    for i in range(sample):
+        baseline.add(article_id(i))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(
+        f"set (old): {peak / 2**20:.1f} MiB for {sample} IDs, ~{peak / sample * args.ids / 2**20:.0f} MiB at {args.ids}, "
+        f"unbounded; lookup {per_op_us(baseline.__contains__, present):.2f} us/op"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+"""Parse time and peak memory: BeautifulSoup trees vs the streaming feed parser.
+
+Parses feed pages and article detail XML the old way (``bs(text, "xml")``,
+``find``/``find_all`` per field, ``html.unescape`` and two uncompiled regex
+passes over the content) and the new way (``ItemParser``/``FieldParser``
+fed --chunk-kb at a time, then ``clean_content``), checks both produce the
+same records, and reports time per document and the peak RSS growth of
+each path (results discarded), each measured in its own child process.
+
+Samples are ``feed_*.xml`` and ``detail_*.xml`` files in --samples; with
+--capture they are first downloaded there from the live feeds. Without
+--samples, synthetic oneindia-shaped documents are used. Run from
+automation/:
+
+    python -m benchmarks.feed_parser_benchmark --capture --samples /tmp/oneindia
+    python -m benchmarks.feed_parser_benchmark --samples /tmp/oneindia
+    python -m benchmarks.feed_parser_benchmark --pages 200 --content-kb 12
+"""
+import argparse
+import glob
+import html
+import json
+import os
+import re
+import resource
+import subprocess
+import sys
+import time
+from bs4 import BeautifulSoup as bs  # type: ignore
+from feed_parser import FieldParser, ItemParser, clean_content, parse_items
+
+PARAGRAPH = (
+    "&lt;p&gt;Rohit Sharma&amp;#39;s side won by 5 wickets; the match at Wankhede ended at "
+    "10:30&amp;nbsp;pm. &lt;strong&gt;Q&amp;amp;A&lt;/strong&gt; follows.&lt;/p&gt;\n"
+)
+
+
+def synthetic_samples(pages, content_kb):
+    feeds, details = [], []
+    for page in range(pages):
+        items = "".join(
+            f"<Item><ContentId>{page * 30 + i}</ContentId><Link>https://example.com/article/{page * 30 + i}</Link>"
+            f"<PublishDate>2024-05-0{1 + i % 9} 10:{i:02d}:00</PublishDate><CategoryName> News </CategoryName></Item>"
+            for i in range(30)
+        )
+        feeds.append(f'<?xml version="1.0" encoding="UTF-8"?><Items>{items}</Items>'.encode("utf-8"))
+    body = PARAGRAPH * max(1, content_kb * 1024 // len(PARAGRAPH))
+    for n in range(pages * 30):
+        details.append(
+            f'<?xml version="1.0" encoding="UTF-8"?><Items><Item><ContentId>{n}</ContentId>'
+            f"<Title>Article {n} &amp; more</Title><Content>{body}</Content></Item></Items>".encode("utf-8")
+        )
+    return feeds, details
+
+
+def capture_samples(directory, feeds):
+    import requests  # type: ignore
+    from crawler import FEED_URL, HEADERS
+
+    os.makedirs(directory, exist_ok=True)
+    for n, site in enumerate(feeds):
+        page = requests.get(FEED_URL.format(site=site, page=1), headers=HEADERS, timeout=10).content
+        with open(os.path.join(directory, f"feed_{n}.xml"), "wb") as f:
+            f.write(page)
+        for i, item in enumerate(parse_items(page)):
+            if "Link" not in item:
+                continue
+            detail = requests.get(item["Link"], headers=HEADERS, timeout=10).content
+            with open(os.path.join(directory, f"detail_{n}_{i}.xml"), "wb") as f:
+                f.write(detail)
+
+
+def load_samples(directory):
+    def read(pattern):
+        paths = sorted(glob.glob(os.path.join(directory, pattern)))
+        return [open(path, "rb").read() for path in paths]
+    return read("feed_*.xml"), read("detail_*.xml")
+
+
+def old_feed(data):
+    # call_xml + the per-item finds producer.fetch_articles did
+    root = bs(data.decode("utf-8", "replace"), "xml")
+    records = []
+    for item in root.find_all("Item"):
+        record = {}
+        for field in ("ContentId", "Link", "PublishDate", "CategoryName"):
+            elem = item.find(field)
+            if elem:
+                record[field] = elem.text
+        records.append(record)
+    return records
+
+
+def old_detail(data):
+    content_elem = bs(data.decode("utf-8", "replace"), "xml")
+    record = {}
+    for field in ("ContentId", "Title", "Content"):
+        elem = content_elem.find(field)
+        if elem:
+            record[field] = elem.text
+    content = record.get("Content", "No Content")
+    clean = re.sub(r"<.*?>|(&[^;]+;)", "", html.unescape(content)).replace('\\', " ")
+    record["Content"] = re.sub(r'[\s]{2,}', ' ', clean)
+    return record
+
+
+def streamed(parser, data, chunk_size):
+    for start in range(0, len(data), chunk_size):
+        parser.feed(data[start:start + chunk_size])
+    return parser.close()
+
+
+def new_feed(data, chunk_size):
+    return streamed(ItemParser(), data, chunk_size)
+
+
+def new_detail(data, chunk_size):
+    record = dict(streamed(FieldParser(), data, chunk_size))
+    record["Content"] = clean_content(record.get("Content") or "No Content")
+    return record
+
+
+def nonempty(records):
+    # bs treats an empty element like a missing one; so does the crawler
+    return [{field: text for field, text in record.items() if text} for record in records]
+
+
+def rss_kib(field):
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith(field):
+                return int(line.split()[1])
+
+
+def reset_peak_rss():
+    """Current RSS in KiB after resetting the peak to it, or None where Linux's clear_refs is missing."""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return rss_kib("VmRSS:")
+    except OSError:
+        return None
+
+
+def peak_rss_kib():
+    try:
+        return rss_kib("VmHWM:")
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def run(mode, feeds, details, chunk_size):
+    """Time one path over every sample; returns its stats and records."""
+    if mode == "old":
+        parse_feed, parse_detail = old_feed, old_detail
+    else:
+        parse_feed = lambda data: new_feed(data, chunk_size)
+        parse_detail = lambda data: new_detail(data, chunk_size)
+    # Memory pass: results dropped, so the peak is the parsers' own working set
+    rss_before = reset_peak_rss() or peak_rss_kib()
+    for data in feeds:
+        parse_feed(data)
+    for data in details:
+        parse_detail(data)
+    peak_growth = peak_rss_kib() - rss_before
+
+    start = time.perf_counter()
+    feed_records = [parse_feed(data) for data in feeds]
+    feed_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    detail_records = [parse_detail(data) for data in details]
+    detail_seconds = time.perf_counter() - start
+    return {
+        "feed_us": feed_seconds / max(1, len(feeds)) * 1e6,
+        "detail_us": detail_seconds / max(1, len(details)) * 1e6,
+        "peak_rss_growth_kib": peak_growth,
+        "records": [[nonempty(records) for records in feed_records], nonempty(detail_records)],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--samples", help="directory of captured feed_*.xml / detail_*.xml")
+    parser.add_argument("--capture", action="store_true", help="download samples into --samples first")
+    parser.add_argument("--capture-sites", default="www.oneindia.com,hindi.oneindia.com,tamil.filmibeat.com")
+    parser.add_argument("--pages", type=int, default=50, help="synthetic feed pages (30 items each)")
+    parser.add_argument("--content-kb", type=int, default=8, help="synthetic article body size")
+    parser.add_argument("--chunk-kb", type=int, default=16)
+    parser.add_argument("--mode", choices=["old", "new"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.capture:
+        capture_samples(args.samples, args.capture_sites.split(","))
+    if args.samples:
+        feeds, details = load_samples(args.samples)
+    else:
+        feeds, details = synthetic_samples(args.pages, args.content_kb)
+
+    if args.mode:
+        # Child process: one path, so its peak RSS is its own
+        print(json.dumps(run(args.mode, feeds, details, args.chunk_kb * 1024)))
+        return
+
+    size = sum(map(len, feeds)) + sum(map(len, details))
+    print(f"{len(feeds)} feed pages, {len(details)} article details, {size / 2**20:.1f} MiB")
+    forwarded = [a for a in sys.argv[1:] if a != "--capture"]
+    results = {}
+    for mode in ("old", "new"):
+        out = subprocess.run(
+            [sys.executable, "-m", "benchmarks.feed_parser_benchmark", *forwarded, "--mode", mode],
+            check=True, capture_output=True, text=True,
+        ).stdout
+        results[mode] = json.loads(out.splitlines()[-1])
+    for mode, label in (("old", "BeautifulSoup (old)"), ("new", "streaming")):
+        stats = results[mode]
+        print(
+            f"{label:<20} feed page {stats['feed_us']:>9.0f} us   detail {stats['detail_us']:>8.0f} us   "
+            f"peak RSS growth {stats['peak_rss_growth_kib'] / 1024:>6.1f} MiB"
+        )
+    same = results["old"]["records"] == results["new"]["records"]
+    print(f"records: {'identical' if same else 'DIFFERENT'}")
+    if not same:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""Requests, bytes downloaded and wall time of article fetches with and without ``HTTPCache``.
+
+Starts a local HTTP server answering --articles article detail XML of
+--content-kb each after --latency-ms: a third send an ``ETag``, a third
+``Last-Modified`` (both answered with a bodiless 304 when the request
+carries them back) and a third no validators. Fetches every article through
+``Crawler.fetch_xml`` --rounds times, as successive sweeps would, once
+without a cache and once with a scratch one whose TTL for validator-less
+responses is --ttl seconds, and checks both return the same records. Run
+from automation/:
+
+    python -m benchmarks.http_cache_benchmark --articles 600 --rounds 3
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from crawler import Crawler, make_client
+from feed_parser import FieldParser
+from http_cache import HTTPCache
+
+LAST_MODIFIED = "Mon, 06 May 2024 10:00:00 GMT"
+
+
+def start_article_server(latency, content_kb):
+    body = "&lt;p&gt;" + "x" * (content_kb * 1024) + "&lt;/p&gt;"
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            time.sleep(latency)
+            n = int(self.path.rsplit("/", 1)[1])
+            headers = {}
+            if n % 3 == 0:
+                headers["ETag"] = f'"{n}-v1"'
+                unchanged = self.headers.get("If-None-Match") == headers["ETag"]
+            elif n % 3 == 1:
+                headers["Last-Modified"] = LAST_MODIFIED
+                unchanged = self.headers.get("If-Modified-Since") == LAST_MODIFIED
+            else:
+                unchanged = False
+            if unchanged:
+                self.send_response(304)
+                data = b""
+            else:
+                self.send_response(200)
+                data = (
+                    f"<Items><Item><ContentId>{n}</ContentId><Title>Article {n}</Title>"
+                    f"<Content>{body}</Content></Item></Items>"
+                ).encode("utf-8")
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+            with server.lock:
+                server.requests += 1
+                server.bytes_sent += len(data)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    server.lock = threading.Lock()
+    server.requests = 0
+    server.bytes_sent = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+async def fetch_rounds(server, urls, rounds, concurrency, http_cache):
+    """Per-round (requests, bytes, seconds) and the last round's records."""
+    results = []
+    async with make_client(concurrency) as client:
+        crawler = Crawler(client, concurrency=concurrency, per_host_rate=0, http_cache=http_cache)
+        for _ in range(rounds):
+            requests, sent = server.requests, server.bytes_sent
+            start = time.perf_counter()
+            records = await asyncio.gather(*(crawler.fetch_xml(url, FieldParser) for url in urls))
+            results.append((server.requests - requests, server.bytes_sent - sent, time.perf_counter() - start))
+    return results, records
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--articles", type=int, default=600)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--content-kb", type=int, default=16)
+    parser.add_argument("--latency-ms", type=float, default=50)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--ttl", type=float, default=300, help="seconds a response without validators is reused")
+    args = parser.parse_args()
+
+    server = start_article_server(args.latency_ms / 1000, args.content_kb)
+    urls = [f"http://127.0.0.1:{server.server_port}/article/{n}" for n in range(args.articles)]
+
+    uncached, plain_records = asyncio.run(fetch_rounds(server, urls, args.rounds, args.concurrency, None))
+    with tempfile.TemporaryDirectory() as scratch:
+        http_cache = HTTPCache(os.path.join(scratch, "http_cache.db"), default_ttl=args.ttl)
+        cached, cached_records = asyncio.run(fetch_rounds(server, urls, args.rounds, args.concurrency, http_cache))
+        stats = http_cache.stats()
+
+    print(f"{args.articles} articles of {args.content_kb} KiB, {args.latency_ms:.0f} ms latency, {args.rounds} rounds")
+    for label, results in (("no cache", uncached), ("HTTPCache", cached)):
+        for round_number, (requests, sent, seconds) in enumerate(results, 1):
+            print(
+                f"{label:<10} round {round_number}: {requests:>5} requests {sent / 2**20:>8.1f} MiB downloaded "
+                f"{seconds:>7.2f}s"
+            )
+    print(
+        f"cache: {stats['hits']} hits, {stats['not_modified']} not modified, {stats['misses']} misses, "
+        f"{stats['bytes'] / 2**20:.1f} MiB stored"
+    )
+    same = plain_records == cached_records
+    print(f"records: {'identical' if same else 'DIFFERENT'}")
+    if not same:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+import json
+import sqlite3
+import time
+from datetime import datetime
+
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+class CheckpointStore:
+    """Per-feed high-water marks in a local SQLite file.
+
+    A feed's mark is the ``PublishDate`` below which every item has been
+    handled, plus the keys of the handled items at or after it (several
+    items can share a timestamp). The next sweep stops paging at the first
+    item older than the mark and skips the detail fetch of every key in it.
+    """
+
+    def __init__(self, path):
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            """CREATE TABLE IF NOT EXISTS feed_checkpoints (
+                domain TEXT NOT NULL,
+                language TEXT NOT NULL,
+                publish_date TEXT NOT NULL,
+                item_keys TEXT NOT NULL,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (domain, language)
+            )"""
+        )
+        self.conn.commit()
+
+    def get(self, domain, language):
+        """``(publish_date, item_keys)`` of a feed, or None before its first sweep."""
+        row = self.conn.execute(
+            "SELECT publish_date, item_keys FROM feed_checkpoints WHERE domain = ? AND language = ?",
+            (domain, language),
+        ).fetchone()
+        if row is None:
+            return None
+        return datetime.strptime(row[0], DATE_FORMAT), set(json.loads(row[1]))
+
+    def set(self, domain, language, publish_date, item_keys):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO feed_checkpoints VALUES (?, ?, ?, ?, ?)",
+            (domain, language, publish_date.strftime(DATE_FORMAT), json.dumps(sorted(item_keys)), time.time()),
+        )
+        self.conn.commit()
+
+    def advance(self, domain, language, mark, handled, failed_dates, floor=None):
+        """Move a feed's mark past this sweep's ``handled`` ``(date, key)`` items.
+
+        The mark never passes the oldest item whose details could not be
+        fetched (``failed_dates``), so that item is tried again next sweep.
+        ``floor`` is set when paging failed before reaching the stop date:
+        the items on the failed page and after it were never read, so the
+        mark stays at ``floor`` (the previous mark, or the cutoff) and only
+        the handled keys are recorded.
+        """
+        if floor is not None:
+            if not handled:
+                return
+            publish_date = floor
+        elif failed_dates:
+            publish_date = min(failed_dates)
+        elif handled:
+            publish_date = max(date for date, _ in handled)
+        else:
+            return
+        item_keys = {key for date, key in handled if date >= publish_date}
+        if mark is not None and mark[0] == publish_date:
+            item_keys |= mark[1]
+        self.set(domain, language, publish_date, item_keys)
+
+    def close(self):
+        self.conn.close()
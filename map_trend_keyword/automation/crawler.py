@@ -0,0 +1,299 @@
+import asyncio
+import logging
+import random
+import time
+from datetime import datetime, timedelta
+from urllib.parse import urlsplit
+import httpx  # type: ignore
+from feed_parser import FieldParser, ItemParser, clean_content
+
+FEED_URL = "https://rss.oneindia.com/scripts/cms/newsFeed.php?type=dh-feed&sub_type=all&site={site}&limit=30&page={page}"
+
+# HTTP Headers
+HEADERS = {
+    "User-Agent": "Mozilla/5.0",
+    "Accept-Language": "en-US,en;q=0.9",
+    "Connection": "keep-alive",
+}
+
+# Throttled or failing upstream; anything else non-200 is not retried
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class HostRateLimiter:
+    """Spaces requests to each host at least ``1 / rate`` seconds apart."""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next_slot = {}
+
+    async def wait(self, host):
+        if not self.interval:
+            return
+        now = asyncio.get_running_loop().time()
+        slot = max(now, self._next_slot.get(host, now))
+        self._next_slot[host] = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+def parse_item(item, details, domain, language):
+    """Article dict of a feed item record and its detail record."""
+    return {
+        "publish_date": item.get("PublishDate") or "No Publish Date",
+        "category": item.get("CategoryName", "").strip() or "No Category",
+        "web_url": item.get("Link") or "No Link",
+        "ArticleID": details.get("ContentId") or "No ID",
+        "title": details.get("Title") or "No Title",
+        "content": clean_content(details.get("Content") or "No Content"),
+        "domain": domain,
+        "language": language
+    }
+
+
+def parse_body(parser_class, body):
+    parser = parser_class()
+    parser.feed(body)
+    return parser.close()
+
+
+def dedupe_key(article):
+    """ArticleID, or the web URL of an article whose details carry none."""
+    if article["ArticleID"] == "No ID":
+        return article["web_url"]
+    return article["ArticleID"]
+
+
+def item_key(item):
+    """Identity of a feed item before its details are fetched."""
+    return item.get("ContentId") or item.get("Link") or "No Link"
+
+
+class Crawler:
+    """Concurrent sweep of the site x language RSS feeds.
+
+    Every feed is walked at once over one pooled keep-alive client: the next
+    feed page is requested as soon as the current one shows it is still
+    within the cutoff, while the current page's item details are fetched.
+    ``concurrency`` caps requests in flight overall and ``per_host_rate``
+    caps requests per second to any one host. Failed requests are retried
+    with jittered exponential backoff. With a ``CheckpointStore`` a feed is
+    only read back to its high-water mark and known items are not fetched.
+    """
+
+    def __init__(
+        self,
+        client,
+        concurrency=20,
+        per_host_rate=20.0,
+        retries=3,
+        backoff=1.0,
+        cutoff_days=2,
+        feed_url=FEED_URL,
+        subdomains=None,
+        checkpoints=None,
+        seen_articles=None,
+        http_cache=None,
+    ):
+        self.client = client
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.limiter = HostRateLimiter(per_host_rate)
+        self.retries = retries
+        self.backoff = backoff
+        self.cutoff_days = cutoff_days
+        self.feed_url = feed_url
+        self.subdomains = subdomains or {}
+        # Optional CheckpointStore; without one every sweep re-reads cutoff_days of each feed
+        self.checkpoints = checkpoints
+        # Store previously fetched articles to avoid duplicates: anything with
+        # `in` and `add`, e.g. a RotatingBloomFilter to bound it and keep it across restarts
+        self.seen_articles = seen_articles if seen_articles is not None else set()
+        # Optional HTTPCache: fresh responses skip the request, stale ones are revalidated
+        self.http_cache = http_cache
+        self.requests = 0
+        self.pages = 0
+        self.skipped = 0
+
+    async def fetch_xml(self, url, parser_class, ttl=None):
+        """``url`` parsed by a ``parser_class`` as its body streams in, or None once the retries are spent.
+
+        With an ``http_cache`` a fresh copy is parsed without a request and a
+        stale one is revalidated; ``ttl`` overrides how long a response
+        without validators is reused. Cache reads and writes block on SQLite,
+        so they run in a worker thread.
+        """
+        cache = self.http_cache
+        entry = await asyncio.to_thread(cache.lookup, url) if cache is not None else None
+        if entry is not None and entry.fresh:
+            return parse_body(parser_class, entry.body)
+        headers = cache.validators(entry) if cache is not None else {}
+        host = urlsplit(url).hostname
+        for attempt in range(self.retries):
+            await self.limiter.wait(host)
+            try:
+                async with self.semaphore:
+                    self.requests += 1
+                    async with self.client.stream("GET", url, headers=headers) as response:
+                        status = response.status_code
+                        if status == 304 and entry is not None:
+                            body = await asyncio.to_thread(cache.revalidated, url, response.headers, entry)
+                            return parse_body(parser_class, body)
+                        if status == 200:
+                            parser = parser_class()
+                            chunks = []
+                            async for chunk in response.aiter_bytes():
+                                parser.feed(chunk)
+                                if cache is not None:
+                                    chunks.append(chunk)
+                            if cache is not None:
+                                await asyncio.to_thread(cache.store, url, response.headers, b"".join(chunks), ttl)
+                            return parser.close()
+                logging.error(f"Error fetching XML from {url}: Status Code {status}")
+                if status not in RETRY_STATUSES:
+                    return None
+            except httpx.HTTPError as e:
+                logging.error(f"Error fetching XML from {url} (attempt {attempt + 1}/{self.retries}): {e}")
+            if attempt + 1 < self.retries:
+                await asyncio.sleep(random.uniform(0, self.backoff * 2 ** attempt))
+        return None
+
+    async def fetch_item(self, item, domain, language):
+        """``(fetched, article)``; ``fetched`` is False when the details never arrived."""
+        link = item.get("Link") or "No Link"
+        details = await self.fetch_xml(link, FieldParser)
+        if details is None:
+            logging.error(f"Skipping item without details: {link}")
+            return False, None
+        try:
+            return True, parse_item(item, details, domain, language)
+        except Exception as e:
+            logging.error(f"Error processing item: {e}")
+            return True, None
+
+    def recent_items(self, items, stop_date):
+        """``(date, item)`` of the items not older than ``stop_date``, and whether an older one ended the feed."""
+        recent = []
+        for item in items:
+            pubdate = item.get("PublishDate") or "No Publish Date"
+            try:
+                article_date = datetime.strptime(pubdate, "%Y-%m-%d %H:%M:%S")
+            except ValueError:
+                logging.warning(f"Skipping article with invalid date format: {pubdate}")
+                continue
+            if article_date < stop_date:
+                return recent, True
+            recent.append((article_date, item))
+        return recent, False
+
+    def page_url(self, domain, language, page_number):
+        subdomain = self.subdomains.get(language, "www")  # Default to "www" for English
+        return self.feed_url.format(site=f"{subdomain}.{domain}", page=page_number)
+
+    async def crawl_feed(self, domain, language):
+        """Articles of one feed since its checkpoint, or from the past ``cutoff_days`` days.
+
+        Also returns the feed's progress for ``CheckpointStore.advance``.
+        """
+        stop_date = datetime.now() - timedelta(days=self.cutoff_days)
+        mark = self.checkpoints.get(domain, language) if self.checkpoints is not None else None
+        known = set()
+        if mark is not None:
+            stop_date = max(stop_date, mark[0])
+            known = mark[1]
+
+        articles = []
+        # (date, key) of items done with this sweep, dates of items to retry next sweep
+        handled, failed_dates = [], []
+        # Set when a page fails before stop_date: the mark may not move past it
+        floor = None
+        page_number = 1
+        next_page = asyncio.ensure_future(self.fetch_xml(self.page_url(domain, language, page_number), ItemParser, ttl=0))
+        try:
+            while next_page is not None:
+                items = await next_page
+                next_page = None
+                if items is None:
+                    logging.error(f"Failed to fetch the XML feed for domain {domain}, language {language}, page {page_number}")
+                    # Every item older than those read is unread; keep the mark where it was
+                    floor = stop_date
+                    break
+                if not items:
+                    break  # Stop if no more items are found
+                self.pages += 1
+
+                recent, reached_stop = self.recent_items(items, stop_date)
+                if not reached_stop:
+                    # Ask for the next page while this one's details are in flight
+                    next_page = asyncio.ensure_future(
+                        self.fetch_xml(self.page_url(domain, language, page_number + 1), ItemParser, ttl=0)
+                    )
+                fresh = []
+                for article_date, item in recent:
+                    key = item_key(item)
+                    if key in known:
+                        self.skipped += 1
+                        handled.append((article_date, key))
+                    else:
+                        fresh.append((article_date, key, item))
+                results = await asyncio.gather(*(self.fetch_item(item, domain, language) for _, _, item in fresh))
+                for (article_date, key, _), (fetched, article) in zip(fresh, results):
+                    if not fetched:
+                        failed_dates.append(article_date)
+                        continue
+                    handled.append((article_date, key))
+                    if article is None or dedupe_key(article) in self.seen_articles:
+                        continue  # Skip failed and duplicate articles
+                    self.seen_articles.add(dedupe_key(article))
+                    articles.append(article)
+
+                page_number += 1
+                logging.info(f"Fetched page {page_number - 1} for domain {domain}, language {language}")
+        finally:
+            if next_page is not None:
+                next_page.cancel()
+        return articles, (mark, handled, failed_dates, floor)
+
+    async def sweep(self, feeds, on_articles=None):
+        """Crawl every ``(domain, language)`` feed concurrently.
+
+        ``on_articles(articles)`` is called in a worker thread as each feed
+        finishes, before its checkpoint moves. Returns the sweep's stats: feeds, pages,
+        requests, checkpointed items skipped, articles and wall time.
+        """
+        requests, pages, skipped = self.requests, self.pages, self.skipped
+        start = time.perf_counter()
+
+        async def crawl(domain, language):
+            try:
+                articles, progress = await self.crawl_feed(domain, language)
+            except Exception as e:
+                logging.error(f"Error fetching data for domain {domain}, language {language}: {e}")
+                return 0
+            if articles and on_articles is not None:
+                # Off the event loop: a blocking hand-off (e.g. a Kafka flush) would stall every other feed
+                await asyncio.to_thread(on_articles, articles)
+            if self.checkpoints is not None:
+                # Only once the articles are handed off, so a crash re-reads them
+                self.checkpoints.advance(domain, language, *progress)
+            return len(articles)
+
+        counts = await asyncio.gather(*(crawl(domain, language) for domain, language in feeds))
+        elapsed = time.perf_counter() - start
+        return {
+            "feeds": len(feeds),
+            "pages": self.pages - pages,
+            "requests": self.requests - requests,
+            "skipped": self.skipped - skipped,
+            "articles": sum(counts),
+            "seconds": elapsed,
+            "articles_per_second": sum(counts) / elapsed if elapsed else 0.0,
+        }
+
+
+def make_client(concurrency=20, timeout=10):
+    """Keep-alive client pooling a connection per concurrent request."""
+    return httpx.AsyncClient(
+        headers=HEADERS,
+        timeout=timeout,
+        limits=httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency),
+    )
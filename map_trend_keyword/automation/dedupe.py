@@ -0,0 +1,144 @@
+import hashlib
+import json
+import logging
+import math
+import os
+import time
+from collections import deque
+
+# Each cell is a byte with one flag per live generation
+MAX_GENERATIONS = 8
+# Cells cleared per step when a generation expires, to avoid copying the whole array
+CLEAR_CHUNK = 1 << 20
+_CLEAR_TABLES = [bytes(b & ~(1 << slot) for b in range(256)) for slot in range(MAX_GENERATIONS)]
+
+
+class RotatingBloomFilter:
+    """Time-windowed set of seen IDs with a fixed memory ceiling.
+
+    IDs go into the newest of ``generations`` Bloom filters; a new filter is
+    started every ``window / generations`` seconds (or sooner once the
+    current one holds its share of ``capacity``) and the oldest is dropped,
+    so an ID is remembered for at least ``window - window / generations``
+    seconds. The filters share one array of byte cells, a flag bit per
+    generation, so a lookup reads each of its cells once however many
+    generations there are, and dropping a generation clears its flag. Each
+    filter is sized so a lookup across all of them is a false positive with
+    probability about ``error_rate``; there are no false negatives within
+    the window.
+
+    With ``path`` the filters are restored from the last ``snapshot()`` on
+    start, dropping the generations that expired meanwhile.
+    """
+
+    def __init__(self, capacity=1_000_000, error_rate=0.001, window=72 * 3600, generations=6, path=None, clock=time.time):
+        if not 1 <= generations <= MAX_GENERATIONS:
+            raise ValueError(f"generations must be between 1 and {MAX_GENERATIONS}")
+        self.generation_capacity = max(1, capacity // generations)
+        generation_error = error_rate / generations
+        self.num_bits = math.ceil(-self.generation_capacity * math.log(generation_error) / math.log(2) ** 2)
+        self.num_hashes = max(1, round(self.num_bits / self.generation_capacity * math.log(2)))
+        self.window = window
+        self.max_generations = generations
+        self.generation_seconds = window / generations
+        self.path = path
+        self.clock = clock
+        self.cells = bytearray(self.num_bits)
+        # [started_at, count, flag], newest last
+        self.generations = deque()
+        if path and os.path.exists(path):
+            self._load()
+
+    @property
+    def memory_ceiling(self):
+        """Bytes of cells; allocated up front and never grown."""
+        return len(self.cells)
+
+    def _hashes(self, key):
+        # Cell i of a key is (h1 + i * h2) % num_bits; small ints keep that cheap
+        h = int.from_bytes(hashlib.blake2b(str(key).encode("utf-8"), digest_size=8).digest(), "little")
+        return h & 0xffffffff, (h >> 32) | 1
+
+    def _contains(self, h1, h2):
+        cells = self.cells
+        num_bits = self.num_bits
+        flags = 0xff
+        for i in range(self.num_hashes):
+            flags &= cells[(h1 + i * h2) % num_bits]
+            if not flags:
+                return False
+        return True
+
+    def _drop_oldest(self):
+        _, _, flag = self.generations.popleft()
+        table = _CLEAR_TABLES[flag.bit_length() - 1]
+        cells = self.cells
+        for start in range(0, len(cells), CLEAR_CHUNK):
+            cells[start:start + CLEAR_CHUNK] = cells[start:start + CLEAR_CHUNK].translate(table)
+
+    def _rotate(self):
+        now = self.clock()
+        while self.generations and self.generations[0][0] <= now - self.window:
+            self._drop_oldest()
+        newest = self.generations[-1] if self.generations else None
+        if (
+            newest is None
+            or newest[0] <= now - self.generation_seconds
+            or newest[1] >= self.generation_capacity
+        ):
+            if len(self.generations) == self.max_generations:
+                self._drop_oldest()
+            used = 0
+            for _, _, flag in self.generations:
+                used |= flag
+            slot = next(slot for slot in range(self.max_generations) if not used & (1 << slot))
+            self.generations.append([now, 0, 1 << slot])
+
+    def __contains__(self, key):
+        self._rotate()
+        return self._contains(*self._hashes(key))
+
+    def add(self, key):
+        """Remember ``key``; returns False if it was (probably) already seen."""
+        self._rotate()
+        h1, h2 = self._hashes(key)
+        if self._contains(h1, h2):
+            return False
+        generation = self.generations[-1]
+        flag = generation[2]
+        cells = self.cells
+        num_bits = self.num_bits
+        for i in range(self.num_hashes):
+            cells[(h1 + i * h2) % num_bits] |= flag
+        generation[1] += 1
+        return True
+
+    def __len__(self):
+        """IDs added within the window."""
+        return sum(count for _, count, _ in self.generations)
+
+    def snapshot(self):
+        """Write the filters to ``path`` atomically."""
+        header = {
+            "num_bits": self.num_bits,
+            "num_hashes": self.num_hashes,
+            "generations": [list(generation) for generation in self.generations],
+        }
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(json.dumps(header).encode("utf-8") + b"\n")
+            f.write(self.cells)
+        os.replace(tmp_path, self.path)
+
+    def _load(self):
+        with open(self.path, "rb") as f:
+            header = json.loads(f.readline())
+            if header["num_bits"] != self.num_bits or header["num_hashes"] != self.num_hashes:
+                logging.warning(f"Ignoring dedupe snapshot {self.path}: sized for different capacity/error_rate")
+                return
+            if f.readinto(self.cells) != self.num_bits:
+                logging.warning(f"Ignoring truncated dedupe snapshot {self.path}")
+                self.cells = bytearray(self.num_bits)
+                return
+        self.generations.extend(header["generations"])
+        self._rotate()
@@ -0,0 +1,143 @@
+import html
+import re
+from lxml import etree  # type: ignore
+
+# Feed page items and the detail fields read from them
+ITEM_FIELDS = ("ContentId", "Link", "PublishDate", "CategoryName")
+DETAIL_FIELDS = ("ContentId", "Title", "Content")
+
+_MARKUP = re.compile(r"<.*?>|(&[^;]+;)")
+_SPACES = re.compile(r"[\s]{2,}")
+
+
+def clean_content(content):
+    """Article body without HTML tags, entities or runs of whitespace."""
+    return _SPACES.sub(" ", _MARKUP.sub("", html.unescape(content)).replace("\\", " "))
+
+
+def _localname(elem):
+    """Tag without its ``{namespace}``; None for comments and processing instructions."""
+    tag = elem.tag
+    if not isinstance(tag, str):
+        return None
+    return tag.rpartition("}")[2]
+
+
+def _text(elem):
+    if len(elem):
+        return "".join(elem.itertext())
+    return elem.text or ""
+
+
+def _release(elem):
+    # Parsed elements are not needed again; keep the tree from growing
+    elem.clear()
+    while elem.getprevious() is not None:
+        del elem.getparent()[0]
+
+
+class ItemParser:
+    """Incremental parser making a ``{field: text}`` record of each ``Item`` element.
+
+    ``feed(chunk)`` accepts bytes as they arrive and returns the records of
+    the items that chunk completed; ``close()`` returns every record. Only
+    the ``fields`` children are kept, and each item is freed once read;
+    markup nested in a field is kept until then, so its text is read whole.
+    Tags match whatever namespace they are in.
+    """
+
+    def __init__(self, fields=ITEM_FIELDS, tag="Item"):
+        self.fields = set(fields)
+        self.tag = tag
+        self.records = []
+        # Items open around the current element; nothing inside one is freed early
+        self._open = 0
+        self._parser = etree.XMLPullParser(events=("start", "end"), recover=True, resolve_entities=False)
+
+    def _records(self):
+        records = []
+        for event, elem in self._parser.read_events():
+            is_item = _localname(elem) == self.tag
+            if event == "start":
+                self._open += is_item
+                continue
+            if is_item:
+                self._open -= 1
+                record = {}
+                for child in elem:
+                    name = _localname(child)
+                    if name in self.fields and name not in record:
+                        record[name] = _text(child)
+                records.append(record)
+            if not self._open:
+                _release(elem)
+        self.records.extend(records)
+        return records
+
+    def feed(self, chunk):
+        self._parser.feed(chunk)
+        return self._records()
+
+    def close(self):
+        try:
+            self._parser.close()
+        except etree.XMLSyntaxError:
+            pass  # Truncated or empty body; keep the items read so far
+        self._records()
+        return self.records
+
+
+class FieldParser:
+    """Incremental parser for the first occurrence of each of ``fields`` in a document.
+
+    A field's nested markup is kept until the field ends, so its text
+    includes that of its descendants. Tags match whatever namespace they
+    are in.
+    """
+
+    def __init__(self, fields=DETAIL_FIELDS):
+        self.fields = set(fields)
+        self.record = {}
+        # Fields open around the current element; nothing inside one is freed early
+        self._open = 0
+        self._parser = etree.XMLPullParser(events=("start", "end"), recover=True, resolve_entities=False)
+
+    def _read(self):
+        for event, elem in self._parser.read_events():
+            name = _localname(elem)
+            is_field = name in self.fields
+            if event == "start":
+                self._open += is_field
+                continue
+            if is_field:
+                self._open -= 1
+                if name not in self.record:
+                    self.record[name] = _text(elem)
+            if not self._open:
+                _release(elem)
+
+    def feed(self, chunk):
+        self._parser.feed(chunk)
+        self._read()
+
+    def close(self):
+        try:
+            self._parser.close()
+        except etree.XMLSyntaxError:
+            pass
+        self._read()
+        return self.record
+
+
+def parse_items(data, fields=ITEM_FIELDS):
+    """Item records of a whole feed page."""
+    parser = ItemParser(fields)
+    parser.feed(data)
+    return parser.close()
+
+
+def parse_fields(data, fields=DETAIL_FIELDS):
+    """Field record of a whole article detail document."""
+    parser = FieldParser(fields)
+    parser.feed(data)
+    return parser.close()
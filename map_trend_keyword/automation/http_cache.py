@@ -0,0 +1 @@
+../../shared/http_cache.py
\ No newline at end of file
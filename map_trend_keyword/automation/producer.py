@@ -1,13 +1,12 @@
-import requests  # type: ignore
+import asyncio
 import logging
-from bs4 import BeautifulSoup as bs  # type: ignore
-import time
-import html
-import re
-import socket
 import json
-from datetime import datetime, timedelta
+import os
 from kafka import KafkaProducer  # type: ignore
+from checkpoints import CheckpointStore
+from crawler import Crawler, make_client
+from dedupe import RotatingBloomFilter
+from http_cache import HTTPCache
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -46,127 +45,78 @@ LANGUAGE_SUBDOMAIN_MAPPING = {
     "Gujarati": "gujarati"
 }
 
-# HTTP Headers
-HEADERS = {
-    "User-Agent": "Mozilla/5.0",
-    "Accept-Language": "en-US,en;q=0.9",
-    "Connection": "keep-alive",
-}
-
-# Store previously fetched articles to avoid duplicates
-seen_articles = set()
-
-def call_xml(lnk: str, retries: int = 3) -> bs:
-    """Fetch XML data from a given link."""
-    for attempt in range(retries):
-        try:
-            response = requests.get(lnk, headers=HEADERS, timeout=10)
-            response.encoding = "utf-8"
-            if response.status_code == 200:
-                return bs(response.text, "xml")
-            else:
-                logging.error(f"Error fetching XML from {lnk}: Status Code {response.status_code}")
-        except (requests.exceptions.RequestException, socket.gaierror) as e:
-            logging.error(f"Error fetching XML from {lnk} (attempt {attempt + 1}/{retries}): {e}")
-            time.sleep(2)
-    return None
-
-def process_items(items, domain, language):
-    """Extract article details and clean content."""
-    articles = []
-    for item in items:
-        try:
-            link = item.find("Link").text if item.find("Link") else "No Link"
-            pubdate = item.find("PublishDate").text if item.find("PublishDate") else "No Publish Date"
-            category_elem = item.find("CategoryName")
-            category = category_elem.text.strip() if category_elem is not None and category_elem.text else "No Category"
-
-            content_elem = call_xml(link)
-            try:
-                article_id = content_elem.find("ContentId").text if content_elem.find("ContentId") else "No ID"
-                title = content_elem.find("Title").text if content_elem.find("Title") else "No Title"
-                content = content_elem.find("Content").text if content_elem.find("Content") else "No Content"
-                clean_content = re.sub(r"<.*?>|(&[^;]+;)", "", html.unescape(content)).replace('\\', " ")
-                content = re.sub(r'[\s]{2,}', ' ', clean_content)
-            except Exception as e:
-                article_id = f"Error: {e}"
-
-            if article_id in seen_articles:
-                continue  # Skip duplicate articles
-            seen_articles.add(article_id)
-
-            articles.append({
-                "publish_date": pubdate,
-                "category": category,
-                "web_url": link,
-                "ArticleID": article_id,
-                "title": title,
-                "content": content,
-                "domain": domain,
-                "language": language
-            })
-        except Exception as e:
-            logging.error(f"Error processing item: {e}")
-    return articles
-
-def fetch_articles(domain, language):
-    """Fetch articles for a specific domain and language from the past 60 days."""
-    try:
-        subdomain = LANGUAGE_SUBDOMAIN_MAPPING.get(language, "www")  # Default to "www" for English
-        site = f"{subdomain}.{domain}"
-        page_number = 1
-        articles = []
-        cutoff_date = datetime.now() - timedelta(days=2)
-
-        while True:
-            main_link = f"https://rss.oneindia.com/scripts/cms/newsFeed.php?type=dh-feed&sub_type=all&site={site}&limit=30&page={page_number}"
-            root = call_xml(main_link)
-            
-            if not root:
-                logging.error(f"Failed to fetch the XML feed for domain {domain}, language {language}, page {page_number}")
-                break
-            
-            items = root.find_all('Item')
-            if not items:
-                break  # Stop if no more items are found
-            
-            for item in items:
-                pubdate = item.find("PublishDate").text if item.find("PublishDate") else "No Publish Date"
-                try:
-                    article_date = datetime.strptime(pubdate, "%Y-%m-%d %H:%M:%S")
-                    if article_date < cutoff_date:
-                        return articles  # Stop fetching if article is older than 60 days
-                except ValueError:
-                    logging.warning(f"Skipping article with invalid date format: {pubdate}")
-                    continue
-                
-                articles.extend(process_items([item], domain, language))
-            
-            page_number += 1  # Move to the next page
-            logging.info(f"Fetched page {page_number} for domain {domain}, language {language}")
-            time.sleep(1)  # Avoid overwhelming the server
-        
-        return articles
-    except Exception as e:
-        logging.error(f"Error fetching data for domain {domain}, language {language}: {e}")
-    return []
+# Crawler settings: requests in flight overall, requests/second to any one host
+CRAWL_CONCURRENCY = 20
+PER_HOST_RATE = 20.0
+CRAWL_RETRIES = 3
+RETRY_BACKOFF = 1.0  # seconds; doubled per retry, with full jitter
+CUTOFF_DAYS = 2
+# Per-feed high-water marks, so a sweep (or a restart) only reads what is new
+CHECKPOINT_DB = os.path.join(os.path.dirname(os.path.abspath(__file__)), "crawler_checkpoints.db")
+# Sent ArticleIDs, remembered for longer than the cutoff within a fixed memory budget
+DEDUPE_SNAPSHOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "seen_articles.bloom")
+DEDUPE_CAPACITY = 1_000_000  # IDs per window
+DEDUPE_ERROR_RATE = 0.001
+DEDUPE_WINDOW = (CUTOFF_DAYS + 1) * 24 * 3600
+# Fetched feed pages and article XML, revalidated with ETag/Last-Modified instead of re-downloaded;
+# shared with the Flask app when interface/ is pointed at the same file (http_cache_path)
+HTTP_CACHE_DB = os.path.join(os.path.dirname(os.path.abspath(__file__)), "http_cache.db")
+HTTP_CACHE_MAX_BYTES = 256 * 2**20
+HTTP_CACHE_TTL = 24 * 3600  # seconds an article XML without validators is reused; feed pages never are
+
+FEEDS = [(domain, language) for domain, languages in DOMAIN_LANGUAGE_MAPPING.items() for language in languages]
 
 def kafka_produce(articles):
     """Send articles to Kafka."""
     for article in articles:
         producer.send(KAFKA_TOPIC, article)
         logging.info(f"Sent to Kafka: {article['domain']} -{article['language']}- {article['ArticleID']}")
+    # Delivered before the feed's checkpoint moves past them
+    producer.flush()
+
+def log_sweep(stats, cache_stats):
+    logging.info(
+        f"Sweep done: {stats['articles']} articles from {stats['feeds']} feeds "
+        f"({stats['pages']} pages, {stats['requests']} requests, {stats['skipped']} known items skipped) in {stats['seconds']:.1f}s, "
+        f"{stats['articles_per_second']:.1f} articles/s"
+    )
+    logging.info(
+        f"HTTP cache since start: {cache_stats['hits']} hits, {cache_stats['not_modified']} not modified, "
+        f"{cache_stats['misses']} downloads, {cache_stats['evictions']} evicted, {cache_stats['bytes'] / 2**20:.1f} MiB"
+    )
+
+async def run(once=False):
+    """Sweep every feed into Kafka every 5 minutes over one keep-alive client."""
+    async with make_client(CRAWL_CONCURRENCY) as client:
+        # Seen ArticleIDs carry over between sweeps and restarts
+        seen_articles = RotatingBloomFilter(
+            capacity=DEDUPE_CAPACITY, error_rate=DEDUPE_ERROR_RATE, window=DEDUPE_WINDOW, path=DEDUPE_SNAPSHOT
+        )
+        http_cache = HTTPCache(HTTP_CACHE_DB, max_bytes=HTTP_CACHE_MAX_BYTES, default_ttl=HTTP_CACHE_TTL)
+        crawler = Crawler(
+            client,
+            concurrency=CRAWL_CONCURRENCY,
+            per_host_rate=PER_HOST_RATE,
+            retries=CRAWL_RETRIES,
+            backoff=RETRY_BACKOFF,
+            cutoff_days=CUTOFF_DAYS,
+            subdomains=LANGUAGE_SUBDOMAIN_MAPPING,
+            checkpoints=CheckpointStore(CHECKPOINT_DB),
+            seen_articles=seen_articles,
+            http_cache=http_cache,
+        )
+        while True:
+            stats = await crawler.sweep(FEEDS, on_articles=kafka_produce)
+            seen_articles.snapshot()
+            log_sweep(stats, http_cache.stats())
+            if once:
+                return stats
+            await asyncio.sleep(300)  # Run every 5 minutes
 
 def main():
-    """Fetch articles for all domains and languages and send them to Kafka."""
-    for domain, languages in DOMAIN_LANGUAGE_MAPPING.items():
-        for language in languages:
-            articles = fetch_articles(domain, language)
-            if articles:
-                kafka_produce(articles)
+    """Fetch articles for all domains and languages once and send them to Kafka."""
+    return asyncio.run(run(once=True))
 
 
 if __name__ == "__main__":
-    while True:
-        main()
-        time.sleep(300)  # Run every 5 minutes
\ No newline at end of file
+    asyncio.run(run())
@@ -0,0 +1,43 @@
+from datetime import datetime, timedelta
+from checkpoints import CheckpointStore
+
+NOW = datetime(2024, 5, 6, 12, 0, 0)
+
+
+def at(minutes_ago):
+    return NOW - timedelta(minutes=minutes_ago)
+
+
+def test_mark_moves_to_the_newest_handled_item(tmp_path):
+    store = CheckpointStore(str(tmp_path / "checkpoints.db"))
+    store.advance("a.test", "English", None, [(at(0), "k0"), (at(0), "k1"), (at(5), "k2")], [])
+    assert store.get("a.test", "English") == (at(0), {"k0", "k1"})
+
+    # Same newest timestamp next sweep: the keys already at it are kept
+    store.advance("a.test", "English", store.get("a.test", "English"), [(at(0), "k3")], [])
+    assert store.get("a.test", "English") == (at(0), {"k0", "k1", "k3"})
+
+
+def test_mark_stops_at_the_oldest_failed_detail_fetch(tmp_path):
+    store = CheckpointStore(str(tmp_path / "checkpoints.db"))
+    store.advance("a.test", "English", None, [(at(0), "k0"), (at(10), "k2")], [at(5)])
+    assert store.get("a.test", "English") == (at(5), {"k0"})
+
+
+def test_failed_page_keeps_the_previous_mark(tmp_path):
+    store = CheckpointStore(str(tmp_path / "checkpoints.db"))
+    store.set("a.test", "English", at(60), {"old"})
+    mark = store.get("a.test", "English")
+
+    store.advance("a.test", "English", mark, [(at(0), "k0"), (at(5), "k1")], [], floor=at(60))
+    assert store.get("a.test", "English") == (at(60), {"old", "k0", "k1"})
+
+    # Nothing read before the failure: nothing to record
+    store.advance("a.test", "English", store.get("a.test", "English"), [], [], floor=at(60))
+    assert store.get("a.test", "English") == (at(60), {"old", "k0", "k1"})
+
+
+def test_failed_page_without_a_mark_falls_back_to_the_cutoff(tmp_path):
+    store = CheckpointStore(str(tmp_path / "checkpoints.db"))
+    store.advance("a.test", "English", None, [(at(0), "k0")], [at(3)], floor=at(2 * 24 * 60))
+    assert store.get("a.test", "English") == (at(2 * 24 * 60), {"k0"})
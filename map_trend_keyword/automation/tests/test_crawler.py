@@ -0,0 +1,88 @@
+import asyncio
+import time
+from datetime import datetime, timedelta
+import httpx  # type: ignore
+from checkpoints import CheckpointStore
+from crawler import Crawler
+
+FEED_URL = "http://feeds.test/feed?site={site}&page={page}"
+
+
+def handler(request):
+    if request.url.path == "/feed":
+        if request.url.params["page"] != "1":
+            return httpx.Response(200, content=b"<Items></Items>")
+        site = request.url.params["site"]
+        date = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        items = "".join(
+            f"<Item><ContentId>{site}-{n}</ContentId><Link>http://feeds.test/article/{site}/{n}</Link>"
+            f"<PublishDate>{date}</PublishDate></Item>"
+            for n in range(3)
+        )
+        return httpx.Response(200, content=f"<Items>{items}</Items>".encode("utf-8"))
+    n = request.url.path.rsplit("/", 1)[1]
+    site = request.url.path.split("/")[2]
+    return httpx.Response(200, content=f"<Items><ContentId>{site}-{n}</ContentId><Title>t</Title></Items>".encode("utf-8"))
+
+
+async def sweep(feeds, on_articles):
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        crawler = Crawler(client, per_host_rate=0, feed_url=FEED_URL)
+        return await crawler.sweep(feeds, on_articles=on_articles)
+
+
+def test_blocking_on_articles_does_not_stall_other_feeds():
+    feeds = [(f"site{n}.test", "English") for n in range(5)]
+    sent = []
+
+    def on_articles(articles):
+        time.sleep(0.3)  # A slow synchronous hand-off, like a Kafka flush
+        sent.extend(article["ArticleID"] for article in articles)
+
+    start = time.perf_counter()
+    stats = asyncio.run(sweep(feeds, on_articles))
+    elapsed = time.perf_counter() - start
+    assert stats["articles"] == 15
+    assert sorted(sent) == sorted(f"www.site{n}.test-{i}" for n in range(5) for i in range(3))
+    # Serialised on the event loop this would take at least 5 x 0.3s
+    assert elapsed < 1.0
+
+
+def test_items_after_a_failed_page_are_crawled_next_sweep(tmp_path):
+    now = datetime.now()
+    pages = {
+        page: "".join(
+            f"<Item><ContentId>{n}</ContentId><Link>http://feeds.test/article/www.site.test/{n}</Link>"
+            f"<PublishDate>{(now - timedelta(minutes=n)).strftime('%Y-%m-%d %H:%M:%S')}</PublishDate></Item>"
+            for n in range(3 * (page - 1), 3 * page)
+        )
+        for page in (1, 2)
+    }
+    failures = {"2": 1}
+
+    def paged_handler(request):
+        if request.url.path != "/feed":
+            return handler(request)
+        page = request.url.params["page"]
+        if failures.get(page):
+            failures[page] -= 1
+            return httpx.Response(404)
+        return httpx.Response(200, content=f"<Items>{pages.get(int(page), '')}</Items>".encode("utf-8"))
+
+    async def run(checkpoints):
+        swept = []
+        async with httpx.AsyncClient(transport=httpx.MockTransport(paged_handler)) as client:
+            crawler = Crawler(client, per_host_rate=0, feed_url=FEED_URL, checkpoints=checkpoints)
+            for _ in range(2):
+                articles = []
+                await crawler.sweep([("site.test", "English")], on_articles=articles.extend)
+                swept.append(sorted(article["ArticleID"] for article in articles))
+        return swept, crawler.skipped
+
+    checkpoints = CheckpointStore(str(tmp_path / "checkpoints.db"))
+    swept, skipped = asyncio.run(run(checkpoints))
+    assert swept == [["www.site.test-0", "www.site.test-1", "www.site.test-2"],
+                     ["www.site.test-3", "www.site.test-4", "www.site.test-5"]]
+    # Page 1 is read again, but its items' details are not fetched twice
+    assert skipped == 3
+    assert checkpoints.get("site.test", "English")[0] == now.replace(microsecond=0)
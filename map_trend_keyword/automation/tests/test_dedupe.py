@@ -0,0 +1,91 @@
+from dedupe import RotatingBloomFilter
+
+
+class Clock:
+    def __init__(self, now=0.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def started_at(bloom):
+    return [generation[0] for generation in bloom.generations]
+
+
+def test_generations_rotate_on_schedule():
+    clock = Clock()
+    # A new generation every 20s, each remembered for 60s
+    bloom = RotatingBloomFilter(capacity=3000, error_rate=1e-6, window=60, generations=3, clock=clock)
+    bloom.add("first")
+    clock.now = 19
+    bloom.add("second")
+    assert started_at(bloom) == [0]
+
+    clock.now = 20
+    bloom.add("third")
+    clock.now = 40
+    bloom.add("fourth")
+    assert started_at(bloom) == [0, 20, 40]
+    assert all(key in bloom for key in ("first", "second", "third", "fourth"))
+
+    # The first generation expires a full window after it started
+    clock.now = 60
+    assert "third" in bloom
+    assert started_at(bloom) == [20, 40, 60]
+    assert "first" not in bloom and "second" not in bloom
+    assert len(bloom) == 2
+
+
+def test_full_generation_rotates_early_and_drops_the_oldest():
+    clock = Clock()
+    bloom = RotatingBloomFilter(capacity=30, error_rate=1e-6, window=3600, generations=3, clock=clock)
+    assert bloom.generation_capacity == 10
+    for n in range(25):
+        assert bloom.add(f"id-{n}")
+    assert [count for _, count, _ in bloom.generations] == [10, 10, 5]
+
+    for n in range(25, 32):
+        bloom.add(f"id-{n}")
+    # id-30 started a fourth generation, pushing out the first long before its window ended
+    assert [count for _, count, _ in bloom.generations] == [10, 10, 2]
+    assert not any(f"id-{n}" in bloom for n in range(10))
+    assert all(f"id-{n}" in bloom for n in range(10, 32))
+    assert bloom.memory_ceiling == bloom.num_bits
+
+
+def test_no_false_negatives_within_the_window():
+    clock = Clock()
+    bloom = RotatingBloomFilter(capacity=5000, error_rate=0.01, window=600, generations=6, clock=clock)
+    keys = [f"article-{n}" for n in range(4000)]
+    # Added over the last 500s, everything the window guarantees to remember
+    for n, key in enumerate(keys):
+        clock.now = n * 500 / len(keys)
+        bloom.add(key)
+    clock.now = 500
+    assert all(key in bloom for key in keys)
+    assert not bloom.add(keys[0])
+
+
+def test_snapshot_round_trip_drops_expired_generations(tmp_path):
+    path = str(tmp_path / "seen.bloom")
+    clock = Clock()
+    bloom = RotatingBloomFilter(capacity=3000, error_rate=1e-6, window=60, generations=3, path=path, clock=clock)
+    for now, keys in ((0, ["a1", "a2"]), (25, ["b1"]), (45, ["c1", "c2"])):
+        clock.now = now
+        for key in keys:
+            bloom.add(key)
+    bloom.snapshot()
+
+    # Restarted after the first generation's window ended
+    restored = RotatingBloomFilter(
+        capacity=3000, error_rate=1e-6, window=60, generations=3, path=path, clock=Clock(70)
+    )
+    assert started_at(restored) == [25, 45, 70]  # plus a fresh one, the newest being stale
+    assert len(restored) == 3
+    assert all(key in restored for key in ("b1", "c1", "c2"))
+    assert "a1" not in restored and "a2" not in restored
+
+    # A snapshot sized for another capacity is ignored
+    resized = RotatingBloomFilter(capacity=9000, error_rate=1e-6, window=60, generations=3, path=path, clock=Clock(70))
+    assert len(resized) == 0 and "b1" not in resized
@@ -0,0 +1,59 @@
+from feed_parser import FieldParser, ItemParser, parse_fields, parse_items
+
+NESTED_DETAIL = (
+    b'<?xml version="1.0" encoding="UTF-8"?><Items><Item><ContentId>7</ContentId>'
+    b"<Title>T <b>bold</b> x</Title><Content><p>Hello</p> world <i>more</i></Content></Item></Items>"
+)
+
+
+def streamed(parser, data, chunk_size):
+    for start in range(0, len(data), chunk_size):
+        parser.feed(data[start:start + chunk_size])
+    return parser.close()
+
+
+def test_fields_keep_text_of_nested_markup():
+    assert parse_fields(NESTED_DETAIL) == {"ContentId": "7", "Title": "T bold x", "Content": "Hello world more"}
+
+
+def test_fields_streamed_in_small_chunks():
+    for chunk_size in (1, 7, 64):
+        assert streamed(FieldParser(), NESTED_DETAIL, chunk_size)["Content"] == "Hello world more"
+
+
+def test_fields_in_a_default_namespace():
+    data = b'<Root xmlns="http://a"><Item><ContentId>1</ContentId><Title>t <b>b</b></Title></Item></Root>'
+    assert parse_fields(data) == {"ContentId": "1", "Title": "t b"}
+
+
+def test_first_occurrence_of_a_field_wins():
+    assert parse_fields(b"<Items><Title>first</Title><Title>second</Title></Items>") == {"Title": "first"}
+
+
+def test_items_keep_text_of_nested_markup():
+    data = (
+        b"<Items><Item><ContentId>1</ContentId><Link>https://a/<b>1</b></Link>"
+        b"<CategoryName> News <!-- c --></CategoryName></Item>"
+        b"<Item><ContentId>2</ContentId><Extra><Link>ignored</Link></Extra></Item></Items>"
+    )
+    assert parse_items(data) == [
+        {"ContentId": "1", "Link": "https://a/1", "CategoryName": " News "},
+        {"ContentId": "2"},
+    ]
+
+
+def test_items_in_a_default_namespace():
+    data = b'<Items xmlns="http://a"><Item><Link>l</Link><PublishDate>2024-05-01 10:00:00</PublishDate></Item></Items>'
+    assert parse_items(data) == [{"Link": "l", "PublishDate": "2024-05-01 10:00:00"}]
+
+
+def test_feed_returns_only_the_items_a_chunk_completed():
+    parser = ItemParser()
+    assert parser.feed(b"<Items><Item><Link>a</Link></Item><Item><Link>") == [{"Link": "a"}]
+    assert parser.feed(b"b</Link></Item></Items>") == [{"Link": "b"}]
+    assert parser.close() == [{"Link": "a"}, {"Link": "b"}]
+
+
+def test_truncated_body_keeps_the_items_read():
+    # The cut-off item is closed by recovery, without the field it was in
+    assert parse_items(b"<Items><Item><Link>a</Link></Item><Item><Li") == [{"Link": "a"}, {}]
@@ -0,0 +1,78 @@
+import asyncio
+import httpx  # type: ignore
+from crawler import Crawler
+from feed_parser import FieldParser, ItemParser
+from http_cache import HTTPCache
+
+LAST_MODIFIED = "Mon, 01 Jan 2024 00:00:00 GMT"
+
+
+def make_handler(requests):
+    def handler(request):
+        requests.append((request.url.path, request.headers.get("If-None-Match"), request.headers.get("If-Modified-Since")))
+        if request.url.path == "/etag":
+            if request.headers.get("If-None-Match") == '"v1"':
+                return httpx.Response(304, headers={"ETag": '"v1"'})
+            return httpx.Response(200, headers={"ETag": '"v1"'}, content=b"<Items><Title>A</Title></Items>")
+        if request.url.path == "/last-modified":
+            if request.headers.get("If-Modified-Since") == LAST_MODIFIED:
+                return httpx.Response(304)
+            return httpx.Response(200, headers={"Last-Modified": LAST_MODIFIED}, content=b"<Items><Title>B</Title></Items>")
+        if request.url.path == "/max-age":
+            return httpx.Response(200, headers={"Cache-Control": "max-age=60"}, content=b"<Items><Title>C</Title></Items>")
+        return httpx.Response(200, content=b"<Items><Item><Link>x</Link></Item></Items>")
+    return handler
+
+
+async def fetch_twice(cache, requests):
+    results = []
+    async with httpx.AsyncClient(transport=httpx.MockTransport(make_handler(requests))) as client:
+        crawler = Crawler(client, per_host_rate=0, http_cache=cache)
+        for _ in range(2):
+            results.append([
+                await crawler.fetch_xml("http://feeds.test/etag", FieldParser),
+                await crawler.fetch_xml("http://feeds.test/last-modified", FieldParser),
+                await crawler.fetch_xml("http://feeds.test/max-age", FieldParser),
+                await crawler.fetch_xml("http://feeds.test/plain", FieldParser),
+                await crawler.fetch_xml("http://feeds.test/feed", ItemParser, ttl=0),
+            ])
+    return results
+
+
+def test_revalidates_reuses_and_refetches(tmp_path):
+    cache = HTTPCache(str(tmp_path / "http_cache.db"), default_ttl=100)
+    requests = []
+    first, second = asyncio.run(fetch_twice(cache, requests))
+    assert first == second == [{"Title": "A"}, {"Title": "B"}, {"Title": "C"}, {}, [{"Link": "x"}]]
+    # Second round: validators sent back, max-age and TTL entries not requested, ttl=0 refetched
+    assert requests[5:] == [
+        ("/etag", '"v1"', None),
+        ("/last-modified", None, LAST_MODIFIED),
+        ("/feed", None, None),
+    ]
+    stats = cache.stats()
+    assert (stats["hits"], stats["not_modified"], stats["misses"]) == (2, 2, 6)
+
+
+def test_cache_survives_reopening(tmp_path):
+    path = str(tmp_path / "http_cache.db")
+    HTTPCache(path).store("http://feeds.test/a", {"ETag": '"v1"'}, b"body")
+    entry = HTTPCache(path).lookup("http://feeds.test/a")
+    assert entry.body == b"body" and not entry.fresh
+    assert HTTPCache(path).validators(entry) == {"If-None-Match": '"v1"'}
+
+
+def test_no_store_is_not_kept(tmp_path):
+    cache = HTTPCache(str(tmp_path / "http_cache.db"))
+    cache.store("http://feeds.test/a", {"Cache-Control": "no-store"}, b"body")
+    assert cache.lookup("http://feeds.test/a") is None
+
+
+def test_evicts_least_recently_used_past_max_bytes(tmp_path):
+    cache = HTTPCache(str(tmp_path / "http_cache.db"), max_bytes=1000)
+    for n in range(50):
+        cache.store(f"http://feeds.test/{n}", {}, b"x" * 100)
+    stats = cache.stats()
+    assert stats["bytes"] <= 1000 and stats["evictions"] == 40
+    assert cache.lookup("http://feeds.test/0") is None
+    assert cache.lookup("http://feeds.test/49") is not None
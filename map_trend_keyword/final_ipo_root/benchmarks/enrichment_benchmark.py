@@ -0,0 +1,202 @@
+"""Throughput of the Kafka enrichment stage with 1..N consumer-group members.
+
+Publishes the benchmark corpus (repeated --copies times, shaped like
+automation/producer.py records) to an in-memory ``trend_capture`` topic and
+drains it with each requested number of ``EnrichmentWorker`` threads in one
+consumer group. NER is replayed by ``record_ner.load_recording`` (the stub's
+synthetic responses unless a TorchServe recording has been made) with
+--ner-latency-ms of simulated TorchServe latency per call; the
+classifier, matcher and reranker run in-process. Every run checks that each
+article reached the output topic and the group's lag is zero.
+
+A final run makes the first publish of every batch fail and checks that no
+offset is committed before the batch's enriched records are produced. Run
+from the project root:
+
+    python -m benchmarks.enrichment_benchmark --members 1 2 4 --rows 50000
+
+Members are threads here, so CPU-bound stages share one interpreter; real
+deployments scale with one process per member.
+"""
+import argparse
+import asyncio
+import json
+import threading
+import time
+from collections import Counter
+from benchmarks.pipeline_benchmark import NerReplay
+from benchmarks.record_ner import describe_source, load_recording
+from benchmarks.synthetic_data import company_records
+from src.services import bm25_index as bm25_module
+from src.services import entity_extractor
+from src.services.classifier import load_classifier
+from src.services.company_snapshot import CompanySnapshot, snapshot_manager
+from src.services.enrichment import EnrichmentWorker
+from tests.memory_kafka import InMemoryBroker, InMemoryConsumer, InMemoryProducer
+from src.utils.location_utils import load_gazetteer
+
+INPUT_TOPIC = "trend_capture"
+OUTPUT_TOPIC = "trend_enriched"
+
+
+class SlowReplay(NerReplay):
+    """Replayed NER responses with a fixed per-call latency."""
+
+    def __init__(self, responses, latency):
+        super().__init__(responses)
+        self.latency = latency
+
+    async def __call__(self, article_content):
+        await asyncio.sleep(self.latency)
+        return await super().__call__(article_content)
+
+
+class FailFirstSendProducer(InMemoryProducer):
+    """Fails the first send of every batch."""
+
+    def __init__(self, broker, **kwargs):
+        super().__init__(broker, **kwargs)
+        self.fail_next = True
+        self.failures = 0
+
+    def send(self, topic, value=None, key=None):
+        if self.fail_next:
+            self.fail_next = False
+            self.failures += 1
+            raise RuntimeError("simulated broker error")
+        return super().send(topic, value=value, key=key)
+
+    def flush(self, timeout=None):
+        self.fail_next = True
+
+
+def json_producer(producer_class, broker):
+    return producer_class(
+        broker,
+        key_serializer=lambda k: str(k).encode("utf-8"),
+        value_serializer=lambda v: json.dumps(v).encode("utf-8"),
+    )
+
+
+def publish_corpus(broker, articles, copies):
+    producer = json_producer(InMemoryProducer, broker)
+    count = 0
+    for copy in range(copies):
+        for position, article in enumerate(articles):
+            record = {
+                "ArticleID": f"{copy}-{position}",
+                "title": article["title"],
+                "content": article["content"],
+                "category": "business",
+                "web_url": f"https://example.com/{copy}/{position}",
+                "domain": "example.com",
+                "language": "en",
+                "publish_date": "2024-01-01 00:00:00",
+            }
+            producer.send(INPUT_TOPIC, value=record, key=record["ArticleID"])
+            count += 1
+    return count
+
+
+def make_worker(broker, group_id, batch_size, producer=None):
+    consumer = InMemoryConsumer(
+        INPUT_TOPIC, broker=broker, group_id=group_id,
+        value_deserializer=lambda v: json.loads(v.decode("utf-8")) if v else None,
+    )
+    if producer is None:
+        producer = json_producer(InMemoryProducer, broker)
+    return EnrichmentWorker(
+        consumer, producer, output_topic=OUTPUT_TOPIC, batch_size=batch_size,
+        poll_timeout_ms=200, retry_backoff=0,
+    )
+
+
+def check_output(broker, group_id, expected):
+    published = Counter(json.loads(value)["ArticleID"] for value in broker.messages(OUTPUT_TOPIC))
+    lag = broker.lag(group_id, INPUT_TOPIC)
+    if len(published) != expected or lag:
+        raise SystemExit(f"{len(published)} of {expected} articles published, lag {lag}")
+    return sum(published.values()) - len(published)
+
+
+def run_group(articles, members, copies, batch_size, partitions):
+    broker = InMemoryBroker(partitions=partitions)
+    total = publish_corpus(broker, articles, copies)
+    group_id = f"benchmark-{members}"
+    workers = [make_worker(broker, group_id, batch_size) for _ in range(members)]
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=worker.run, kwargs={"max_idle_polls": 2}) for worker in workers]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    for worker in workers:
+        worker.close()
+
+    duplicates = check_output(broker, group_id, total)
+    return {
+        "members": members,
+        "articles": total,
+        "seconds": round(elapsed, 3),
+        "articles_per_s": round(total / elapsed, 1),
+        "per_member": [worker.enriched for worker in workers],
+        "duplicates": duplicates,
+    }
+
+
+def check_commit_after_produce(articles, batch_size):
+    broker = InMemoryBroker(partitions=2)
+    total = publish_corpus(broker, articles, 1)
+    group_id = "benchmark-failures"
+    producer = json_producer(FailFirstSendProducer, broker)
+    worker = make_worker(broker, group_id, batch_size, producer)
+    while broker.lag(group_id, INPUT_TOPIC):
+        committed_before = total - broker.lag(group_id, INPUT_TOPIC)
+        published_before = len(broker.messages(OUTPUT_TOPIC))
+        worker.run_once()
+        committed = total - broker.lag(group_id, INPUT_TOPIC)
+        # Offsets may only move past records whose output is already on the topic
+        if committed - committed_before > len(broker.messages(OUTPUT_TOPIC)) - published_before:
+            raise SystemExit("offsets committed before the enriched batch was produced")
+    worker.close()
+    check_output(broker, group_id, total)
+    return producer.failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--members", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--rows", type=int, default=50000, help="synthetic company master size")
+    parser.add_argument("--copies", type=int, default=5, help="times the corpus is published")
+    parser.add_argument("--partitions", type=int, default=8)
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--ner-latency-ms", type=float, default=50.0)
+    args = parser.parse_args()
+
+    recording = load_recording()
+    articles = recording["articles"]
+    entity_extractor.generate_entities = SlowReplay(recording["responses"], args.ner_latency_ms / 1000)
+    # Nothing is written to ./data
+    bm25_module.SAVE_EVERY = float("inf")
+
+    load_classifier()
+    load_gazetteer()
+    snapshot_manager.install(CompanySnapshot.from_records(company_records(args.rows)))
+
+    print(f"NER responses: {describe_source(recording)}")
+    print(f"{'members':>8} {'articles':>9} {'seconds':>8} {'articles/s':>11} {'duplicates':>11}  per member")
+    for members in args.members:
+        result = run_group(articles, members, args.copies, args.batch_size, args.partitions)
+        print(
+            f"{result['members']:>8} {result['articles']:>9} {result['seconds']:>8.2f} "
+            f"{result['articles_per_s']:>11.1f} {result['duplicates']:>11}  {result['per_member']}"
+        )
+
+    failures = check_commit_after_produce(articles, args.batch_size)
+    print(f"commit-after-produce: ok ({failures} failed publishes retried, nothing lost)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""classify_location before and after the gazetteer: cost per entity and match rate.
+
+Runs the legacy pgeocode/pycountry lookup and the gazetteer over the same
+entities (the sample list below plus every entity in the replayed NER
+responses) and reports the time per entity and how many entities each one
+locates, where they agree and which entities only one of them locates. The
+gazetteer is built from the same pgeocode dataset the legacy lookup reads,
+so both sides see the same places. Needs the pgeocode India dataset (it is
+downloaded on first use). Run from the project root (where config.yaml
+lives):
+
+    python -m benchmarks.location_benchmark --output ./data/location_benchmark.json
+"""
+import argparse
+import json
+import os
+import time
+import pandas as pd  # type:ignore
+from benchmarks.record_ner import describe_source, load_recording, ner_texts, payload_key
+from src.services.entity_extractor import merge_chunk_entities
+from src.utils import location_utils
+
+SAMPLE_ENTITIES = [
+    "tata steel", "hindalco", "jsw steel", "china", "nifty 50", "mumbai",
+    "reliance industries", "karnataka", "sebi", "hdfc bank", "pune",
+    "united states", "infosys", "bse", "adani ports", "india", "lic",
+    "new delhi", "zomato", "kerala", "bajaj finance", "usa", "ongc", "goa",
+]
+
+
+def legacy_classifier():
+    """The pre-gazetteer implementation, kept here for comparison only."""
+    import pgeocode  # type: ignore
+    import pycountry  # type: ignore
+
+    nomi_in = pgeocode.Nominatim("IN")
+
+    def is_country(name):
+        try:
+            return pycountry.countries.lookup(name) is not None
+        except LookupError:
+            return False
+
+    def classify_location(name):
+        name = name.strip().title()
+        if is_country(name):
+            return "True"
+        india_result = nomi_in.query_location(name)
+        if not india_result.empty and pd.notna(india_result.iloc[0]["state_name"]):
+            return "True"
+        return "False"
+
+    return classify_location
+
+
+def time_per_entity(func, entities, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for entity in entities:
+            func(entity)
+    return (time.perf_counter() - start) / (repeat * len(entities))
+
+
+def recorded_entities(recording):
+    """Distinct entity names of the replayed NER responses, as the matcher sees them."""
+    names = set()
+    for article in recording["articles"]:
+        extracted = merge_chunk_entities(
+            [recording["responses"].get(payload_key(text)) for text in ner_texts(article)]
+        )
+        if extracted:
+            names.update(name.strip().lower() for name in extracted.get("html_chunk_2", {}))
+    return sorted(names)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="also write the results as JSON")
+    args = parser.parse_args()
+
+    recording = load_recording()
+    entities = sorted(set(SAMPLE_ENTITIES) | set(recorded_entities(recording)))
+
+    legacy = legacy_classifier()
+    legacy_cost = time_per_entity(legacy, entities, args.repeat)
+
+    start = time.perf_counter()
+    location_utils._gazetteer = location_utils.build_gazetteer()
+    build_cost = time.perf_counter() - start
+
+    # Cold: every lookup misses the LRU and hits the frozenset
+    lookup = location_utils.classify_location.__wrapped__
+    cold_cost = time_per_entity(lookup, entities, args.repeat)
+
+    location_utils.classify_location.cache_clear()
+    warm_cost = time_per_entity(location_utils.classify_location, entities, args.repeat)
+
+    before = {entity: legacy(entity) == "True" for entity in entities}
+    after = {entity: lookup(entity) == "True" for entity in entities}
+    legacy_only = [entity for entity in entities if before[entity] and not after[entity]]
+    gazetteer_only = [entity for entity in entities if after[entity] and not before[entity]]
+    agreed = len(entities) - len(legacy_only) - len(gazetteer_only)
+
+    print(f"NER responses: {describe_source(recording)}")
+    print(f"entities: {len(entities)} distinct ({len(SAMPLE_ENTITIES)} samples + NER fixture) x {args.repeat}")
+    print(f"{'':<28}{'us/entity':>12}{'located':>10}{'rate':>8}")
+    for label, cost, located in (
+        ("before: pgeocode/pycountry", legacy_cost, before),
+        ("after: gazetteer set", cold_cost, after),
+        ("after: gazetteer LRU hit", warm_cost, after),
+    ):
+        count = sum(located.values())
+        print(f"{label:<28}{cost * 1e6:>12.1f}{count:>10}{count / len(entities):>8.1%}")
+    print(f"gazetteer build: {build_cost:.2f}s, {len(location_utils._gazetteer)} names")
+    print(f"speedup: {legacy_cost / max(cold_cost, 1e-9):.0f}x")
+    print(f"agreement: {agreed}/{len(entities)} ({agreed / len(entities):.1%})")
+    # pgeocode matched any place *containing* the name as a substring
+    print(f"located before only ({len(legacy_only)}): {', '.join(legacy_only[:30]) or '-'}")
+    print(f"located after only ({len(gazetteer_only)}): {', '.join(gazetteer_only[:30]) or '-'}")
+
+    if args.output:
+        directory = os.path.dirname(args.output)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump({
+                "entities": len(entities),
+                "repeat": args.repeat,
+                "us_per_entity": {
+                    "legacy": legacy_cost * 1e6, "gazetteer": cold_cost * 1e6, "gazetteer_cached": warm_cost * 1e6,
+                },
+                "located": {"legacy": sum(before.values()), "gazetteer": sum(after.values())},
+                "agreement": agreed / len(entities),
+                "legacy_only": legacy_only,
+                "gazetteer_only": gazetteer_only,
+            }, file, indent=2)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""Resident memory per worker for a company snapshot of a given size.
+
+Builds a synthetic company master, persists its snapshot, then starts
+``--workers`` independent interpreters (spawned, like ``uvicorn --workers``)
+that each load the snapshot and match the benchmark corpus. Every worker
+reports its RSS, PSS (shared pages split between the processes mapping
+them) and private memory while all of them are alive. Run from the project
+root (Linux only, reads /proc/self/smaps_rollup):
+
+    python -m benchmarks.memory_benchmark --rows 500000 --workers 4
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import tempfile
+
+
+def memory_mb():
+    """RSS, PSS and private memory of this process, in MB."""
+    fields = {}
+    with open("/proc/self/smaps_rollup", "r") as file:
+        for line in file:
+            parts = line.split()
+            if len(parts) >= 3 and parts[1].isdigit():
+                fields[parts[0].rstrip(":")] = int(parts[1]) / 1024
+    return {
+        "rss_mb": round(fields.get("Rss", 0.0), 1),
+        "pss_mb": round(fields.get("Pss", 0.0), 1),
+        "private_mb": round(fields.get("Private_Clean", 0.0) + fields.get("Private_Dirty", 0.0), 1),
+    }
+
+
+def worker(path, barrier, results):
+    from benchmarks.record_ner import load_recording, ner_texts, payload_key
+    from src.services.company_snapshot import CompanySnapshot
+    from src.services.entity_extractor import merge_chunk_entities
+    from src.services.matcher import find_matches
+
+    recording = load_recording()
+    extracted = [
+        merge_chunk_entities([recording["responses"].get(payload_key(t)) for t in ner_texts(a)])
+        for a in recording["articles"]
+    ]
+    before = memory_mb()
+
+    snapshot = CompanySnapshot.load(path)
+    for data in extracted:
+        if data:
+            find_matches(data, snapshot)
+
+    # Measure while every worker holds its snapshot, so PSS shows sharing
+    barrier.wait()
+    after = memory_mb()
+    results.put({"pid": os.getpid(), "before_load": before, "after_matching": after})
+    barrier.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=500000)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--output", help="also write the results as JSON")
+    args = parser.parse_args()
+
+    from benchmarks.synthetic_data import company_records
+    from src.services.company_snapshot import SNAPSHOT_PATH, CompanySnapshot
+
+    snapshot = CompanySnapshot.from_records(company_records(args.rows))
+    directory = tempfile.mkdtemp(prefix="company-snapshot-")
+    path = os.path.join(directory, os.path.basename(SNAPSHOT_PATH))
+    snapshot.save(path)
+    del snapshot
+    print(f"{args.rows} rows, snapshot file {os.path.getsize(path) / 2**20:.1f} MB")
+
+    context = multiprocessing.get_context("spawn")
+    barrier = context.Barrier(args.workers)
+    results = context.Queue()
+    processes = [context.Process(target=worker, args=(path, barrier, results)) for _ in range(args.workers)]
+    for process in processes:
+        process.start()
+    reports = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    os.remove(path)
+    os.rmdir(directory)
+
+    print(f"{'pid':>8} {'rss MB':>9} {'pss MB':>9} {'private MB':>11} {'rss delta MB':>13}")
+    for report in reports:
+        after, before = report["after_matching"], report["before_load"]
+        print(
+            f"{report['pid']:>8} {after['rss_mb']:>9.1f} {after['pss_mb']:>9.1f} "
+            f"{after['private_mb']:>11.1f} {after['rss_mb'] - before['rss_mb']:>13.1f}"
+        )
+    total_pss = sum(report["after_matching"]["pss_mb"] for report in reports)
+    print(f"total PSS across {args.workers} workers: {total_pss:.1f} MB")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump({"rows": args.rows, "workers": args.workers, "workers_memory": reports}, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+"""Latency and throughput of the extraction pipeline, stage by stage.
+
+Times is_finance_article, preprocess_text, find_matches, bm25_rerank_matches
+and the full POST /extract-entities/ route (in-process ASGI client, NER
+replayed by ``record_ner.load_recording``) against synthetic company masters
+of each requested size. Unless a real TorchServe recording has been made
+with ``record_ner --url``, the NER responses are the stub's synthetic ones,
+so the route timings exercise the stub's output shape, not a model's; the
+report says which. Run from the project root:
+
+    python -m benchmarks.pipeline_benchmark --sizes 5000 50000 500000
+    python -m benchmarks.pipeline_benchmark --sizes 5000 --baseline old.json
+
+Results (p50/p95/p99/mean in ms, calls per second) are written as JSON;
+with --baseline, any stage whose p95 grew by more than --tolerance is listed
+and the exit status is 1.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import numpy as np
+import httpx  # type: ignore
+from benchmarks.record_ner import describe_source, is_synthetic, load_recording, ner_texts, payload_key
+from benchmarks.stub_torchserve import fake_entities
+from benchmarks.synthetic_data import company_records
+from src.services import bm25_index as bm25_module
+from src.services import entity_extractor
+from src.services.classifier import load_classifier
+from src.services.company_snapshot import CompanySnapshot, snapshot_manager
+from src.services.entity_extractor import PREPROCESS_MAX_LENGTH, merge_chunk_entities
+from src.services.executor import cpu_executor
+from src.services.matcher import find_matches
+from src.services.pipeline import warm_worker
+from src.services.result_cache import result_cache
+from src.utils.finance_new_check_utils import is_finance_article
+from src.utils.location_utils import load_gazetteer
+from src.utils.reranker import bm25_rerank_matches
+from src.utils.text_processing import preprocess_text
+
+
+def summarize(stage, rows, samples):
+    samples = np.asarray(samples)
+    p50, p95, p99 = np.percentile(samples, [50, 95, 99]) * 1000
+    return {
+        "stage": stage,
+        "rows": rows,
+        "calls": len(samples),
+        "p50_ms": round(float(p50), 3),
+        "p95_ms": round(float(p95), 3),
+        "p99_ms": round(float(p99), 3),
+        "mean_ms": round(float(samples.mean() * 1000), 3),
+        "throughput_per_s": round(float(len(samples) / samples.sum()), 2) if samples.sum() else None,
+    }
+
+
+def time_calls(func, inputs, repeat):
+    samples = []
+    for _ in range(repeat):
+        for args in inputs:
+            start = time.perf_counter()
+            func(*args)
+            samples.append(time.perf_counter() - start)
+    return samples
+
+
+class NerReplay:
+    """Stands in for generate_entities, answering from the recording."""
+
+    def __init__(self, responses):
+        self.responses = responses
+        self.misses = 0
+
+    async def __call__(self, article_content):
+        response = self.responses.get(payload_key(article_content))
+        if response is None:
+            # Chunking config changed since recording; answer like the stub
+            self.misses += 1
+            response = fake_entities({"html_chunk_2": article_content})
+        return response
+
+
+async def time_route(articles, repeat):
+    # Imported here: main wires up the app and its startup hooks
+    from main import app
+
+    samples = []
+    statuses = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+        for _ in range(repeat):
+            for article in articles:
+                start = time.perf_counter()
+                response = await client.post("/extract-entities/", json=article)
+                samples.append(time.perf_counter() - start)
+                statuses.append(response.json().get("status", False))
+    return samples, statuses
+
+
+def environment():
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "git_commit": commit,
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+        "executor_mode": cpu_executor.mode,
+    }
+
+
+def regressions(results, baseline, tolerance):
+    previous = {(r["stage"], r["rows"]): r for r in baseline["results"]}
+    slower = []
+    for result in results:
+        old = previous.get((result["stage"], result["rows"]))
+        if old and old["p95_ms"] and result["p95_ms"] > old["p95_ms"] * (1 + tolerance):
+            slower.append((result, old))
+    return slower
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[5000, 50000, 500000])
+    parser.add_argument("--repeat", type=int, default=3, help="passes over the article corpus")
+    parser.add_argument("--output", default="./data/benchmark_results.json")
+    parser.add_argument("--baseline", help="earlier results file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed p95 growth (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    recording = load_recording()
+    articles = recording["articles"]
+    replay = NerReplay(recording["responses"])
+    entity_extractor.generate_entities = replay
+    # Every route call must do the full work, and nothing is written to ./data
+    result_cache.enabled = False
+    bm25_module.SAVE_EVERY = float("inf")
+
+    load_classifier()
+    load_gazetteer()
+    query_texts = [a["title"] + " " + a["content"] for a in articles]
+    ner_results = [
+        merge_chunk_entities([replay.responses.get(payload_key(t)) for t in ner_texts(a)])
+        for a in articles
+    ]
+    results = []
+
+    samples = time_calls(is_finance_article, [(text,) for text in query_texts], args.repeat)
+    results.append(summarize("is_finance_article", None, samples))
+    samples = time_calls(
+        preprocess_text, [(a["content"], PREPROCESS_MAX_LENGTH) for a in articles], args.repeat
+    )
+    results.append(summarize("preprocess_text", None, samples))
+
+    loop = asyncio.new_event_loop()
+    for rows in args.sizes:
+        start = time.perf_counter()
+        snapshot = CompanySnapshot.from_records(company_records(rows))
+        results.append(summarize("snapshot_build", rows, [time.perf_counter() - start]))
+        snapshot_manager.install(snapshot)
+        # A fresh pool per size, so forked workers hold this snapshot
+        cpu_executor.start(initializer=warm_worker)
+
+        extracted = [data for data in ner_results if data]
+        samples = time_calls(lambda data: find_matches(data, snapshot), [(d,) for d in extracted], args.repeat)
+        results.append(summarize("find_matches", rows, samples))
+
+        match_lists = [(find_matches(data, snapshot), text) for data, text in zip(ner_results, query_texts) if data]
+        samples = time_calls(
+            lambda matches, text: bm25_rerank_matches([dict(m) for m in matches], text),
+            match_lists, args.repeat,
+        )
+        results.append(summarize("bm25_rerank_matches", rows, samples))
+
+        samples, statuses = loop.run_until_complete(time_route(articles, args.repeat))
+        route = summarize("extract_entities_route", rows, samples)
+        route["relevant_fraction"] = round(sum(bool(s) for s in statuses) / len(statuses), 3)
+        results.append(route)
+        cpu_executor.shutdown()
+
+    loop.close()
+
+    report = {
+        "environment": environment(),
+        "corpus": {
+            "articles": len(articles),
+            "ner_source": recording.get("source"),
+            "ner_synthetic": is_synthetic(recording),
+            "ner_replay_misses": replay.misses,
+        },
+        "results": results,
+    }
+    print(f"NER responses: {describe_source(recording)}")
+    print(f"{'stage':24} {'rows':>8} {'calls':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'per s':>9}")
+    for r in results:
+        print(
+            f"{r['stage']:24} {r['rows'] or '-':>8} {r['calls']:>6} {r['p50_ms']:>9.2f} "
+            f"{r['p95_ms']:>9.2f} {r['p99_ms']:>9.2f} {r['throughput_per_s'] or 0:>9.1f}"
+        )
+
+    directory = os.path.dirname(args.output)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as file:
+        json.dump(report, file, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as file:
+            slower = regressions(results, json.load(file), args.tolerance)
+        for result, old in slower:
+            print(
+                f"REGRESSION {result['stage']} rows={result['rows']}: "
+                f"p95 {old['p95_ms']:.2f} -> {result['p95_ms']:.2f} ms"
+            )
+        if slower:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
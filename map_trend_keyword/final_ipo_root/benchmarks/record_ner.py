@@ -0,0 +1,92 @@
+"""Record NER responses for the benchmark article corpus.
+
+Every text the service would send to NER for the corpus (after
+preprocessing and chunking with the current config) is posted once and the
+responses are written next to the articles, so benchmarks replay them without
+TorchServe. A recording from a real TorchServe model (--url) goes to
+fixtures/ner_responses.json; one from the in-process stub goes to
+fixtures/ner_responses_synthetic.json, the shipped default, and only has the
+stub's output shape. Benchmarks replay the real recording when there is one.
+Run from the project root:
+
+    python -m benchmarks.record_ner --url http://127.0.0.1:8080/predictions/xlm-net/1.0
+    python -m benchmarks.record_ner          # against the in-process stub server
+"""
+import argparse
+import hashlib
+import json
+import os
+import httpx  # type: ignore
+from benchmarks.stub_torchserve import PREDICTIONS_PATH, start_stub_server
+from benchmarks.synthetic_data import article_corpus
+from src.services.entity_extractor import PREPROCESS_MAX_LENGTH, article_chunks
+from src.utils.text_processing import preprocess_text
+
+RECORDING_PATH = os.path.join(os.path.dirname(__file__), "fixtures", "ner_responses.json")
+SYNTHETIC_PATH = os.path.join(os.path.dirname(__file__), "fixtures", "ner_responses_synthetic.json")
+SYNTHETIC_SOURCE = "synthetic: benchmarks.stub_torchserve"
+
+
+def payload_key(text):
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def ner_texts(article):
+    """The html_chunk_2 texts the service sends to NER for ``article``."""
+    return article_chunks(preprocess_text(article["content"], PREPROCESS_MAX_LENGTH))
+
+
+def load_recording(path=None):
+    """The TorchServe recording if one was made, else the synthetic stub responses."""
+    if path is None:
+        path = RECORDING_PATH if os.path.exists(RECORDING_PATH) else SYNTHETIC_PATH
+    with open(path, "r", encoding="utf-8") as file:
+        return json.load(file)
+
+
+def is_synthetic(recording):
+    return recording.get("source", SYNTHETIC_SOURCE) == SYNTHETIC_SOURCE
+
+
+def describe_source(recording):
+    if is_synthetic(recording):
+        return "synthetic (stub TorchServe output, not a real model)"
+    return f"recorded from {recording['source']}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--url", help="TorchServe prediction URL (default: local stub)")
+    parser.add_argument("--output", help="default: fixtures/ner_responses.json, or ..._synthetic.json for the stub")
+    args = parser.parse_args()
+    output = args.output or (RECORDING_PATH if args.url else SYNTHETIC_PATH)
+
+    url = args.url
+    if url is None:
+        _, base_url = start_stub_server()
+        url = base_url + PREDICTIONS_PATH
+
+    articles = article_corpus()
+    responses = {}
+    with httpx.Client(timeout=30) as client:
+        for article in articles:
+            for text in ner_texts(article):
+                key = payload_key(text)
+                if key in responses:
+                    continue
+                payload = {"title": "", "html_chunk_1": "", "html_chunk_2": text, "language": "en"}
+                response = client.post(url, json=payload)
+                response.raise_for_status()
+                responses[key] = response.json()
+
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as file:
+        json.dump(
+            {"source": args.url or SYNTHETIC_SOURCE, "articles": articles, "responses": responses},
+            file, indent=1, sort_keys=True,
+        )
+    print(f"Recorded {len(responses)} NER responses for {len(articles)} articles to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""Local stand-in for the TorchServe XLM-NER endpoint.
+
+Answers ``POST /predictions/xlm-net/1.0`` with a naive capitalized-phrase
+"NER" in the real response shape, for a single payload or a JSON list of
+payloads (batched call), and records every request it receives so batching
+behaviour can be checked:
+
+    python -m benchmarks.stub_torchserve --port 8080 --delay-ms 20
+    curl localhost:8080/batches      # sizes of the requests received so far
+    curl -X POST localhost:8080/reset
+"""
+import argparse
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+PREDICTIONS_PATH = "/predictions/xlm-net/1.0"
+ENTITY_PATTERN = re.compile(r"\b[A-Z][\w&]*(?:\s+[A-Z][\w&]*)*")
+
+
+def fake_entities(payload):
+    """Capitalized phrases of html_chunk_2, in the TorchServe response shape."""
+    entities = {}
+    for phrase in ENTITY_PATTERN.findall(payload.get("html_chunk_2", "")):
+        key = phrase.lower()
+        entities.setdefault(key, [key])
+    return {"title": {}, "html_chunk_1": {}, "html_chunk_2": entities}
+
+
+class StubTorchServe(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, delay_ms=0.0, per_item_delay_ms=0.0, responder=fake_entities):
+        super().__init__(address, StubHandler)
+        self.delay = delay_ms / 1000
+        self.per_item_delay = per_item_delay_ms / 1000
+        self.responder = responder
+        self.lock = threading.Lock()
+        # One entry per HTTP request: number of payloads it carried
+        self.batches = []
+
+    def reset(self):
+        with self.lock:
+            self.batches = []
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    def _reply(self, status, body):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.path == "/ping":
+            self._reply(200, {"status": "Healthy"})
+        elif self.path == "/batches":
+            with self.server.lock:
+                self._reply(200, {"batches": list(self.server.batches)})
+        else:
+            self._reply(404, {"error": "not found"})
+
+    def do_POST(self):
+        if self.path == "/reset":
+            self.server.reset()
+            self._reply(200, {"status": "ok"})
+            return
+        if self.path != PREDICTIONS_PATH:
+            self._reply(404, {"error": "not found"})
+            return
+
+        length = int(self.headers.get("Content-Length", 0))
+        body = json.loads(self.rfile.read(length) or b"null")
+        payloads = body if isinstance(body, list) else [body]
+        with self.server.lock:
+            self.server.batches.append(len(payloads))
+
+        time.sleep(self.server.delay + self.server.per_item_delay * len(payloads))
+        responses = [self.server.responder(payload) for payload in payloads]
+        self._reply(200, responses if isinstance(body, list) else responses[0])
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stub_server(host="127.0.0.1", port=0, **kwargs):
+    """Start the stub on a background thread; returns ``(server, base_url)``."""
+    server = StubTorchServe((host, port), **kwargs)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--delay-ms", type=float, default=0.0, help="fixed latency per request")
+    parser.add_argument("--per-item-delay-ms", type=float, default=0.0, help="extra latency per payload")
+    args = parser.parse_args()
+
+    server = StubTorchServe(
+        (args.host, args.port), delay_ms=args.delay_ms, per_item_delay_ms=args.per_item_delay_ms
+    )
+    print(f"Stub TorchServe listening on http://{args.host}:{args.port}{PREDICTIONS_PATH}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
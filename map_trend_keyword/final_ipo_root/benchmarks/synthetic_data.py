@@ -0,0 +1,153 @@
+"""Deterministic synthetic inputs for the pipeline benchmarks.
+
+``company_records(n)`` returns a company master in the GoodReturns
+company-list schema. A fixed set of real listed companies comes first and the
+rest are generated names, so every size contains the companies the article
+corpus mentions. ``article_corpus()`` returns the fixed set of articles that
+``record_ner`` sends to NER.
+"""
+import random
+
+# Real companies the article corpus refers to; present at every size
+ANCHOR_COMPANIES = [
+    ("Tata Steel Ltd.", "Tata Steel", "TATASTEEL", "Steel"),
+    ("JSW Steel Ltd.", "JSW Steel", "JSWSTEEL", "Steel"),
+    ("Hindalco Industries Ltd.", "Hindalco", "HINDALCO", "Aluminium"),
+    ("Reliance Industries Ltd.", "Reliance", "RELIANCE", "Refineries"),
+    ("HDFC Bank Ltd.", "HDFC Bank", "HDFCBANK", "Banks"),
+    ("Infosys Ltd.", "Infosys", "INFY", "IT - Software"),
+    ("Bajaj Finance Ltd.", "Bajaj Finance", "BAJFINANCE", "Finance"),
+    ("Bajaj Housing Finance Ltd.", "Bajaj Housing Fin", "BAJAJHFL", "Finance"),
+    ("Adani Ports and Special Economic Zone Ltd.", "Adani Ports", "ADANIPORTS", "Infrastructure"),
+    ("Zomato Ltd.", "Zomato", "ZOMATO", "E-Commerce"),
+    ("Swiggy Ltd.", "Swiggy", "SWIGGY", "E-Commerce"),
+    ("Ola Electric Mobility Ltd.", "Ola Electric", "OLAELEC", "Automobiles"),
+    ("Hyundai Motor India Ltd.", "Hyundai Motor", "HYUNDAI", "Automobiles"),
+    ("NTPC Green Energy Ltd.", "NTPC Green", "NTPCGREEN", "Power"),
+    ("Life Insurance Corporation of India", "LIC", "LICI", "Insurance"),
+    ("Oil and Natural Gas Corporation Ltd.", "ONGC", "ONGC", "Oil Exploration"),
+    ("Vishal Mega Mart Ltd.", "Vishal Mega Mart", "VMM", "Retail"),
+    ("Waaree Energies Ltd.", "Waaree Energies", "WAAREEENER", "Power"),
+    ("BSE Ltd.", "BSE", "BSE", "Exchange Platform"),
+]
+
+NAME_PREFIXES = [
+    "Aarti", "Apex", "Bharat", "Coromandel", "Deccan", "Everest", "Ganesh", "Gujarat",
+    "Himalaya", "Indo", "Jai", "Kaveri", "Lakshmi", "Mahindra", "Narmada", "Orient",
+    "Prakash", "Rajshree", "Sagar", "Shree", "Sun", "Supreme", "Triveni", "Uttam",
+    "Vardhman", "Western", "Yamuna", "Zenith", "Amrit", "Bombay", "Century", "Eastern",
+]
+NAME_MIDDLES = [
+    "", "", "", "Global", "National", "United", "Premier", "Modern", "Royal", "Star",
+    "Prime", "Golden", "Classic", "Pioneer", "Allied", "Standard",
+]
+NAME_SECTORS = [
+    "Steel", "Pharma", "Chemicals", "Textiles", "Power", "Infra", "Finance", "Cement",
+    "Foods", "Motors", "Polymers", "Agro", "Logistics", "Realty", "Tech", "Papers",
+    "Sugar", "Castings", "Forgings", "Fertilisers", "Electricals", "Capital", "Housing",
+    "Organics", "Ceramics", "Petrochem", "Tubes", "Glass", "Plastics", "Healthcare",
+]
+NAME_SUFFIXES = ["Ltd.", "Ltd.", "Ltd.", "Limited", "Industries Ltd.", "Enterprises Ltd.", "India Ltd."]
+INDUSTRIES = [
+    "Steel", "Pharmaceuticals", "Chemicals", "Textiles", "Power", "Construction",
+    "Finance", "Cement", "Food Processing", "Automobiles", "Plastics", "Agriculture",
+    "Logistics", "Realty", "IT - Software", "Paper", "Sugar", "Engineering",
+    "Fertilisers", "Electric Equipment", "Healthcare", "Exchange Platform",
+]
+
+
+def company_records(n, seed=7):
+    """``n`` company-list records (CompanyName, ShortCompanyName, TickerName,
+    CompanyCode, IndustryName), identical for a given ``n`` and ``seed``."""
+    rng = random.Random(seed)
+    records = [
+        {
+            "CompanyName": name,
+            "ShortCompanyName": short_name,
+            "TickerName": ticker,
+            "CompanyCode": str(100000 + code),
+            "IndustryName": industry,
+        }
+        for code, (name, short_name, ticker, industry) in enumerate(ANCHOR_COMPANIES[:n])
+    ]
+
+    seen = {record["CompanyName"] for record in records}
+    while len(records) < n:
+        words = [rng.choice(NAME_PREFIXES), rng.choice(NAME_MIDDLES), rng.choice(NAME_SECTORS)]
+        words = [word for word in words if word]
+        name = " ".join(words + [rng.choice(NAME_SUFFIXES)])
+        if name in seen:
+            # Large masters run out of combinations; numbered names stay unique
+            name = f"{' '.join(words)} {len(records)} Ltd."
+        seen.add(name)
+
+        ticker = "".join(word[: rng.randint(2, 4)] for word in words).upper()
+        records.append({
+            "CompanyName": name,
+            "ShortCompanyName": " ".join(words),
+            "TickerName": f"{ticker}{len(records)}" if rng.random() < 0.5 else ticker,
+            "CompanyCode": str(100000 + len(records)),
+            "IndustryName": rng.choice(INDUSTRIES),
+        })
+    return records
+
+
+HEADLINES = [
+    "{a} shares jump after {b} posts strong quarterly numbers",
+    "{a} IPO subscribed 12 times on final day; {b} and {c} in focus",
+    "{a}, {b} buzzing as metal stocks rally on China stimulus",
+    "Grey market premium for {a} IPO rises ahead of listing in Mumbai",
+    "{a} to raise Rs 4,000 crore via IPO; {b} among anchor investors",
+    "Sensex, Nifty end higher led by {a}, {b} and {c}",
+]
+PARAGRAPHS = [
+    "Shares of {a} rose 4 per cent on the BSE on Tuesday after the company reported a "
+    "sharp rise in net profit for the quarter ended September, beating street estimates.",
+    "The {a} IPO, which opened for subscription on Monday, received bids for 12.4 times the "
+    "shares on offer, with the qualified institutional buyers portion subscribed 28 times.",
+    "Analysts at domestic brokerages said {b} remains their top pick in the sector, citing "
+    "capacity additions in Odisha and Karnataka and improving realisations.",
+    "Driven by a recovery in China and firm global prices, metal stocks such as {a} and {c} "
+    "outperformed the broader market, while {b} traded flat in Mumbai.",
+    "The price band for the issue has been fixed at Rs 300 to Rs 315 per share and the "
+    "company plans to use the proceeds to repay debt and fund expansion in Gujarat.",
+    "Foreign portfolio investors were net buyers for the third straight session, and the "
+    "rupee ended marginally stronger against the US dollar in New Delhi trade.",
+    "{c} said its board would meet next week to consider a proposal to raise funds through "
+    "a qualified institutional placement, subject to shareholder approval.",
+    "Market regulator SEBI has asked {a} to clarify media reports about a possible stake "
+    "sale by its promoters, the company said in an exchange filing.",
+]
+OFF_TOPIC = [
+    ("India beat Australia by six wickets in Pune",
+     "Virat Kohli scored an unbeaten 82 as India chased down 287 with an over to spare. "
+     "The series now moves to Chennai for the final match on Sunday."),
+    ("Heavy rain lashes Kerala, orange alert in five districts",
+     "The weather department has issued an orange alert for Kochi and Thrissur as the "
+     "northeast monsoon intensifies over the southern peninsula."),
+    ("New Bollywood thriller opens to packed theatres",
+     "The film, shot largely in Goa and Jaipur, collected Rs 40 crore on its opening "
+     "weekend according to trade analysts."),
+]
+
+
+def article_corpus(n_articles=40, seed=11):
+    """The fixed benchmark corpus: IPO/market articles of varied length about
+    the anchor companies, plus a few off-topic ones the classifier rejects."""
+    rng = random.Random(seed)
+    names = [short_name for _, short_name, _, _ in ANCHOR_COMPANIES]
+    articles = []
+    for i in range(n_articles):
+        if i % 10 == 9:
+            title, content = OFF_TOPIC[(i // 10) % len(OFF_TOPIC)]
+            articles.append({"title": title, "content": content})
+            continue
+        a, b, c = rng.sample(names, 3)
+        # Mostly news-length articles, with every fifth a long prospectus write-up
+        n_paragraphs = rng.randint(18, 30) if i % 5 == 4 else rng.randint(2, 6)
+        paragraphs = [rng.choice(PARAGRAPHS).format(a=a, b=b, c=c) for _ in range(n_paragraphs)]
+        articles.append({
+            "title": rng.choice(HEADLINES).format(a=a, b=b, c=c),
+            "content": " ".join(paragraphs),
+        })
+    return articles
@@ -0,0 +1,60 @@
+"""Run one member of the Kafka enrichment consumer group.
+
+Reads crawled articles from the ``enrichment.input_topic`` topic, matches
+them against the company master in-process and publishes the enriched
+records to ``enrichment.output_topic``. Start more copies (same group id)
+to spread the input topic's partitions across them:
+
+    python enrichment_consumer.py
+"""
+import json
+import logging
+import signal
+from kafka import KafkaConsumer, KafkaProducer  # type: ignore
+from src.services.bm25_index import load_bm25_index, save_bm25_index
+from src.services.classifier import load_classifier
+from src.services.company_snapshot import snapshot_manager
+from src.services.enrichment import BROKER, GROUP_ID, INPUT_TOPIC, EnrichmentWorker
+from src.utils.location_utils import load_gazetteer
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+
+def main():
+    load_classifier()
+    load_gazetteer()
+    load_bm25_index()
+    snapshot_manager.start()
+
+    consumer = KafkaConsumer(
+        INPUT_TOPIC,
+        bootstrap_servers=BROKER,
+        group_id=GROUP_ID,
+        auto_offset_reset="earliest",
+        # Offsets are committed by the worker once the enriched batch is acknowledged
+        enable_auto_commit=False,
+        value_deserializer=lambda v: json.loads(v.decode("utf-8")) if v else None,
+    )
+    producer = KafkaProducer(
+        bootstrap_servers=BROKER,
+        acks="all",
+        key_serializer=lambda k: str(k).encode("utf-8"),
+        value_serializer=lambda v: json.dumps(v).encode("utf-8"),
+    )
+    worker = EnrichmentWorker(consumer, producer)
+    signal.signal(signal.SIGTERM, lambda signum, frame: worker.stop())
+
+    logging.info(f"Enriching {INPUT_TOPIC} as a member of consumer group {GROUP_ID}")
+    try:
+        worker.run()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        worker.close()
+        snapshot_manager.stop()
+        save_bm25_index()
+        logging.info(f"Stopped after enriching {worker.enriched} articles")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,53 @@
 import uvicorn  # type: ignore
-from fastapi import FastAPI  # type: ignore
+from fastapi import FastAPI, Request  # type: ignore
 from fastapi.responses import ORJSONResponse  # type: ignore
 from src.api.routes import router
+from src.services.bm25_index import load_bm25_index, save_bm25_index
+from src.services.classifier import load_classifier
+from src.services.company_snapshot import snapshot_manager
+from src.services.entity_extractor import ner_batcher
+from src.services.executor import ExecutorSaturated, cpu_executor
+from src.services.metrics import REJECTED_REQUESTS, MetricsMiddleware
+from src.services.pipeline import warm_worker
+from src.utils.location_utils import load_gazetteer
 import yaml  # type: ignore
 
 app = FastAPI(default_response_class=ORJSONResponse)
 app.include_router(router)
+# Request histograms and Server-Timing headers; stages are timed in routes
+app.add_middleware(MetricsMiddleware, routes=router.routes)
+
+@app.on_event("startup")
+def warm_up():
+    # Load the finance classifier before serving instead of on first request
+    load_classifier()
+    load_gazetteer()
+    load_bm25_index()
+    # Load the company snapshot (from disk if present)
+    snapshot_manager.current()
+    # Fork the CPU pool before any thread starts, so workers inherit everything above
+    # and no lock held by another thread
+    cpu_executor.start(initializer=warm_worker)
+    # Only now start the snapshot refresher thread
+    snapshot_manager.start()
+
+@app.on_event("shutdown")
+async def shut_down():
+    # Let batched NER calls in flight answer their callers
+    await ner_batcher.drain()
+    cpu_executor.shutdown()
+    snapshot_manager.stop()
+    save_bm25_index()
+
+@app.exception_handler(ExecutorSaturated)
+async def executor_saturated(request: Request, exc: ExecutorSaturated):
+    # Shed load immediately rather than queueing without bound
+    REJECTED_REQUESTS.inc()
+    return ORJSONResponse(
+        status_code=503,
+        content={"detail": "Server busy, retry later."},
+        headers={"Retry-After": "1"},
+    )
 
 # Load config.yaml if available
 try:
@@ -1,51 +1,351 @@
+import asyncio
+import json
 from fastapi import APIRouter, HTTPException, BackgroundTasks  # type: ignore
-from src.models.request_models import ArticleInput
-from src.services.entity_extractor import generate_entities
-from src.services.matcher import find_matches
-from src.utils.text_processing import preprocess_text
-from src.utils.finance_new_check_utils import is_finance_article
-from src.utils.reranker import bm25_rerank_matches
+from fastapi.encoders import jsonable_encoder  # type: ignore
+from fastapi.responses import PlainTextResponse, StreamingResponse  # type: ignore
+from src.models.request_models import ArticleInput, ArticleBatchInput
+from src.services.bm25_index import bm25_index, save_bm25_index
+from src.services.classifier import predict_many
+from src.services.company_snapshot import snapshot_manager
+from src.services.entity_extractor import (
+    PREPROCESS_MAX_LENGTH,
+    article_chunks,
+    generate_article_entities,
+    generate_entities_many,
+    iter_chunk_entities,
+    merge_chunk_entities,
+)
+from src.services.executor import ExecutorSaturated, cpu_executor
+from src.services.metrics import observe_article, render_metrics, stage_timer
+from src.services.pipeline import match_article, match_articles, rerank_articles, screen_articles
+from src.services.result_cache import result_cache
 
 router = APIRouter()
 
+NOT_RELEVANT_MESSAGE = "Not a relevant ipo/company article"
+EXTRACTION_FAILED_MESSAGE = "Entity extraction failed."
+SERVER_BUSY_MESSAGE = "Server busy, retry later."
+
+def build_extraction_response(extracted_data, matches, snapshot_version, cache_status):
+    # Create a set of entity names from matches (case-insensitive)
+    matched_entity_names = {match["entity_name"].strip().lower() for match in matches}
+
+    raw_entities = extracted_data.get("html_chunk_2", {})
+    observe_article(len(raw_entities), len(matches))
+
+    # Add status flag based on match
+    enriched_entities = {}
+    for key, values in raw_entities.items():
+        normalized_key = key.strip().lower()
+        is_matched = normalized_key in matched_entity_names
+        enriched_entities[key] = {
+            "values": values,
+            "entity_matched": is_matched
+        }
+
+    return {
+        "matches": matches,
+        "extracted_entities": enriched_entities,
+        "snapshot_version": snapshot_version,
+        "cache": cache_status,
+        "status": True,
+    }
+
+def observe_articles(article_terms, background_tasks):
+    """Add newly processed articles to the reranker's corpus statistics."""
+    if article_terms and bm25_index.observe(article_terms):
+        background_tasks.add_task(save_bm25_index)
+
+async def extract_and_match(clean_text, snapshot_version):
+    """NER + matching for one article; the unit stored in the result cache."""
+    with stage_timer("ner"):
+        extracted_data = await generate_article_entities(clean_text)
+
+    if not extracted_data:
+        raise HTTPException(status_code=500, detail=EXTRACTION_FAILED_MESSAGE)
+
+    with stage_timer("match"):
+        matches, snapshot_version = await cpu_executor.run(
+            match_article, extracted_data, snapshot_version
+        )
+    return {
+        "extracted_data": extracted_data,
+        "matches": matches,
+        "snapshot_version": snapshot_version,
+    }
+
 @router.get("/health")
 async def health_check():
     return {"status": "Healthy"}
 
+@router.get("/metrics")
+async def metrics():
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+@router.post("/classify/batch")
+async def classify_batch(batch: ArticleBatchInput):
+    texts = [article.title + " " + article.content for article in batch.articles]
+    with stage_timer("classify"):
+        statuses = await cpu_executor.run(predict_many, texts)
+    return {"results": [{"status": status} for status in statuses]}
+
 @router.post("/extract-entities/")
 async def extract_entities(article: ArticleInput, background_tasks: BackgroundTasks):
-    status = True
-    if not is_finance_article(article.title + " " + article.content):
-        status = False
-        return {"status": status, "message": "Not a relevant ipo/company article"}
-    else:
-        clean_text = preprocess_text(article.content)
-        extracted_data = await generate_entities(clean_text)
+    query_text = article.title + " " + article.content
+    # Classifier and preprocessing run in the CPU pool, not on the event loop
+    with stage_timer("screen"):
+        [clean_text] = await cpu_executor.run(
+            screen_articles, [query_text], [article.content], PREPROCESS_MAX_LENGTH
+        )
+    if clean_text is None:
+        return {"status": False, "message": NOT_RELEVANT_MESSAGE}
 
-        if not extracted_data:
-            raise HTTPException(status_code=500, detail="Entity extraction failed.")
+    # Re-crawls and retries of the same text share one NER call and match
+    snapshot_version = snapshot_manager.current().version
+    entry, cache_status = await result_cache.get_or_compute(
+        result_cache.make_key(clean_text, snapshot_version),
+        lambda: extract_and_match(clean_text, snapshot_version),
+    )
 
-        matches = find_matches(extracted_data)
-        query_text = article.title + " " + article.content
-        matches = bm25_rerank_matches(matches, query_text)
+    with stage_timer("rerank"):
+        [matches], [article_terms] = await cpu_executor.run(
+            rerank_articles, [entry["matches"]], [query_text], bm25_index.version
+        )
+    if cache_status == "miss":
+        observe_articles([article_terms], background_tasks)
+    return build_extraction_response(
+        entry["extracted_data"], matches, entry["snapshot_version"], cache_status
+    )
 
-        # Create a set of entity names from matches (case-insensitive)
-        matched_entity_names = {match["entity_name"].strip().lower() for match in matches}
+def ndjson_line(payload):
+    return json.dumps(jsonable_encoder(payload)) + "\n"
 
-        raw_entities = extracted_data.get("html_chunk_2", {})
+async def stream_extraction(query_text, clean_text, background_tasks):
+    """NDJSON lines for /extract-entities/stream.
 
-        # Add status flag based on match
-        enriched_entities = {}
-        for key, values in raw_entities.items():
-            normalized_key = key.strip().lower()
-            is_matched = normalized_key in matched_entity_names
-            enriched_entities[key] = {
-                "values": values,
-                "entity_matched": is_matched
-            }
+    While chunk NER calls complete, yields ``{"chunk", "total_chunks",
+    "matches"}`` with the companies first found in that chunk; the last line
+    is the same object /extract-entities/ returns, matched on the merged
+    entities of the whole article.
+
+    The 200 status is sent with the first line, so a CPU pool that fills up
+    later ends the stream with a ``{"status": false, "error"}`` line instead
+    of the 503 a non-streaming route gets.
+    """
+    lines = _stream_extraction_lines(query_text, clean_text, background_tasks)
+    try:
+        async for line in lines:
+            yield line
+    except ExecutorSaturated:
+        yield ndjson_line({"status": False, "error": SERVER_BUSY_MESSAGE})
+    finally:
+        # On a client disconnect, releases the result-cache key now rather than at GC
+        await lines.aclose()
+
+async def _stream_extraction_lines(query_text, clean_text, background_tasks):
+    snapshot_version = snapshot_manager.current().version
+    key = result_cache.make_key(clean_text, snapshot_version)
+    state, value = await result_cache.claim(key)
+
+    if state == "wait":
+        try:
+            value = await asyncio.shield(value)
+        except asyncio.CancelledError:
+            if not value.cancelled():
+                raise
+            yield ndjson_line({"status": False, "error": EXTRACTION_FAILED_MESSAGE})
+            return
+        except HTTPException as e:
+            yield ndjson_line({"status": False, "error": e.detail})
+            return
+        except Exception as e:
+            yield ndjson_line({"status": False, "error": str(e)})
+            return
 
-        return {
+    if state in ("hit", "wait"):
+        with stage_timer("rerank"):
+            [matches], _ = await cpu_executor.run(
+                rerank_articles, [value["matches"]], [query_text], bm25_index.version
+            )
+        yield ndjson_line(build_extraction_response(
+            value["extracted_data"], matches, value["snapshot_version"],
+            "hit" if state == "hit" else "coalesced",
+        ))
+        return
+
+    try:
+        chunks = article_chunks(clean_text)
+        responses = [None] * len(chunks)
+        seen_codes = set()
+        async for index, extracted_data in iter_chunk_entities(chunks):
+            responses[index] = extracted_data
+            if not extracted_data:
+                break
+            with stage_timer("match"):
+                chunk_matches, _ = await cpu_executor.run(
+                    match_article, extracted_data, snapshot_version
+                )
+            new_matches = [m for m in chunk_matches if m["company_code"] not in seen_codes]
+            seen_codes.update(m["company_code"] for m in new_matches)
+            if new_matches:
+                with stage_timer("rerank"):
+                    [new_matches], _ = await cpu_executor.run(
+                        rerank_articles, [new_matches], [query_text], bm25_index.version
+                    )
+            yield ndjson_line({"chunk": index, "total_chunks": len(chunks), "matches": new_matches})
+
+        extracted_data = merge_chunk_entities(responses)
+        if not extracted_data:
+            result_cache.fail(key, HTTPException(status_code=500, detail=EXTRACTION_FAILED_MESSAGE))
+            yield ndjson_line({"status": False, "error": EXTRACTION_FAILED_MESSAGE})
+            return
+
+        with stage_timer("match"):
+            matches, matched_version = await cpu_executor.run(
+                match_article, extracted_data, snapshot_version
+            )
+        entry = {
+            "extracted_data": extracted_data,
             "matches": matches,
-            "extracted_entities": enriched_entities,
-            "status": status,
+            "snapshot_version": matched_version,
         }
+        await result_cache.complete(key, entry)
+    except BaseException as e:
+        # Includes the client disconnecting mid-stream
+        result_cache.fail(key, e)
+        raise
+
+    with stage_timer("rerank"):
+        [matches], [article_terms] = await cpu_executor.run(
+            rerank_articles, [entry["matches"]], [query_text], bm25_index.version
+        )
+    observe_articles([article_terms], background_tasks)
+    yield ndjson_line(build_extraction_response(
+        extracted_data, matches, matched_version, "miss"
+    ))
+
+@router.post("/extract-entities/stream")
+async def extract_entities_stream(article: ArticleInput, background_tasks: BackgroundTasks):
+    query_text = article.title + " " + article.content
+    with stage_timer("screen"):
+        [clean_text] = await cpu_executor.run(
+            screen_articles, [query_text], [article.content], PREPROCESS_MAX_LENGTH
+        )
+    if clean_text is None:
+        lines = iter([ndjson_line({"status": False, "message": NOT_RELEVANT_MESSAGE})])
+    else:
+        lines = stream_extraction(query_text, clean_text, background_tasks)
+    return StreamingResponse(lines, media_type="application/x-ndjson", background=background_tasks)
+
+@router.post("/extract-entities/batch")
+async def extract_entities_batch(batch: ArticleBatchInput, background_tasks: BackgroundTasks):
+    articles = batch.articles
+    results = [None] * len(articles)
+
+    query_texts = [article.title + " " + article.content for article in articles]
+    with stage_timer("screen"):
+        clean_texts = await cpu_executor.run(
+            screen_articles, query_texts, [article.content for article in articles], PREPROCESS_MAX_LENGTH
+        )
+    relevant = []
+    for idx, clean_text in enumerate(clean_texts):
+        if clean_text is not None:
+            relevant.append(idx)
+        else:
+            results[idx] = {"status": False, "message": NOT_RELEVANT_MESSAGE}
+
+    # Split relevant articles into cache hits, requests already in flight
+    # elsewhere, and keys this batch computes (once per distinct text)
+    snapshot_version = snapshot_manager.current().version
+    entries = {}
+    waiting = []
+    owned = {}
+    try:
+        # Claims await the cache backend; keys already owned must be
+        # released if the request is cancelled meanwhile
+        for idx in relevant:
+            key = result_cache.make_key(clean_texts[idx], snapshot_version)
+            if key in owned:
+                owned[key].append(idx)
+                continue
+            state, value = await result_cache.claim(key)
+            if state == "hit":
+                entries[idx] = (value, "hit")
+            elif state == "wait":
+                waiting.append((idx, value))
+            else:
+                owned[key] = [idx]
+
+        # NER calls go out concurrently, bounded by entity_extraction.max_concurrency
+        own_keys = list(owned)
+        with stage_timer("ner"):
+            extracted = await generate_entities_many(
+                [clean_texts[owned[key][0]] for key in own_keys]
+            )
+
+        extracted_ok = []
+        for key, extracted_data in zip(own_keys, extracted):
+            if extracted_data:
+                extracted_ok.append((key, extracted_data))
+                continue
+            result_cache.fail(key, HTTPException(status_code=500, detail=EXTRACTION_FAILED_MESSAGE))
+            for idx in owned[key]:
+                results[idx] = {"status": False, "error": EXTRACTION_FAILED_MESSAGE}
+
+        # One similarity pass for every entity in the batch, on one snapshot
+        with stage_timer("match"):
+            batch_matches, matched_version = await cpu_executor.run(
+                match_articles, [data for _, data in extracted_ok], snapshot_version
+            )
+
+        for (key, extracted_data), matches in zip(extracted_ok, batch_matches):
+            if isinstance(matches, Exception):
+                result_cache.fail(key, matches)
+                for idx in owned[key]:
+                    results[idx] = {"status": False, "error": str(matches)}
+                continue
+            entry = {
+                "extracted_data": extracted_data,
+                "matches": matches,
+                "snapshot_version": matched_version,
+            }
+            await result_cache.complete(key, entry)
+            for position, idx in enumerate(owned[key]):
+                entries[idx] = (entry, "miss" if position == 0 else "coalesced")
+    except BaseException as e:
+        # Release waiters on keys this batch never completed
+        for key in owned:
+            result_cache.fail(key, e)
+        raise
+
+    for idx, future in waiting:
+        try:
+            entries[idx] = (await asyncio.shield(future), "coalesced")
+        except HTTPException as e:
+            results[idx] = {"status": False, "error": e.detail}
+        except asyncio.CancelledError:
+            if not future.cancelled():
+                raise
+            results[idx] = {"status": False, "error": EXTRACTION_FAILED_MESSAGE}
+        except Exception as e:
+            results[idx] = {"status": False, "error": str(e)}
+
+    ready = sorted(entries)
+    with stage_timer("rerank"):
+        reranked, article_terms = await cpu_executor.run(
+            rerank_articles,
+            [entries[idx][0]["matches"] for idx in ready],
+            [query_texts[idx] for idx in ready],
+            bm25_index.version,
+        )
+    observe_articles(
+        [terms for idx, terms in zip(ready, article_terms) if entries[idx][1] == "miss"],
+        background_tasks,
+    )
+    for idx, matches in zip(ready, reranked):
+        entry, cache_status = entries[idx]
+        results[idx] = build_extraction_response(
+            entry["extracted_data"], matches, entry["snapshot_version"], cache_status
+        )
+
+    return {"results": results}
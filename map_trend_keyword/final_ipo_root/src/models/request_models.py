@@ -1,5 +1,9 @@
+from typing import List
 from pydantic import BaseModel  # type:ignore
 
 class ArticleInput(BaseModel):
     title: str
     content: str
+
+class ArticleBatchInput(BaseModel):
+    articles: List[ArticleInput]
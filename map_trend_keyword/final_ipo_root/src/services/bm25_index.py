@@ -0,0 +1,196 @@
+import os
+import re
+import threading
+import numpy as np
+import yaml  # type: ignore
+
+# Load config.yaml
+with open("config.yaml", "r") as file:
+    config = yaml.safe_load(file)
+
+RERANKER_CONFIG = config.get("reranker", {})
+INDEX_PATH = RERANKER_CONFIG.get("index_path", "./data/bm25_index.npz")
+SAVE_EVERY = RERANKER_CONFIG.get("save_every", 500)
+MAX_TERMS = RERANKER_CONFIG.get("max_terms", 200000)
+K1 = RERANKER_CONFIG.get("k1", 1.5)
+B = RERANKER_CONFIG.get("b", 0.75)
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+
+class Bm25Index:
+    """BM25 statistics over every article the service has processed.
+
+    Terms get integer IDs in first-seen order and ``doc_freq[id]`` counts the
+    articles containing the term, so IDF reflects the whole article stream
+    rather than the handful of matches being reranked. ``observe`` adds
+    articles incrementally; ``save``/``load`` persist the vocabulary as one
+    newline-joined UTF-8 buffer next to a uint32 frequency array. Each save
+    first trims the vocabulary to the ``max_terms`` terms found in the most
+    articles. ``version`` is ``n_docs`` as of the last save or load.
+    """
+
+    def __init__(self, k1=K1, b=B, max_terms=MAX_TERMS):
+        self.k1 = k1
+        self.b = b
+        self.max_terms = max_terms
+        self.term_ids = {}
+        self.doc_freq = np.zeros(1024, dtype=np.uint32)
+        self.n_docs = 0
+        self.unsaved = 0
+        self.version = 0
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+
+    @staticmethod
+    def tokenize(text):
+        return TOKEN_PATTERN.findall(text.lower())
+
+    def query_terms(self, query):
+        """Distinct terms of ``query`` and how often each occurs."""
+        terms, counts = np.unique(self.tokenize(query), return_counts=True)
+        return terms.tolist(), counts
+
+    def observe(self, term_lists):
+        """Count one article per list of distinct terms.
+
+        Returns True once ``SAVE_EVERY`` articles have been added since the
+        last save, so the caller can schedule one off the request path.
+        """
+        with self._lock:
+            for terms in term_lists:
+                ids = [self.term_ids.setdefault(term, len(self.term_ids)) for term in terms]
+                if len(self.term_ids) > len(self.doc_freq):
+                    grown = np.zeros(2 * len(self.term_ids), dtype=np.uint32)
+                    grown[: len(self.doc_freq)] = self.doc_freq
+                    self.doc_freq = grown
+                self.doc_freq[ids] += 1
+                self.n_docs += 1
+                self.unsaved += 1
+            return self.unsaved >= SAVE_EVERY
+
+    def idf(self, terms):
+        with self._lock:
+            ids = np.fromiter((self.term_ids.get(term, -1) for term in terms), dtype=np.int64, count=len(terms))
+            doc_freq = np.where(ids >= 0, self.doc_freq[ids], 0).astype(np.float64)
+            n_docs = self.n_docs
+        return np.log1p((n_docs - doc_freq + 0.5) / (doc_freq + 0.5))
+
+    def score(self, documents, terms, counts):
+        """BM25 score of each document for a query given as ``query_terms``.
+
+        Documents are reduced to a term-frequency matrix over the query's
+        distinct terms and scored with one matrix-vector product.
+        """
+        scores = np.zeros(len(documents))
+        if not documents or not terms:
+            return scores
+
+        columns = {term: column for column, term in enumerate(terms)}
+        term_freq = np.zeros((len(documents), len(terms)))
+        doc_len = np.empty(len(documents))
+        for row, document in enumerate(documents):
+            tokens = self.tokenize(document)
+            doc_len[row] = len(tokens)
+            np.add.at(term_freq[row], [columns[token] for token in tokens if token in columns], 1)
+
+        avgdl = doc_len.mean() or 1.0
+        norm = self.k1 * (1 - self.b + self.b * doc_len / avgdl)
+        weights = term_freq * (self.k1 + 1) / (term_freq + norm[:, None])
+        return weights @ (self.idf(terms) * counts)
+
+    def _prune(self):
+        """Drop all but the ``max_terms`` most frequent terms; call with ``_lock`` held.
+
+        A dropped term is rare, so its IDF is close to the maximum anyway; if
+        it turns up again it is counted from scratch.
+        """
+        if not self.max_terms or len(self.term_ids) <= self.max_terms:
+            return
+        doc_freq = self.doc_freq[: len(self.term_ids)]
+        # Kept in first-seen order, ties broken the same way
+        keep = np.sort(np.argsort(-doc_freq.astype(np.int64), kind="stable")[: self.max_terms])
+        terms = list(self.term_ids)
+        self.term_ids = {terms[old_id]: term_id for term_id, old_id in enumerate(keep.tolist())}
+        pruned = np.zeros(max(2 * len(keep), 1024), dtype=np.uint32)
+        pruned[: len(keep)] = doc_freq[keep]
+        self.doc_freq = pruned
+
+    def save(self, path=INDEX_PATH):
+        """Write the index as .npz, atomically replacing ``path``."""
+        with self._lock:
+            self._prune()
+            terms = list(self.term_ids)
+            doc_freq = self.doc_freq[: len(terms)].copy()
+            n_docs = self.n_docs
+            self.unsaved = 0
+
+        with self._save_lock:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = path + ".tmp.npz"
+            np.savez_compressed(
+                tmp_path,
+                terms=np.frombuffer("\n".join(terms).encode("utf-8"), dtype=np.uint8),
+                doc_freq=doc_freq,
+                n_docs=np.array(n_docs),
+            )
+            os.replace(tmp_path, path)
+            self.version = max(self.version, n_docs)
+
+    def load(self, path=INDEX_PATH):
+        """Replace the statistics with those written by ``save``."""
+        with np.load(path, allow_pickle=False) as data:
+            blob = data["terms"].tobytes().decode("utf-8")
+            doc_freq = data["doc_freq"].astype(np.uint32)
+            n_docs = int(data["n_docs"])
+        terms = blob.split("\n") if blob else []
+
+        with self._lock:
+            self.term_ids = {term: term_id for term_id, term in enumerate(terms)}
+            self.doc_freq = np.zeros(max(2 * len(terms), 1024), dtype=np.uint32)
+            self.doc_freq[: len(terms)] = doc_freq
+            self.n_docs = n_docs
+            self.unsaved = 0
+            self.version = n_docs
+
+
+bm25_index = Bm25Index()
+
+
+def load_bm25_index(path=INDEX_PATH):
+    """Load the persisted index at startup; start empty if there is none."""
+    if not os.path.exists(path):
+        return bm25_index
+    try:
+        bm25_index.load(path)
+        print(f"Loaded BM25 index: {bm25_index.n_docs} articles, {len(bm25_index.term_ids)} terms")
+    except Exception as e:
+        print(f"Could not load BM25 index from {path}: {e}")
+    return bm25_index
+
+
+def bm25_index_for(version, path=INDEX_PATH):
+    """``bm25_index``, reloaded from ``path`` first if ``version`` is newer than it.
+
+    Only the parent process observes articles; process-pool workers score with
+    the copy they started with and, like ``snapshot_for`` with the company
+    snapshot, pick up the parent's statistics from the persisted file once a
+    request names a newer version.
+    """
+    if version is not None and version > bm25_index.version:
+        try:
+            bm25_index.load(path)
+        except Exception as e:
+            print(f"Could not reload BM25 index from {path}: {e}")
+        # Another process may have saved an older index since; don't reload on every call
+        bm25_index.version = max(bm25_index.version, version)
+    return bm25_index
+
+
+def save_bm25_index(path=INDEX_PATH):
+    try:
+        bm25_index.save(path)
+    except Exception as e:
+        print(f"Could not save BM25 index to {path}: {e}")
@@ -0,0 +1,75 @@
+from collections import defaultdict
+import numpy as np
+from src.services.company_table import stable_hash
+
+NGRAM_SIZE = 3
+
+
+def name_keys(name: str, ngram_size: int = NGRAM_SIZE) -> set:
+    """Character n-grams plus whole tokens used as blocking keys for a name."""
+    keys = {name[i:i + ngram_size] for i in range(len(name) - ngram_size + 1)}
+    keys.update("#" + token for token in name.split())
+    return keys
+
+
+class CandidateIndex:
+    """Inverted index from n-grams/tokens to company rows.
+
+    Built once over the normalized company name columns. For an entity it
+    returns only the rows that share at least one key with it; a row that
+    shares none cannot reach the match threshold (no substring or exact boost,
+    no core-word overlap and a low fuzzy ratio), so fuzzy scoring can skip it.
+
+    Postings are stored CSR-style in flat arrays keyed by sorted 64-bit key
+    hashes, so the index can live in a shared memory-mapped snapshot. A hash
+    collision can only add candidate rows, never drop one.
+    """
+
+    def __init__(self, arrays, ngram_size: int = NGRAM_SIZE):
+        self.ngram_size = ngram_size
+        self.key_hashes = arrays["candidates.key_hashes"]
+        self.indptr = arrays["candidates.indptr"]
+        self.rows = arrays["candidates.rows"]
+
+    @staticmethod
+    def build(*name_columns, ngram_size: int = NGRAM_SIZE):
+        """Index arrays for the given columns of strings."""
+        postings = defaultdict(set)
+        for column in name_columns:
+            for row, name in enumerate(column):
+                for key in name_keys(name, ngram_size):
+                    postings[key].add(row)
+
+        keys = list(postings)
+        hashes = stable_hash(keys)
+        order = np.argsort(hashes, kind="stable")
+        rows = [sorted(postings[keys[i]]) for i in order]
+        indptr = np.zeros(len(keys) + 1, dtype=np.int64)
+        np.cumsum([len(r) for r in rows], out=indptr[1:])
+        return {
+            "candidates.key_hashes": hashes[order],
+            "candidates.indptr": indptr,
+            "candidates.rows": np.fromiter(
+                (row for r in rows for row in r), dtype=np.int32, count=int(indptr[-1])
+            ),
+        }
+
+    def candidates(self, name: str):
+        """Sorted candidate rows for ``name``.
+
+        Returns ``None`` when the name is too short to block on, meaning every
+        row has to be scored.
+        """
+        if len(name) < self.ngram_size:
+            return None
+
+        if not len(self.key_hashes):
+            return np.empty(0, dtype=np.int64)
+        hashes = stable_hash(list(name_keys(name, self.ngram_size)))
+        positions = np.minimum(np.searchsorted(self.key_hashes, hashes), len(self.key_hashes) - 1)
+        positions = positions[self.key_hashes[positions] == hashes]
+        if not positions.size:
+            return np.empty(0, dtype=np.int64)
+        return np.unique(np.concatenate([
+            self.rows[self.indptr[position]:self.indptr[position + 1]] for position in positions
+        ])).astype(np.int64)
@@ -0,0 +1,36 @@
+import joblib  # type: ignore
+import yaml  # type: ignore
+
+# Load config.yaml ONCE globally
+with open("config.yaml", "r") as file:
+    CONFIG = yaml.safe_load(file)
+
+CLASSIFIER_CONFIG = CONFIG.get("classifier", {})
+MODEL_PATH = CLASSIFIER_CONFIG.get(
+    "model_path", "./src/models/finance_news_classifier_v2.joblib"
+)
+# "r" memory-maps the numpy arrays inside the (uncompressed) joblib dump, so
+# every worker process on the box shares the same physical pages.
+MMAP_MODE = CLASSIFIER_CONFIG.get("mmap_mode", "r")
+
+_pipeline = None
+
+
+def load_classifier():
+    """Load the finance-news pipeline once and keep it in memory."""
+    global _pipeline
+    if _pipeline is None:
+        _pipeline = joblib.load(MODEL_PATH, mmap_mode=MMAP_MODE)
+    return _pipeline
+
+
+def predict_many(texts):
+    """Classify a batch of texts with a single vectorized sklearn call."""
+    if not texts:
+        return []
+    pipeline = load_classifier()
+    return [bool(label) for label in pipeline.predict(list(texts))]
+
+
+def predict_one(text):
+    return predict_many([text])[0]
@@ -0,0 +1,283 @@
+import hashlib
+import os
+import threading
+import numpy as np
+import pandas as pd
+import yaml  # type: ignore
+from src.services.candidate_index import CandidateIndex
+from src.services.company_table import StringColumn, read_table, write_table
+from src.services.data_fetcher import fetch_api_data
+from src.services.scoring_index import SubstringIndex, TokenIncidence
+from src.utils.text_processing import normalize_name, remove_common_words
+
+# Load config.yaml
+with open("config.yaml", "r") as file:
+    config = yaml.safe_load(file)
+
+SNAPSHOT_PATH = config["data"].get("snapshot_path", "./data/company_snapshot.bin")
+REFRESH_INTERVAL = config["data"]["cache_timeout"]
+# How soon to retry while serving no companies or a restored on-disk copy
+RETRY_INTERVAL = config["data"].get("snapshot_retry_interval", 60)
+
+# String columns of a snapshot: the three scored name fields, then only the
+# fields a match response needs
+SNAPSHOT_COLUMNS = (
+    "clean_company_names",
+    "normalized_short_names",
+    "normalized_ticker_names",
+    "company_codes",
+    "response_company_names",
+    "response_ticker_names",
+)
+
+
+def _as_str_list(series):
+    return series.fillna("").astype(str).tolist()
+
+
+def _content_version(columns):
+    """Stable short hash of the snapshot contents."""
+    digest = hashlib.sha1()
+    for name in SNAPSHOT_COLUMNS:
+        digest.update("\x1f".join(columns[name]).encode("utf-8"))
+        digest.update(b"\x1e")
+    return digest.hexdigest()[:12]
+
+
+def _build_arrays(columns):
+    """Flat arrays for the string columns and every matching index."""
+    arrays = {}
+    for name in SNAPSHOT_COLUMNS:
+        arrays.update(StringColumn.from_strings(columns[name]).arrays(name))
+
+    names = (
+        columns["clean_company_names"],
+        columns["normalized_short_names"],
+        columns["normalized_ticker_names"],
+    )
+    arrays.update(CandidateIndex.build(*names))
+    arrays.update(SubstringIndex.build(*names))
+    arrays.update(TokenIncidence.build([dict.fromkeys(name.split()) for name in names[0]]))
+    # Rows whose clean name equals their ticker
+    arrays["exact_match_rows"] = np.array(
+        [row for row, (clean, ticker) in enumerate(zip(names[0], names[2])) if clean == ticker],
+        dtype=np.int64,
+    )
+    return arrays
+
+
+class CompanySnapshot:
+    """One immutable version of the company table and its matching indexes.
+
+    Requests grab a reference to the current snapshot once and use it for the
+    whole match, so a refresh swapping in a new snapshot never mixes arrays
+    from two versions.
+
+    Everything lives in flat numpy arrays: names as UTF-8 buffers with
+    offsets, word sets as token-ID runs, indexes as sorted hash and CSR
+    arrays. A snapshot loaded from disk maps its file read-only, so all
+    workers on a host share one copy.
+    """
+
+    def __init__(self, arrays, version):
+        self.version = version
+        self.arrays = arrays
+        self.clean_company_names = StringColumn.from_arrays(arrays, "clean_company_names")
+        self.normalized_short_names = StringColumn.from_arrays(arrays, "normalized_short_names")
+        self.normalized_ticker_names = StringColumn.from_arrays(arrays, "normalized_ticker_names")
+        self.company_codes = StringColumn.from_arrays(arrays, "company_codes")
+        self.response_company_names = StringColumn.from_arrays(arrays, "response_company_names")
+        self.response_ticker_names = StringColumn.from_arrays(arrays, "response_ticker_names")
+
+        # Blocking index over the same columns the fuzzy scorers use
+        self.candidate_index = CandidateIndex(arrays)
+
+        # Multi-field substring search and sparse token incidence for scoring
+        self.substring_index = SubstringIndex(arrays)
+        self.token_incidence = TokenIncidence(arrays)
+
+        # Rows whose clean name equals their ticker, keyed by that name
+        self.exact_match_rows = {}
+        for row in arrays["exact_match_rows"].tolist():
+            self.exact_match_rows.setdefault(self.clean_company_names[row], []).append(row)
+
+    def __len__(self):
+        return len(self.company_codes)
+
+    @classmethod
+    def from_records(cls, records):
+        """Build a snapshot from the GoodReturns company-list records."""
+        df = pd.DataFrame(records)
+        if df.empty:
+            columns = {name: [] for name in SNAPSHOT_COLUMNS}
+            return cls(_build_arrays(columns), "empty")
+
+        # Remove entries where IndustryName is "Exchange Platform"
+        df = df[df["IndustryName"] != "Exchange Platform"]
+
+        # Normalize columns just once
+        df[["NormalizedCompanyName", "NormalizedShortName", "NormalizedTickerName"]] = df[
+            ["CompanyName", "ShortCompanyName", "TickerName"]
+        ].map(normalize_name)
+
+        # Precompute clean names
+        df["CleanCompanyName"] = df["NormalizedCompanyName"].apply(remove_common_words)
+
+        # Extract columns once, FORCE type to string
+        columns = {
+            "clean_company_names": _as_str_list(df["CleanCompanyName"]),
+            "normalized_short_names": _as_str_list(df["NormalizedShortName"]),
+            "normalized_ticker_names": _as_str_list(df["NormalizedTickerName"]),
+            # Output fields, so matches never touch a DataFrame
+            "company_codes": df["CompanyCode"].map(str).tolist(),
+            "response_company_names": df["CompanyName"].map(str).tolist(),
+            "response_ticker_names": df["TickerName"].map(str).tolist(),
+        }
+        return cls(_build_arrays(columns), _content_version(columns))
+
+    @classmethod
+    def load(cls, path):
+        """Map a snapshot written by ``save`` (no network, no pandas, no copy)."""
+        arrays, meta = read_table(path)
+        return cls(arrays, meta["version"])
+
+    def save(self, path):
+        """Write the snapshot as one flat table file, atomically replacing ``path``."""
+        write_table(path, dict(self.arrays), {"version": self.version})
+
+
+class SnapshotManager:
+    """Keeps the current company snapshot fresh without blocking requests.
+
+    A background thread refetches the company list every ``refresh_interval``
+    seconds, builds the new snapshot off the request path and swaps the
+    reference in one assignment. The last good snapshot is persisted so a
+    cold start (or a GoodReturns outage at boot) loads it from disk.
+    """
+
+    def __init__(self, fetch=fetch_api_data, path=SNAPSHOT_PATH, refresh_interval=REFRESH_INTERVAL):
+        self._fetch = fetch
+        self.path = path
+        self.refresh_interval = refresh_interval
+        self._snapshot = None
+        # True while serving a snapshot read from disk rather than fetched
+        self._from_disk = False
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def current(self):
+        """The snapshot to use for one request; loads one on first use."""
+        snapshot = self._snapshot
+        if snapshot is None:
+            with self._lock:
+                if self._snapshot is None:
+                    self._snapshot = self._initial_snapshot()
+                snapshot = self._snapshot
+        return snapshot
+
+    def loaded(self):
+        """The current snapshot, or None before one is loaded; never loads one."""
+        return self._snapshot
+
+    def snapshot_for(self, version):
+        """The snapshot with ``version`` if it can be had, else the current one.
+
+        Forked workers do not see the parent's refreshes; when a request names
+        a newer version they pick it up from the persisted snapshot file.
+        """
+        snapshot = self.current()
+        if version is None or snapshot.version == version:
+            return snapshot
+        try:
+            on_disk = CompanySnapshot.load(self.path)
+        except Exception as e:
+            print(f"Error loading company snapshot from {self.path}: {e}")
+            return snapshot
+        if on_disk.version == version:
+            self.install(on_disk)
+            return on_disk
+        return snapshot
+
+    def _initial_snapshot(self):
+        if os.path.exists(self.path):
+            try:
+                snapshot = CompanySnapshot.load(self.path)
+                self._from_disk = True
+                print(f"Loaded company snapshot {snapshot.version} from {self.path}")
+                return snapshot
+            except Exception as e:
+                print(f"Error loading company snapshot from {self.path}: {e}")
+
+        snapshot = CompanySnapshot.from_records(self._fetch())
+        if len(snapshot):
+            snapshot = self._persist(snapshot)
+        return snapshot
+
+    def _persist(self, snapshot):
+        """Save ``snapshot`` and return it mapped back from the file.
+
+        Serving the mapped copy lets this process, its forked workers and any
+        other worker loading the file share one set of pages. If the file
+        cannot be written the in-memory snapshot is returned.
+        """
+        try:
+            snapshot.save(self.path)
+            return CompanySnapshot.load(self.path)
+        except (OSError, ValueError) as e:
+            print(f"Error saving company snapshot to {self.path}: {e}")
+            return snapshot
+
+    def install(self, snapshot):
+        """Atomically make ``snapshot`` the current one."""
+        self._snapshot = snapshot
+
+    def refresh(self):
+        """Fetch the company list and swap in a new snapshot if it changed."""
+        records = self._fetch(force=True)
+        if not records:
+            # Keep serving the last good snapshot
+            return False
+
+        snapshot = CompanySnapshot.from_records(records)
+        current = self._snapshot
+        if current is not None and current.version == snapshot.version:
+            self._from_disk = False
+            return False
+
+        snapshot = self._persist(snapshot)
+        self.install(snapshot)
+        self._from_disk = False
+        print(f"Company snapshot updated to {snapshot.version} ({len(snapshot)} companies)")
+        return True
+
+    def _next_wait(self):
+        if self._from_disk or not len(self.current()):
+            return RETRY_INTERVAL
+        return self.refresh_interval
+
+    def _run(self):
+        # A snapshot restored from disk may be old, so check the API right away
+        wait = 0 if self._from_disk else self._next_wait()
+        while not self._stop.wait(wait):
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"Error refreshing company snapshot: {e}")
+            wait = self._next_wait()
+
+    def start(self):
+        """Load the initial snapshot and start the background refresher."""
+        self.current()
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run, name="company-snapshot-refresh", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+
+snapshot_manager = SnapshotManager()
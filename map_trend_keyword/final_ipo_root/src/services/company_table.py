@@ -0,0 +1,135 @@
+"""Flat, memory-mappable storage for the company snapshot.
+
+Every column and index of a snapshot is a plain numpy array. ``write_table``
+lays them out in one file (a JSON header followed by 64-byte aligned raw
+arrays) and ``read_table`` maps that file read-only, so each worker process
+that loads the same snapshot shares one copy of its pages instead of holding
+a private one.
+"""
+import hashlib
+import json
+import mmap
+import os
+import numpy as np
+
+MAGIC = b"IPOTBL01"
+ALIGNMENT = 64
+
+# Never produced by normalize_name; terminates each string in a StringColumn
+STRING_TERMINATOR = "\x00"
+
+
+def stable_hash(keys):
+    """64-bit hashes of ``keys`` that are the same in every process.
+
+    Python's ``hash`` is salted per interpreter, so it cannot key arrays that
+    separately started workers share.
+    """
+    return np.fromiter(
+        (
+            int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "little")
+            for key in keys
+        ),
+        dtype=np.uint64,
+        count=len(keys),
+    )
+
+
+class StringColumn:
+    """A column of strings as one UTF-8 buffer plus row offsets.
+
+    Each string is stored followed by ``STRING_TERMINATOR``; row ``i``
+    occupies ``data[offsets[i]:offsets[i + 1] - 1]``. Uses about a quarter of
+    a fixed-width unicode array for ASCII names and no per-string objects.
+    """
+
+    def __init__(self, data, offsets):
+        self.data = data
+        self.offsets = offsets
+
+    @classmethod
+    def from_strings(cls, strings):
+        strings = [str(value).replace(STRING_TERMINATOR, "") for value in strings]
+        encoded = "".join(value + STRING_TERMINATOR for value in strings).encode("utf-8")
+        offsets = np.zeros(len(strings) + 1, dtype=np.int64)
+        np.cumsum([len(value.encode("utf-8")) + 1 for value in strings], out=offsets[1:])
+        return cls(np.frombuffer(encoded, dtype=np.uint8), offsets)
+
+    def arrays(self, prefix):
+        return {f"{prefix}.data": self.data, f"{prefix}.offsets": self.offsets}
+
+    @classmethod
+    def from_arrays(cls, arrays, prefix):
+        return cls(arrays[f"{prefix}.data"], arrays[f"{prefix}.offsets"])
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, row):
+        start, end = self.offsets[row], self.offsets[row + 1] - 1
+        return self.data[start:end].tobytes().decode("utf-8")
+
+    def tolist(self, rows=None):
+        """Decoded strings for every row, or only ``rows``, in order."""
+        if rows is None:
+            if not len(self):
+                return []
+            return self.data.tobytes().decode("utf-8").split(STRING_TERMINATOR)[:-1]
+        return [self[row] for row in rows]
+
+
+def write_table(path, arrays, meta):
+    """Write ``arrays`` and the JSON-serializable ``meta``, atomically replacing ``path``."""
+    layout = {}
+    offset = 0
+    for name, array in arrays.items():
+        array = np.ascontiguousarray(array)
+        arrays[name] = array
+        layout[name] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": offset}
+        offset += -(-array.nbytes // ALIGNMENT) * ALIGNMENT
+
+    header = json.dumps({"meta": meta, "arrays": layout}).encode("utf-8")
+    data_start = -(-(len(MAGIC) + 8 + len(header)) // ALIGNMENT) * ALIGNMENT
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as file:
+        file.write(MAGIC)
+        file.write(len(header).to_bytes(8, "little"))
+        file.write(header)
+        for name, array in arrays.items():
+            file.seek(data_start + layout[name]["offset"])
+            file.write(array.tobytes())
+        file.truncate(data_start + offset)
+    os.replace(tmp_path, path)
+
+
+def read_table(path):
+    """Map a file written by ``write_table``; returns ``(arrays, meta)``.
+
+    The arrays are read-only views of the mapping, which stays open for as
+    long as any of them is referenced.
+    """
+    with open(path, "rb") as file:
+        mapping = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    if mapping[: len(MAGIC)] != MAGIC:
+        raise ValueError(f"{path} is not a company table file")
+    header_length = int.from_bytes(mapping[len(MAGIC): len(MAGIC) + 8], "little")
+    header_start = len(MAGIC) + 8
+    header = json.loads(mapping[header_start: header_start + header_length].decode("utf-8"))
+    data_start = -(-(header_start + header_length) // ALIGNMENT) * ALIGNMENT
+
+    arrays = {}
+    for name, spec in header["arrays"].items():
+        dtype = np.dtype(spec["dtype"])
+        count = int(np.prod(spec["shape"], dtype=np.int64))
+        if not count:
+            arrays[name] = np.empty(spec["shape"], dtype=dtype)
+            continue
+        arrays[name] = np.frombuffer(
+            mapping, dtype=dtype, count=count, offset=data_start + spec["offset"]
+        ).reshape(spec["shape"])
+    return arrays, header["meta"]
@@ -17,10 +17,10 @@ company_data_cache = None
 last_updated = 0
 CACHE_TIMEOUT = config["data"]["cache_timeout"]
 
-def fetch_api_data():
-    """Fetch company data and cache it."""
+def fetch_api_data(force=False):
+    """Fetch company data and cache it. ``force`` bypasses the cache."""
     global company_data_cache, last_updated
-    if company_data_cache and (time.time() - last_updated < CACHE_TIMEOUT):
+    if not force and company_data_cache and (time.time() - last_updated < CACHE_TIMEOUT):
         return company_data_cache
 
     print("Fetching company data from API...")
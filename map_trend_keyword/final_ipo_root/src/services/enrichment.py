@@ -0,0 +1,258 @@
+"""Kafka enrichment stage: the IPO matcher over the ``trend_capture`` stream.
+
+``EnrichmentWorker`` polls a batch of crawled articles, runs the classifier,
+NER, matcher and reranker on it in-process, publishes every article with an
+``ipo_enrichment`` field to the output topic and only then commits the
+batch's offsets. A crash or rebalance before the commit means the batch is
+read again (at-least-once; the output is keyed by ArticleID). A batch that
+still fails after ``max_attempts`` tries is published with its errors; the
+records enrichment cannot process at all go to the dead-letter topic, so
+one bad record never wedges its partition. Offsets are never committed for
+records that reached neither topic. Throughput
+scales by starting more workers with the same group id, up to the number of
+partitions of the input topic.
+"""
+import asyncio
+import logging
+import time
+import yaml  # type: ignore
+from src.services.bm25_index import bm25_index, save_bm25_index
+from src.services.company_snapshot import snapshot_manager
+from src.services.entity_extractor import PREPROCESS_MAX_LENGTH, generate_entities_many, ner_batcher
+from src.services.metrics import observe_article, stage_timer
+from src.services.pipeline import match_articles, rerank_articles, screen_articles
+
+# Load config.yaml
+with open("config.yaml", "r") as file:
+    config = yaml.safe_load(file)
+
+ENRICHMENT_CONFIG = config.get("enrichment", {})
+BROKER = ENRICHMENT_CONFIG.get("broker", "localhost:9092")
+INPUT_TOPIC = ENRICHMENT_CONFIG.get("input_topic", "trend_capture")
+OUTPUT_TOPIC = ENRICHMENT_CONFIG.get("output_topic", "trend_enriched")
+DEAD_LETTER_TOPIC = ENRICHMENT_CONFIG.get("dead_letter_topic", "trend_enrichment_dead_letter")
+GROUP_ID = ENRICHMENT_CONFIG.get("group_id", "ipo-enrichment")
+BATCH_SIZE = ENRICHMENT_CONFIG.get("batch_size", 64)
+POLL_TIMEOUT_MS = ENRICHMENT_CONFIG.get("poll_timeout_ms", 1000)
+MAX_ATTEMPTS = ENRICHMENT_CONFIG.get("max_attempts", 3)
+RETRY_BACKOFF = ENRICHMENT_CONFIG.get("retry_backoff", 5)
+SEND_TIMEOUT = ENRICHMENT_CONFIG.get("send_timeout", 30)
+
+NOT_RELEVANT_MESSAGE = "Not a relevant ipo/company article"
+EXTRACTION_FAILED_MESSAGE = "Entity extraction failed."
+
+
+def article_text(article):
+    return f"{article.get('title') or ''} {article.get('content') or ''}"
+
+
+async def enrich_articles(articles):
+    """Enrichment results for a batch of ``trend_capture`` articles.
+
+    Returns one dict per article, shaped like an /extract-entities/ response
+    without the cache field, and whether any article failed NER or matching
+    (worth retrying once TorchServe is back).
+    """
+    query_texts = [article_text(article) for article in articles]
+    with stage_timer("screen"):
+        clean_texts = screen_articles(
+            query_texts, [article.get("content") or "" for article in articles], PREPROCESS_MAX_LENGTH
+        )
+
+    results = [{"status": False, "message": NOT_RELEVANT_MESSAGE}] * len(articles)
+    relevant = [idx for idx, clean_text in enumerate(clean_texts) if clean_text is not None]
+    with stage_timer("ner"):
+        extracted = await generate_entities_many([clean_texts[idx] for idx in relevant])
+
+    failed = False
+    extracted_ok = []
+    for idx, extracted_data in zip(relevant, extracted):
+        if extracted_data:
+            extracted_ok.append((idx, extracted_data))
+        else:
+            results[idx] = {"status": False, "error": EXTRACTION_FAILED_MESSAGE}
+            failed = True
+
+    with stage_timer("match"):
+        batch_matches, snapshot_version = match_articles(
+            [data for _, data in extracted_ok], snapshot_manager.current().version
+        )
+    matched = []
+    for (idx, extracted_data), matches in zip(extracted_ok, batch_matches):
+        if isinstance(matches, Exception):
+            results[idx] = {"status": False, "error": str(matches)}
+            failed = True
+        else:
+            matched.append((idx, extracted_data, matches))
+
+    with stage_timer("rerank"):
+        reranked, article_terms = rerank_articles(
+            [matches for _, _, matches in matched], [query_texts[idx] for idx, _, _ in matched]
+        )
+    if article_terms and bm25_index.observe(article_terms):
+        save_bm25_index()
+
+    for (idx, extracted_data, _), matches in zip(matched, reranked):
+        entities = extracted_data.get("html_chunk_2", {})
+        observe_article(len(entities), len(matches))
+        results[idx] = {
+            "status": True,
+            "matches": matches,
+            "extracted_entities": entities,
+            "snapshot_version": snapshot_version,
+        }
+    return results, failed
+
+
+class EnrichmentWorker:
+    """One consumer-group member of the enrichment stage.
+
+    ``consumer`` must not auto-commit. Works with kafka-python's
+    ``KafkaConsumer``/``KafkaProducer`` or the in-memory stand-ins in
+    ``tests.memory_kafka``.
+    """
+
+    def __init__(
+        self,
+        consumer,
+        producer,
+        output_topic=OUTPUT_TOPIC,
+        dead_letter_topic=DEAD_LETTER_TOPIC,
+        batch_size=BATCH_SIZE,
+        poll_timeout_ms=POLL_TIMEOUT_MS,
+        max_attempts=MAX_ATTEMPTS,
+        retry_backoff=RETRY_BACKOFF,
+    ):
+        self.consumer = consumer
+        self.producer = producer
+        self.output_topic = output_topic
+        self.dead_letter_topic = dead_letter_topic
+        self.batch_size = batch_size
+        self.poll_timeout_ms = poll_timeout_ms
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+        # The shared NER client is bound to the loop it first ran on
+        self.loop = asyncio.new_event_loop()
+        self.attempts = 0
+        self.enriched = 0
+        self.dead_lettered = 0
+        self._stopped = False
+
+    def _rewind(self, batch):
+        for partition, records in batch.items():
+            self.consumer.seek(partition, records[0].offset)
+
+    def _enrich_each(self, articles):
+        """Per-record ``enrich_articles``; a record it raises on gets the exception as its result."""
+        results, failed = [], False
+        for record in articles:
+            try:
+                (result,), record_failed = self.loop.run_until_complete(enrich_articles([record.value]))
+            except Exception as e:
+                result, record_failed = e, False
+            results.append(result)
+            failed = failed or record_failed
+        return results, failed
+
+    def _dead_letter_value(self, record, error):
+        return {
+            "topic": record.topic,
+            "partition": record.partition,
+            "offset": record.offset,
+            "value": record.value,
+            "error": str(error),
+        }
+
+    def _publish(self, sends):
+        """Send ``(topic, value, key)`` triples and wait for every acknowledgement."""
+        futures = [self.producer.send(topic, value=value, key=key) for topic, value, key in sends]
+        self.producer.flush()
+        for future in futures:
+            future.get(timeout=SEND_TIMEOUT)
+
+    def run_once(self):
+        """Poll, enrich, publish and commit one batch; returns records committed."""
+        batch = self.consumer.poll(timeout_ms=self.poll_timeout_ms, max_records=self.batch_size)
+        if not batch:
+            return 0
+        records = [record for partition_records in batch.values() for record in partition_records]
+        articles = [record for record in records if isinstance(record.value, dict)]
+
+        # Counted up front, so a batch that raises still runs out of attempts
+        self.attempts += 1
+        last_attempt = self.attempts >= self.max_attempts
+        published = 0
+        try:
+            try:
+                results, failed = self.loop.run_until_complete(
+                    enrich_articles([record.value for record in articles])
+                )
+            except Exception:
+                if not last_attempt:
+                    raise
+                # Find the records that break enrichment so only they are dead-lettered
+                results, failed = self._enrich_each(articles)
+            if failed and not last_attempt:
+                raise RuntimeError(f"enrichment failed for part of the batch (attempt {self.attempts})")
+
+            sends = []
+            for record, result in zip(articles, results):
+                key = record.value.get("ArticleID")
+                if isinstance(result, Exception):
+                    logging.error(f"Dead-lettering record {record.partition}@{record.offset}: {result}")
+                    sends.append((self.dead_letter_topic, self._dead_letter_value(record, result), key))
+                else:
+                    sends.append((self.output_topic, {**record.value, "ipo_enrichment": result}, key))
+            self._publish(sends)
+            published = sum(topic == self.output_topic for topic, _, _ in sends)
+            self.dead_lettered += len(sends) - published
+        except Exception as e:
+            if not last_attempt:
+                # Nothing is committed, so the batch is read again after the pause
+                logging.error(f"Enrichment batch failed (attempt {self.attempts}/{self.max_attempts}), retrying: {e}")
+                self._rewind(batch)
+                time.sleep(self.retry_backoff)
+                return 0
+            logging.error(f"Enrichment batch failed {self.attempts} times, dead-lettering it: {e}")
+            try:
+                self._publish([
+                    (self.dead_letter_topic, self._dead_letter_value(record, e), None) for record in records
+                ])
+                self.dead_lettered += len(records)
+            except Exception as dead_letter_error:
+                # The producer itself is down; committing now would drop the batch, so
+                # read it again after the pause (still as a last attempt)
+                logging.error(f"Dead-lettering failed, retrying the batch: {dead_letter_error}")
+                self._rewind(batch)
+                time.sleep(self.retry_backoff)
+                return 0
+
+        self.attempts = 0
+        try:
+            self.consumer.commit()
+        except Exception as e:
+            # Typically a rebalance; the partition's new owner republishes the batch
+            logging.warning(f"Offset commit failed after publishing {published} articles: {e}")
+            return 0
+        self.enriched += published
+        return len(records)
+
+    def run(self, max_idle_polls=None):
+        """Process batches until ``stop()``, or ``max_idle_polls`` empty polls in a row."""
+        idle = 0
+        while not self._stopped:
+            if self.run_once():
+                idle = 0
+            else:
+                idle += 1
+                if max_idle_polls is not None and idle >= max_idle_polls:
+                    break
+
+    def stop(self):
+        self._stopped = True
+
+    def close(self):
+        self.consumer.close()
+        self.producer.close()
+        self.loop.run_until_complete(ner_batcher.drain())
+        self.loop.close()
@@ -22,8 +22,11 @@
 #         print("An error occurred:", str(e))
 #         return None
 
+import asyncio
 import yaml  # type: ignore
 import httpx  # type: ignore
+from src.services.ner_batcher import NerMicroBatcher
+from src.utils.text_processing import split_into_chunks
 
 # Load config.yaml ONCE globally
 with open("config.yaml", "r") as file:
@@ -32,6 +35,34 @@ with open("config.yaml", "r") as file:
 # Create a single reusable async client
 client = httpx.AsyncClient(timeout=10)
 
+# Upper bound on NER requests one batch keeps in flight against TorchServe
+NER_MAX_CONCURRENCY = CONFIG["entity_extraction"].get("max_concurrency", 8)
+
+BATCHING_CONFIG = CONFIG["entity_extraction"].get("micro_batching", {})
+
+CHUNKING_CONFIG = CONFIG["entity_extraction"].get("chunking", {})
+CHUNKING_ENABLED = CHUNKING_CONFIG.get("enabled", False)
+CHUNK_MAX_CHARS = CHUNKING_CONFIG.get("max_chars", 2000)
+CHUNK_OVERLAP_SENTENCES = CHUNKING_CONFIG.get("overlap_sentences", 1)
+
+# Longest article text kept after preprocessing; chunking lifts the old 10k cut
+PREPROCESS_MAX_LENGTH = CHUNKING_CONFIG.get("max_article_chars", 200000) if CHUNKING_ENABLED else 10000
+
+async def post_batch(payloads):
+    """Send several NER payloads as one request; the handler answers a list."""
+    url = BATCHING_CONFIG.get("url") or CONFIG["entity_extraction"]["xlm_net_url"]
+    headers = {"Content-Type": "application/json"}
+    response = await client.post(url, json=payloads, headers=headers)
+    response.raise_for_status()
+    return response.json()
+
+# Shared by every caller of generate_entities when micro-batching is enabled
+ner_batcher = NerMicroBatcher(
+    post_batch,
+    max_batch_size=BATCHING_CONFIG.get("max_batch_size", 16),
+    max_wait_ms=BATCHING_CONFIG.get("max_wait_ms", 10),
+)
+
 async def generate_entities(article_content: str):
     url = CONFIG["entity_extraction"]["xlm_net_url"]
     payload = {
@@ -42,9 +73,87 @@ async def generate_entities(article_content: str):
     }
     headers = {"Content-Type": "application/json"}
 
+    if BATCHING_CONFIG.get("enabled", False):
+        return await ner_batcher.submit(payload)
+
     try:
         response = await client.post(url, json=payload, headers=headers)
         return response.json() if response.status_code == 200 else None
     except Exception as e:
         print("An error occurred:", str(e))
         return None
+
+def article_chunks(article_content: str):
+    """The texts sent to NER for one article: sentence chunks, or the whole text."""
+    if not CHUNKING_ENABLED or len(article_content) <= CHUNK_MAX_CHARS:
+        return [article_content]
+    return split_into_chunks(article_content, CHUNK_MAX_CHARS, CHUNK_OVERLAP_SENTENCES) or [article_content]
+
+def merge_chunk_entities(responses):
+    """Merge the NER responses of one article's chunks into a single response.
+
+    Entity keys seen in several (overlapping) chunks are kept once, with their
+    values de-duplicated in first-seen order. Returns ``None`` if any chunk
+    failed, so a partial extraction is never cached as the article's result.
+    """
+    if any(not response for response in responses):
+        return None
+    if len(responses) == 1:
+        return responses[0]
+
+    merged = dict(responses[0])
+    entities = {}
+    for response in responses:
+        for key, values in response.get("html_chunk_2", {}).items():
+            if key not in entities:
+                entities[key] = list(values) if isinstance(values, list) else values
+            elif isinstance(values, list) and isinstance(entities[key], list):
+                entities[key].extend(value for value in values if value not in entities[key])
+    merged["html_chunk_2"] = entities
+    return merged
+
+async def iter_chunk_entities(chunks, max_concurrency=NER_MAX_CONCURRENCY):
+    """Yield ``(index, response)`` for each chunk as its NER call completes."""
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def extract(index, chunk):
+        async with semaphore:
+            return index, await generate_entities(chunk)
+
+    tasks = [asyncio.ensure_future(extract(index, chunk)) for index, chunk in enumerate(chunks)]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for task in tasks:
+            task.cancel()
+
+async def generate_entities_many(contents, max_concurrency=NER_MAX_CONCURRENCY):
+    """Run NER for many texts concurrently, in input order.
+
+    Long texts are split into chunks when chunking is enabled; every chunk of
+    every text shares the same limit of ``max_concurrency`` requests in flight.
+    Failed extractions come back as ``None`` in their slot.
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def extract(chunk):
+        async with semaphore:
+            return await generate_entities(chunk)
+
+    chunk_lists = [article_chunks(content) for content in contents]
+    responses = await asyncio.gather(
+        *(extract(chunk) for chunks in chunk_lists for chunk in chunks)
+    )
+
+    results = []
+    position = 0
+    for chunks in chunk_lists:
+        results.append(merge_chunk_entities(responses[position:position + len(chunks)]))
+        position += len(chunks)
+    return results
+
+async def generate_article_entities(article_content: str):
+    """NER for one article, chunked like ``generate_entities_many``."""
+    [extracted_data] = await generate_entities_many([article_content])
+    return extracted_data
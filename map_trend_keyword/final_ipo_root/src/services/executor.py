@@ -0,0 +1,99 @@
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import yaml  # type: ignore
+
+# Load config.yaml
+with open("config.yaml", "r") as file:
+    config = yaml.safe_load(file)
+
+EXECUTOR_CONFIG = config.get("executor", {})
+# "thread", "process" or "inline" (run on the event loop, as before)
+EXECUTOR_MODE = EXECUTOR_CONFIG.get("mode", "thread")
+MAX_WORKERS = EXECUTOR_CONFIG.get("max_workers") or os.cpu_count()
+# CPU tasks allowed to run or wait at once before requests get a 503
+MAX_PENDING = EXECUTOR_CONFIG.get("max_pending") or 4 * MAX_WORKERS
+# How "process" workers start: "fork" shares the loaded models copy-on-write,
+# "forkserver"/"spawn" workers load them (and map the snapshot file) themselves
+START_METHOD = EXECUTOR_CONFIG.get("start_method", "fork")
+
+
+class ExecutorSaturated(Exception):
+    """Raised instead of queueing when too many CPU tasks are pending."""
+
+
+class CpuExecutor:
+    """Runs CPU-bound pipeline stages off the asyncio event loop.
+
+    In "process" mode every worker is started by ``start()`` itself, not on
+    the first request. With the "fork" start method that must happen after
+    the classifier, gazetteer and company snapshot are loaded, so workers
+    inherit those arrays copy-on-write instead of receiving them pickled per
+    call, and before any other thread starts: a fork copies locks held by
+    other threads (logging, the snapshot lock) into the child, where nothing
+    will ever release them. If other threads are already running, "fork"
+    falls back to "forkserver".
+    Submissions beyond ``max_pending`` fail fast with ``ExecutorSaturated``.
+    """
+
+    def __init__(self, mode=EXECUTOR_MODE, max_workers=MAX_WORKERS, max_pending=MAX_PENDING, start_method=START_METHOD):
+        if mode not in ("thread", "process", "inline"):
+            raise ValueError(f"Unknown executor mode: {mode}")
+        self.mode = mode
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.start_method = start_method
+        self.pending = 0
+        self._pool = None
+
+    def start(self, initializer=None):
+        if self._pool is not None or self.mode == "inline":
+            return
+        if self.mode == "process":
+            start_method = self.start_method
+            if start_method == "fork" and threading.active_count() > 1:
+                print(
+                    f"{threading.active_count()} threads running; starting CPU workers with forkserver instead of fork"
+                )
+                start_method = "forkserver"
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context(start_method),
+                initializer=initializer,
+            )
+            # Workers are otherwise created on the first submit, mid-request;
+            # one call per worker starts them all now
+            for future in [self._pool.submit(os.getpid) for _ in range(self.max_workers)]:
+                future.result()
+        else:
+            self._pool = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="cpu-stage"
+            )
+
+    async def run(self, func, *args):
+        """Run ``func(*args)`` in the pool and await its result."""
+        if self.pending >= self.max_pending:
+            raise ExecutorSaturated(
+                f"{self.pending} CPU tasks pending (limit {self.max_pending})"
+            )
+
+        self.pending += 1
+        try:
+            if self.mode == "inline":
+                return func(*args)
+            if self._pool is None:
+                self.start()
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._pool, func, *args)
+        finally:
+            self.pending -= 1
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+cpu_executor = CpuExecutor()
@@ -111,133 +111,210 @@
 #     return matches
 
 # --------------------code under 2s--------------------------------------------
-import pandas as pd
 import numpy as np
+import yaml  # type: ignore
 from rapidfuzz import fuzz, process
-from src.services.data_fetcher import fetch_api_data
+from src.services.company_snapshot import snapshot_manager
 from src.utils.text_processing import normalize_name, remove_common_words
 from src.utils.location_utils import classify_location
 
-# Fetch the data
-df = pd.DataFrame(fetch_api_data())
+# Load config.yaml
+with open("config.yaml", "r") as file:
+    config = yaml.safe_load(file)
 
-# Remove entries where IndustryName is "Exchange Platform"
-df = df[df["IndustryName"] != "Exchange Platform"]
-
-# Normalize columns just once
-df[["NormalizedCompanyName", "NormalizedShortName", "NormalizedTickerName"]] = df[
-    ["CompanyName", "ShortCompanyName", "TickerName"]
-].map(normalize_name)
-
-# Precompute clean names and sets
-df["CleanCompanyName"] = df["NormalizedCompanyName"].apply(remove_common_words)
-df["CleanCompanyWords"] = df["CleanCompanyName"].str.split().apply(set)
-
-# Extract arrays once, FORCE type to string
-clean_company_names = np.array(df["CleanCompanyName"].fillna("").astype(str).values, dtype='U')
-normalized_short_names = np.array(df["NormalizedShortName"].fillna("").astype(str).values, dtype='U')
-normalized_ticker_names = np.array(df["NormalizedTickerName"].fillna("").astype(str).values, dtype='U')
-clean_company_words = df["CleanCompanyWords"].values
+MATCHER_CONFIG = config.get("matcher", {})
+# Score only rows sharing an n-gram/token with the entity
+USE_CANDIDATE_INDEX = MATCHER_CONFIG.get("candidate_index", True)
+# Also run the exhaustive path and report any difference (for validation)
+VERIFY_CANDIDATES = MATCHER_CONFIG.get("verify_candidates", False)
 
 # Precompute similarities for all company names once
-def precompute_similarities(names):
+def precompute_similarities(names, snapshot, rows=None):
+    """Fuzzy scores of ``names`` against every company, or only ``rows``."""
+    # Decoded from the snapshot's UTF-8 buffers for this call only
+    clean = snapshot.clean_company_names.tolist(rows)
+    short = snapshot.normalized_short_names.tolist(rows)
+    ticker = snapshot.normalized_ticker_names.tolist(rows)
     return {
-        'clean': process.cdist(names, clean_company_names, scorer=fuzz.QRatio),
-        'short': process.cdist(names, normalized_short_names, scorer=fuzz.QRatio),
-        'ticker': process.cdist(names, normalized_ticker_names, scorer=fuzz.QRatio),
-        'partial_ticker': process.cdist(names, normalized_ticker_names, scorer=fuzz.partial_ratio),
+        'clean': process.cdist(names, clean, scorer=fuzz.QRatio),
+        'short': process.cdist(names, short, scorer=fuzz.QRatio),
+        'ticker': process.cdist(names, ticker, scorer=fuzz.QRatio),
+        'partial_ticker': process.cdist(names, ticker, scorer=fuzz.partial_ratio),
     }
 
-def find_matches(json_data):
-    if not json_data or "html_chunk_2" not in json_data:
+def _score_entities(entity_names, snapshot, rows=None):
+    """Best company for each name, scoring every row or only ``rows``.
+
+    The whole step is one entities x companies matrix computation. Returns,
+    for each name, a ``(row_index, score)`` tuple for the best company above
+    the threshold, or ``None`` when nothing qualifies.
+    """
+    if not entity_names:
         return []
 
-    extracted_entities = list(json_data["html_chunk_2"].keys())
-    matches = []
-    seen_company_codes = set()
-
-    # Precompute similarities for the entity names
-    entity_names = [remove_common_words(normalize_name(entity)) for entity in extracted_entities]
-    similarities = precompute_similarities(entity_names)
-
-    # Convert lists to numpy arrays for faster access
-    clean_similarities = similarities['clean']
-    short_similarities = similarities['short']
-    ticker_similarities = similarities['ticker']
-    partial_ticker_similarities = similarities['partial_ticker']
-
-    # Vectorized approach to compute the scores
-    for idx, entity_name in enumerate(extracted_entities):
-        name = entity_names[idx]
-        name_words = set(name.split())
-
-        # Place and invit penalties vectorized
-        place_penalty = -30 if classify_location(name) == "True" and len(name_words) < 3 else 0
-        invit_penalty = -30 if name == "invit" else 10 if "invit" in name and len(name_words) > 1 else 0
-
-        # Compute the similarity scores and penalties
-        scores_clean = clean_similarities[idx]
-        scores_short = short_similarities[idx]
-        scores_ticker = ticker_similarities[idx]
-
-        # Use max of the 3 similarity matrices
-        scores = np.maximum.reduce([scores_clean, scores_short, scores_ticker])
-
-        # Boost for substring matches
-        boost = (
-            np.char.find(clean_company_names, name) >= 0
-        ) | (
-            np.char.find(normalized_short_names, name) >= 0
-        ) | (
-            np.char.find(normalized_ticker_names, name) >= 0
-        )
-        boost = boost.astype(int) * 20
-
-        # Exact match boost
-        exact_match_boost = (
-            (clean_company_names == name) & (normalized_ticker_names == name)
-        ) * 30
-
-        # Partial ticker boost
-        partial_ticker_boost = (partial_ticker_similarities[idx] > 85) * 15
-
-        # Core word penalty
-        core_word_penalty = np.array([
-            -10 if not (name_words & words) else 0
-            for words in clean_company_words
-        ])
-
-        # Total score calculation
-        total_score = (
-            scores
-            + boost
-            + exact_match_boost
-            + partial_ticker_boost
-            + core_word_penalty
-            + place_penalty
-            + invit_penalty
-        )
-
-        # Threshold for determining a valid match
-        score_threshold = 104 if len(name) > 3 else 90
-        best_idx = np.where(total_score >= score_threshold)[0]
-
-        # Collect the best matches
-        if best_idx.size > 0:
-            best_match_idx = best_idx[np.argmax(total_score[best_idx])]
-            best_match_row = df.iloc[best_match_idx]
-            company_code = best_match_row["CompanyCode"]
+    similarities = precompute_similarities(entity_names, snapshot, rows)
+    name_words = [set(name.split()) for name in entity_names]
+
+    # Place and invit penalties, one value per entity
+    place_penalty = np.array([
+        -30 if classify_location(name) == "True" and len(words) < 3 else 0
+        for name, words in zip(entity_names, name_words)
+    ])
+    invit_penalty = np.array([
+        -30 if name == "invit" else 10 if "invit" in name and len(words) > 1 else 0
+        for name, words in zip(entity_names, name_words)
+    ])
+
+    # Use max of the 3 similarity matrices
+    scores = np.maximum.reduce([
+        similarities['clean'], similarities['short'], similarities['ticker']
+    ])
+
+    # Boost for substring matches in any of the three name fields
+    boost = snapshot.substring_index.matrix(entity_names, rows).astype(int) * 20
+
+    # Exact match boost (clean name and ticker both equal the entity)
+    exact_match = np.zeros(scores.shape, dtype=bool)
+    for idx, name in enumerate(entity_names):
+        exact_rows = snapshot.exact_match_rows.get(name)
+        if exact_rows is None:
+            continue
+        if rows is not None:
+            exact_rows = np.searchsorted(rows, np.intersect1d(exact_rows, rows))
+        exact_match[idx, exact_rows] = True
+    exact_match_boost = exact_match * 30
+
+    # Partial ticker boost
+    partial_ticker_boost = (similarities['partial_ticker'] > 85) * 15
+
+    # Core word penalty from the sparse token-incidence product
+    core_word_penalty = np.where(snapshot.token_incidence.overlap(name_words, rows), 0, -10)
+
+    # Total score calculation
+    total_score = (
+        scores
+        + boost
+        + exact_match_boost
+        + partial_ticker_boost
+        + core_word_penalty
+        + place_penalty[:, None]
+        + invit_penalty[:, None]
+    )
+
+    # Threshold for determining a valid match
+    score_threshold = np.array([104 if len(name) > 3 else 90 for name in entity_names])
+    qualified = total_score >= score_threshold[:, None]
+
+    # First highest qualifying score per entity, as np.argmax would pick it
+    best_columns = np.argmax(np.where(qualified, total_score, -np.inf), axis=1)
+    has_match = qualified.any(axis=1)
+
+    best_matches = []
+    for idx, best_column in enumerate(best_columns):
+        if not has_match[idx]:
+            best_matches.append(None)
+            continue
+        match_score = int(total_score[idx, best_column])
+        best_match_idx = best_column if rows is None else rows[best_column]
+        best_matches.append((best_match_idx, match_score))
+
+    return best_matches
+
+def _best_company_matches(entity_names, snapshot):
+    """Score normalized entity names, using the candidate index when enabled.
+
+    Names long enough to block on are scored only against the union of their
+    candidate rows; shorter names fall back to the exhaustive path.
+    """
+    if not len(snapshot):
+        return [None] * len(entity_names)
+
+    if not USE_CANDIDATE_INDEX:
+        return _score_entities(entity_names, snapshot)
+
+    blocked, exhaustive, candidate_rows = [], [], []
+    for idx, name in enumerate(entity_names):
+        rows = snapshot.candidate_index.candidates(name)
+        if rows is None:
+            exhaustive.append(idx)
+        else:
+            blocked.append(idx)
+            candidate_rows.append(rows)
+
+    best_matches = [None] * len(entity_names)
+    if exhaustive:
+        scored = _score_entities([entity_names[idx] for idx in exhaustive], snapshot)
+        for idx, best in zip(exhaustive, scored):
+            best_matches[idx] = best
+
+    if blocked:
+        rows = np.unique(np.concatenate(candidate_rows))
+        if rows.size:
+            scored = _score_entities([entity_names[idx] for idx in blocked], snapshot, rows)
+            for idx, best in zip(blocked, scored):
+                best_matches[idx] = best
+
+    if VERIFY_CANDIDATES:
+        for name, indexed, full in zip(
+            entity_names, best_matches, _score_entities(entity_names, snapshot)
+        ):
+            if indexed != full:
+                print(f"Candidate index mismatch for '{name}': {indexed} != {full}")
+
+    return best_matches
+
+def _entity_names(json_data):
+    if not json_data or "html_chunk_2" not in json_data:
+        return None
+    return list(json_data["html_chunk_2"].keys())
+
+def find_matches_batch(json_data_list, snapshot=None):
+    """Match the entities of several articles with one similarity pass.
+
+    Entity names from the whole batch are de-duplicated and scored against the
+    company table together; matches are then assembled per article, in input
+    order, exactly as ``find_matches`` would for each article on its own.
+    ``snapshot`` defaults to the current company snapshot.
+    """
+    if snapshot is None:
+        snapshot = snapshot_manager.current()
+    batch_entities = [_entity_names(json_data) for json_data in json_data_list]
+
+    normalized = {}
+    for extracted_entities in batch_entities:
+        for entity in extracted_entities or []:
+            if entity not in normalized:
+                normalized[entity] = remove_common_words(normalize_name(entity))
+
+    unique_names = list(dict.fromkeys(normalized.values()))
+    best_by_name = dict(zip(unique_names, _best_company_matches(unique_names, snapshot)))
+
+    results = []
+    for extracted_entities in batch_entities:
+        matches = []
+        seen_company_codes = set()
+        for entity_name in extracted_entities or []:
+            best = best_by_name[normalized[entity_name]]
+            if best is None:
+                continue
+
+            best_match_idx, match_score = best
+            company_code = snapshot.company_codes[best_match_idx]
 
             if company_code not in seen_company_codes:
                 seen_company_codes.add(company_code)
                 matches.append(
                     {
                         "entity_name": entity_name,
-                        "matched_name": str(best_match_row["CompanyName"]),
-                        "company_code": str(company_code),
-                        "ticker_name": str(best_match_row["TickerName"]),
-                        "match_score": int(total_score[best_match_idx]),
+                        "matched_name": snapshot.response_company_names[best_match_idx],
+                        "company_code": company_code,
+                        "ticker_name": snapshot.response_ticker_names[best_match_idx],
+                        "match_score": match_score,
                     }
                 )
+        results.append(matches)
+
+    return results
 
-    return matches
+def find_matches(json_data, snapshot=None):
+    return find_matches_batch([json_data], snapshot)[0]
@@ -0,0 +1,227 @@
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+import yaml  # type: ignore
+
+# Load config.yaml
+with open("config.yaml", "r") as file:
+    config = yaml.safe_load(file)
+
+METRICS_CONFIG = config.get("metrics", {})
+METRICS_ENABLED = METRICS_CONFIG.get("enabled", True)
+SERVER_TIMING = METRICS_CONFIG.get("server_timing", True)
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+# Stage durations of the request being handled, for its Server-Timing header
+request_timings = ContextVar("request_timings", default=None)
+
+
+def _format_labels(names, values):
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{value}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+class Histogram:
+    """Prometheus-style histogram with fixed buckets.
+
+    Stage timers also run in executor threads and the enrichment worker
+    thread, so a series is updated and read under a lock.
+    """
+
+    def __init__(self, name, documentation, buckets, label_names=()):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(buckets)
+        self.label_names = tuple(label_names)
+        # labels -> [per-bucket counts (last is +Inf), sum, count]
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        bucket = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][bucket] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            # A consistent copy, so counts, sum and count agree
+            series = [(labels, (list(counts), total, count)) for labels, (counts, total, count) in self._series.items()]
+        for labels, (counts, total, count) in sorted(series):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + ("+Inf",), counts):
+                cumulative += bucket_count
+                bucket_labels = _format_labels(self.label_names + ("le",), labels + (bound,))
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            label_text = _format_labels(self.label_names, labels)
+            lines.append(f"{self.name}_sum{label_text} {total}")
+            lines.append(f"{self.name}_count{label_text} {count}")
+        return lines
+
+
+class Counter:
+    def __init__(self, name, documentation, label_names=()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            values = sorted(self._values.items())
+        for labels, value in values:
+            lines.append(f"{self.name}{_format_labels(self.label_names, labels)} {value}")
+        return lines
+
+
+REQUEST_DURATION = Histogram(
+    "ipo_request_duration_seconds", "Time to the response start, per route.",
+    LATENCY_BUCKETS, ("route", "status"),
+)
+STAGE_DURATION = Histogram(
+    "ipo_stage_duration_seconds", "Time spent in each pipeline stage.",
+    LATENCY_BUCKETS, ("stage",),
+)
+ENTITIES_PER_ARTICLE = Histogram(
+    "ipo_entities_per_article", "Entities extracted by NER per article.", COUNT_BUCKETS
+)
+MATCHES_PER_ARTICLE = Histogram(
+    "ipo_matches_per_article", "Companies matched per article.", COUNT_BUCKETS
+)
+REJECTED_REQUESTS = Counter(
+    "ipo_rejected_requests_total", "Requests answered 503 because the CPU pool was saturated."
+)
+
+
+@contextmanager
+def stage_timer(stage):
+    """Time a pipeline stage into the stage histogram and Server-Timing."""
+    if not METRICS_ENABLED:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        STAGE_DURATION.observe(elapsed, stage)
+        timings = request_timings.get()
+        if timings is not None:
+            timings[stage] = timings.get(stage, 0.0) + elapsed
+
+
+def observe_article(entity_count, match_count):
+    if METRICS_ENABLED:
+        ENTITIES_PER_ARTICLE.observe(entity_count)
+        MATCHES_PER_ARTICLE.observe(match_count)
+
+
+def _metric_lines(name, documentation, value, kind="gauge"):
+    return [f"# HELP {name} {documentation}", f"# TYPE {name} {kind}", f"{name} {value}"]
+
+
+def render_metrics():
+    """All metrics in the Prometheus text exposition format."""
+    # Imported here so this module stays importable from every service
+    from src.services.bm25_index import bm25_index
+    from src.services.company_snapshot import snapshot_manager
+    from src.services.entity_extractor import BATCHING_CONFIG, ner_batcher
+    from src.services.executor import cpu_executor
+    from src.services.result_cache import result_cache
+
+    lines = []
+    for metric in (REQUEST_DURATION, STAGE_DURATION, ENTITIES_PER_ARTICLE, MATCHES_PER_ARTICLE, REJECTED_REQUESTS):
+        lines += metric.render()
+
+    lines += _metric_lines("ipo_result_cache_hits_total", "Result cache hits.", result_cache.hits, "counter")
+    lines += _metric_lines("ipo_result_cache_misses_total", "Result cache misses.", result_cache.misses, "counter")
+    lines += _metric_lines(
+        "ipo_result_cache_coalesced_total", "Requests that waited on an identical in-flight request.",
+        result_cache.coalesced, "counter",
+    )
+    lines += _metric_lines("ipo_executor_pending_tasks", "CPU tasks running or queued.", cpu_executor.pending)
+    lines += _metric_lines("ipo_bm25_index_articles", "Articles in the reranker's corpus statistics.", bm25_index.n_docs)
+
+    snapshot = snapshot_manager.loaded()
+    if snapshot is not None:
+        lines += _metric_lines("ipo_company_snapshot_rows", "Companies in the current snapshot.", len(snapshot))
+
+    if BATCHING_CONFIG.get("enabled", False):
+        stats = ner_batcher.stats()
+        lines += _metric_lines("ipo_ner_batches_total", "Batched NER requests sent.", stats["batches_sent"], "counter")
+        lines += _metric_lines("ipo_ner_batched_items_total", "NER payloads sent in batches.", stats["items_sent"], "counter")
+        lines += _metric_lines("ipo_ner_failed_batches_total", "Batched NER requests that failed.", stats["failed_batches"], "counter")
+        lines += _metric_lines(
+            "ipo_ner_queue_wait_seconds_total", "Total time payloads waited for a batch.",
+            ner_batcher.queue_wait_total, "counter",
+        )
+    return "\n".join(lines) + "\n"
+
+
+class MetricsMiddleware:
+    """ASGI middleware: request duration histogram and Server-Timing header.
+
+    Stages timed with ``stage_timer`` while the request is handled are
+    reported as ``Server-Timing: screen;dur=1.2, ner;dur=85.0, ...`` (ms).
+    Streaming responses send headers before their body, so only stages that
+    ran before the first byte appear there.
+    """
+
+    def __init__(self, app, routes=()):
+        self.app = app
+        self.routes = routes
+        self._paths = None
+
+    def _route_label(self, path):
+        if self._paths is None:
+            self._paths = {getattr(route, "path", None) for route in self.routes}
+        return path if path in self._paths else "other"
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not METRICS_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        timings = {}
+        token = request_timings.set(timings)
+        start = time.perf_counter()
+        started = False
+
+        async def send_with_timing(message):
+            nonlocal started
+            if message["type"] == "http.response.start":
+                started = True
+                elapsed = time.perf_counter() - start
+                REQUEST_DURATION.observe(elapsed, self._route_label(scope["path"]), str(message["status"]))
+                if SERVER_TIMING:
+                    entries = [f"{stage};dur={1000 * seconds:.1f}" for stage, seconds in timings.items()]
+                    entries.append(f"total;dur={1000 * elapsed:.1f}")
+                    message["headers"] = list(message.get("headers", [])) + [
+                        (b"server-timing", ", ".join(entries).encode("latin-1"))
+                    ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            request_timings.reset(token)
+            if not started:
+                # The app raised before responding; the server answers 500
+                REQUEST_DURATION.observe(time.perf_counter() - start, self._route_label(scope["path"]), "500")
@@ -0,0 +1,123 @@
+import asyncio
+import time
+from collections import Counter
+from functools import partial
+
+
+class NerMicroBatcher:
+    """Collects concurrent NER requests into batched TorchServe calls.
+
+    Payloads queue until ``max_batch_size`` are waiting or the oldest has
+    waited ``max_wait_ms``; the batch is then sent as one request through
+    ``post_batch`` (a coroutine taking a list of payloads and returning a list
+    of responses in the same order) and each caller gets its own response.
+    A failed batch resolves every caller in it to ``None``, matching the
+    unbatched ``generate_entities`` contract. In-flight batches are kept
+    until they finish; ``drain()`` sends what is queued and waits for them.
+    """
+
+    def __init__(self, post_batch, max_batch_size=16, max_wait_ms=10):
+        self._post_batch = post_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._queue = []
+        self._timer = None
+        # Sending batches: referenced so they are not collected mid-flight
+        self._tasks = set()
+
+        # Metrics
+        self.batches_sent = 0
+        self.items_sent = 0
+        self.failed_batches = 0
+        self.batch_sizes = Counter()
+        self.queue_wait_total = 0.0
+        self.queue_wait_max = 0.0
+
+    async def submit(self, payload):
+        """Queue ``payload`` and wait for its slot of the batched response."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._queue.append((payload, future, time.perf_counter()))
+
+        if len(self._queue) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        while self._queue:
+            batch = self._queue[: self.max_batch_size]
+            self._queue = self._queue[self.max_batch_size:]
+            # Callers that gave up while queued are dropped from the batch
+            batch = [item for item in batch if not item[1].done()]
+            if batch:
+                task = asyncio.ensure_future(self._send(batch))
+                self._tasks.add(task)
+                task.add_done_callback(partial(self._sent, batch))
+
+    def _sent(self, batch, task):
+        self._tasks.discard(task)
+        if not task.cancelled() and task.exception() is None:
+            return
+        # Cancelled (possibly before it ran at all) or failed outside _send's
+        # handler: retrieve the error and do not leave its callers waiting
+        if not task.cancelled():
+            print("An error occurred:", str(task.exception()))
+        self.failed_batches += 1
+        for _, future, _ in batch:
+            if not future.done():
+                future.set_result(None)
+
+    async def drain(self):
+        """Send every queued payload and wait for the in-flight batches of this loop (at shutdown)."""
+        loop = asyncio.get_running_loop()
+        if self._queue:
+            self._flush()
+        while True:
+            tasks = [task for task in self._tasks if task.get_loop() is loop]
+            if not tasks:
+                return
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _send(self, batch):
+        now = time.perf_counter()
+        for _, _, enqueued_at in batch:
+            wait = now - enqueued_at
+            self.queue_wait_total += wait
+            self.queue_wait_max = max(self.queue_wait_max, wait)
+        self.batches_sent += 1
+        self.items_sent += len(batch)
+        self.batch_sizes[len(batch)] += 1
+
+        try:
+            responses = await self._post_batch([payload for payload, _, _ in batch])
+            if not isinstance(responses, list) or len(responses) != len(batch):
+                raise ValueError(
+                    f"Expected {len(batch)} responses, got "
+                    f"{len(responses) if isinstance(responses, list) else type(responses).__name__}"
+                )
+        except Exception as e:
+            print("An error occurred:", str(e))
+            self.failed_batches += 1
+            responses = [None] * len(batch)
+
+        for (_, future, _), response in zip(batch, responses):
+            if not future.done():
+                future.set_result(response)
+
+    def stats(self):
+        return {
+            "batches_sent": self.batches_sent,
+            "items_sent": self.items_sent,
+            "failed_batches": self.failed_batches,
+            "mean_batch_size": self.items_sent / self.batches_sent if self.batches_sent else 0.0,
+            "batch_sizes": dict(self.batch_sizes),
+            "mean_queue_wait_ms": 1000 * self.queue_wait_total / self.items_sent if self.items_sent else 0.0,
+            "max_queue_wait_ms": 1000 * self.queue_wait_max,
+        }
@@ -0,0 +1,88 @@
+"""CPU-bound stages of the extraction pipeline.
+
+Each stage is a plain module-level function of picklable arguments so that
+``cpu_executor`` can run it in a thread or a forked worker process.
+"""
+from src.services.bm25_index import bm25_index, bm25_index_for, load_bm25_index
+from src.services.classifier import load_classifier, predict_many
+from src.services.company_snapshot import snapshot_manager
+from src.services.matcher import find_matches, find_matches_batch
+from src.utils.location_utils import load_gazetteer
+from src.utils.reranker import bm25_rerank_matches
+from src.utils.text_processing import preprocess_text
+
+
+def warm_worker():
+    """Pool initializer: make sure models, the BM25 index and the snapshot are in memory.
+
+    With fork these are already inherited from the parent, so this is a no-op
+    unless the worker was started before they were loaded; forkserver and
+    spawn workers load them here, mapping the persisted snapshot file.
+    """
+    load_classifier()
+    load_gazetteer()
+    if not bm25_index.n_docs:
+        load_bm25_index()
+    snapshot_manager.current()
+
+
+def screen_articles(texts, contents, max_length=10000):
+    """Classify articles and preprocess the relevant ones.
+
+    Returns the clean text for each relevant article and ``None`` otherwise.
+    """
+    statuses = predict_many(texts)
+    return [
+        preprocess_text(content, max_length) if is_relevant else None
+        for is_relevant, content in zip(statuses, contents)
+    ]
+
+
+def match_articles(extracted_list, snapshot_version):
+    """Match the entities of several articles on one snapshot.
+
+    Returns ``(results, snapshot_version)`` where each result is a match list
+    or an ``Exception`` for an article that failed to match.
+    """
+    snapshot = snapshot_manager.snapshot_for(snapshot_version)
+    try:
+        return find_matches_batch(extracted_list, snapshot), snapshot.version
+    except Exception as e:
+        print(f"Batch matching failed, retrying per article: {e}")
+
+    results = []
+    for position, extracted_data in enumerate(extracted_list):
+        try:
+            results.append(find_matches(extracted_data, snapshot))
+        except Exception as e:
+            print(f"Error matching article {position}: {e}")
+            results.append(e)
+    return results, snapshot.version
+
+
+def match_article(extracted_data, snapshot_version):
+    """Match one article; returns ``(matches, snapshot_version)``."""
+    snapshot = snapshot_manager.snapshot_for(snapshot_version)
+    return find_matches(extracted_data, snapshot), snapshot.version
+
+
+def rerank_articles(match_lists, query_texts, bm25_version=None):
+    """BM25-rerank each article's matches against its own title + content.
+
+    Returns ``(reranked, article_terms)``. The distinct terms of each article
+    are handed back so the caller can add them to ``bm25_index`` in the
+    parent process; a process-pool worker only holds a copy of the index,
+    reloaded from disk when ``bm25_version`` (the parent's
+    ``bm25_index.version``) is newer. Matches are copied first: they may be
+    shared with the result cache.
+    """
+    bm25_index_for(bm25_version)
+    reranked = []
+    article_terms = []
+    for matches, query_text in zip(match_lists, query_texts):
+        query_terms = bm25_index.query_terms(query_text)
+        reranked.append(
+            bm25_rerank_matches([dict(match) for match in matches], query_text, query_terms)
+        )
+        article_terms.append(query_terms[0])
+    return reranked, article_terms
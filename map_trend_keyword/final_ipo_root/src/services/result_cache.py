@@ -0,0 +1,223 @@
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+import yaml  # type: ignore
+
+# Load config.yaml
+with open("config.yaml", "r") as file:
+    config = yaml.safe_load(file)
+
+CACHE_CONFIG = config.get("result_cache", {})
+CACHE_ENABLED = CACHE_CONFIG.get("enabled", True)
+CACHE_BACKEND = CACHE_CONFIG.get("backend", "memory")
+CACHE_TTL = CACHE_CONFIG.get("ttl", 86400)
+CACHE_MAX_ENTRIES = CACHE_CONFIG.get("max_entries", 10000)
+CACHE_DISK_PATH = CACHE_CONFIG.get("disk_path", "./data/result_cache.sqlite3")
+
+
+class MemoryBackend:
+    """In-process LRU with per-entry expiry."""
+
+    blocking = False
+
+    def __init__(self, max_entries=CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (time.time() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class DiskBackend:
+    """Local SQLite store, so cached results survive restarts.
+
+    Values are stored as JSON; the least recently used rows are evicted once
+    the table grows past ``max_entries``. ``get`` and ``set`` block on disk,
+    so ``ResultCache`` runs them in a worker thread.
+    """
+
+    blocking = True
+
+    def __init__(self, path=CACHE_DISK_PATH, max_entries=CACHE_MAX_ENTRIES):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            "key TEXT PRIMARY KEY, value TEXT, expires_at REAL, accessed_at REAL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS results_accessed ON results (accessed_at)")
+        self._db.commit()
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT value, expires_at FROM results WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if row[1] < now:
+                self._db.execute("DELETE FROM results WHERE key = ?", (key,))
+                self._db.commit()
+                return None
+            self._db.execute("UPDATE results SET accessed_at = ? WHERE key = ?", (now, key))
+            self._db.commit()
+        return json.loads(row[0])
+
+    def set(self, key, value, ttl):
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), now + ttl, now),
+            )
+            self._db.execute(
+                "DELETE FROM results WHERE key IN ("
+                "SELECT key FROM results ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+            self._db.commit()
+
+    def __len__(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+
+class ResultCache:
+    """Extraction results keyed on preprocessed text + snapshot version.
+
+    Identical requests that arrive while the first one is still computing
+    wait on its future instead of making their own NER call.
+    """
+
+    def __init__(self, backend, ttl=CACHE_TTL, enabled=CACHE_ENABLED):
+        self.backend = backend
+        self.ttl = ttl
+        self.enabled = enabled
+        self._inflight = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    @staticmethod
+    def make_key(clean_text, snapshot_version):
+        digest = hashlib.sha256()
+        digest.update(str(snapshot_version).encode("utf-8"))
+        digest.update(b"\x00")
+        digest.update(clean_text.encode("utf-8"))
+        return digest.hexdigest()
+
+    async def _backend_call(self, method, *args):
+        # SQLite reads and writes stay off the event loop; the LRU is cheap enough to call inline
+        if self.backend.blocking:
+            return await asyncio.to_thread(method, *args)
+        return method(*args)
+
+    async def claim(self, key):
+        """Look ``key`` up and decide who computes it.
+
+        Returns ``("hit", value)``, ``("wait", future)`` when an identical
+        request is in flight, or ``("own", None)`` when the caller must compute
+        the value and then call ``complete`` or ``fail``.
+        """
+        if self.enabled:
+            value = await self._backend_call(self.backend.get, key)
+            if value is not None:
+                self.hits += 1
+                return "hit", value
+
+        # No await from here on, so two claims can't both own the key
+        future = self._inflight.get(key)
+        if future is not None:
+            self.coalesced += 1
+            return "wait", future
+
+        self.misses += 1
+        self._inflight[key] = asyncio.get_running_loop().create_future()
+        return "own", None
+
+    async def complete(self, key, value):
+        future = self._inflight.get(key)
+        if future is not None and not future.done():
+            future.set_result(value)
+        try:
+            # Claims made during the write wait on the resolved future
+            # rather than missing both it and the backend
+            if self.enabled:
+                await self._backend_call(self.backend.set, key, value, self.ttl)
+        finally:
+            if self._inflight.get(key) is future:
+                self._inflight.pop(key, None)
+
+    def fail(self, key, exc):
+        future = self._inflight.pop(key, None)
+        if future is None or future.done():
+            return
+        if isinstance(exc, asyncio.CancelledError):
+            future.cancel()
+        else:
+            future.set_exception(exc)
+            # Waiters re-raise it; don't log it as never retrieved
+            future.exception()
+
+    async def get_or_compute(self, key, compute):
+        """Return ``(value, status)`` with status "hit", "miss" or "coalesced"."""
+        while True:
+            state, value = await self.claim(key)
+            if state == "hit":
+                return value, "hit"
+            if state == "wait":
+                try:
+                    return await asyncio.shield(value), "coalesced"
+                except asyncio.CancelledError:
+                    if value.cancelled():
+                        # The request computing it went away; try again
+                        continue
+                    raise
+
+            try:
+                value = await compute()
+            except BaseException as e:
+                self.fail(key, e)
+                raise
+            await self.complete(key, value)
+            return value, "miss"
+
+
+def _make_backend():
+    if CACHE_BACKEND == "disk":
+        return DiskBackend()
+    return MemoryBackend()
+
+
+result_cache = ResultCache(_make_backend())
@@ -0,0 +1,164 @@
+import re
+import ahocorasick  # type: ignore
+import numpy as np
+from scipy import sparse  # type: ignore
+from src.services.company_table import stable_hash
+
+# Characters normalize_name can never emit, used to delimit fields and rows
+FIELD_SEPARATOR = "\x00"
+ROW_SEPARATOR = "\x01"
+
+
+# pyahocorasick scans a buffer several times slower than one literal regex
+# search, so the automaton only wins from about this many names (measured on
+# both a 500k-row haystack and 2k candidate rows)
+AUTOMATON_MIN_PATTERNS = 12
+
+
+class SubstringIndex:
+    """All company name fields joined into one UTF-8 haystack buffer.
+
+    Finding which rows contain the entity names is a C-level scan over the
+    buffer (which may be a read-only memory-mapped array), or over only the
+    candidate rows' bytes: one literal regex search per name for a few names,
+    one Aho-Corasick pass for all of them from ``AUTOMATON_MIN_PATTERNS`` on.
+    Hit offsets are mapped to rows with a single ``searchsorted``. A name
+    never contains a separator, so a hit cannot span two rows.
+    """
+
+    def __init__(self, arrays):
+        self.haystack = arrays["substring.haystack"]
+        # starts[i] is the byte offset of row i; the final entry is the buffer end
+        self._starts = arrays["substring.starts"]
+        self.size = len(self._starts) - 1
+
+    @staticmethod
+    def build(*name_columns):
+        rows = [
+            (FIELD_SEPARATOR.join(fields) + ROW_SEPARATOR).encode("utf-8")
+            for fields in zip(*name_columns)
+        ]
+        starts = np.zeros(len(rows) + 1, dtype=np.int64)
+        np.cumsum([len(row) for row in rows], out=starts[1:])
+        return {
+            "substring.haystack": np.frombuffer(b"".join(rows), dtype=np.uint8),
+            "substring.starts": starts,
+        }
+
+    def rows_containing(self, pattern: str) -> np.ndarray:
+        """Sorted rows where ``pattern`` occurs in any field."""
+        return np.flatnonzero(self.matrix([pattern])[0])
+
+    def _scan_buffer(self, rows):
+        """The bytes to scan and their row start offsets, for all rows or only ``rows``."""
+        if rows is None:
+            return self.haystack, self._starts
+        rows = np.asarray(rows, dtype=np.int64)
+        lengths = self._starts[rows + 1] - self._starts[rows]
+        starts = np.zeros(len(rows) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=starts[1:])
+        offsets = np.repeat(self._starts[rows] - starts[:-1], lengths)
+        return self.haystack[offsets + np.arange(starts[-1])], starts
+
+    @staticmethod
+    def _hits(buffer, patterns):
+        """``(pattern index, byte offset)`` pairs of every occurrence in ``buffer``."""
+        if len(patterns) < AUTOMATON_MIN_PATTERNS:
+            return np.array([
+                (idx, hit.start())
+                for idx, pattern in enumerate(patterns)
+                for hit in re.finditer(re.escape(pattern), buffer)
+            ], dtype=np.int64)
+
+        # Latin-1 maps each byte to one character, so the automaton matches
+        # the UTF-8 bytes exactly and hit offsets stay byte offsets
+        automaton = ahocorasick.Automaton()
+        for idx, pattern in enumerate(patterns):
+            automaton.add_word(pattern.decode("latin-1"), idx)
+        automaton.make_automaton()
+        return np.array([
+            (idx, end - len(patterns[idx]) + 1)
+            for end, idx in automaton.iter(str(memoryview(buffer), "latin-1"))
+        ], dtype=np.int64)
+
+    def matrix(self, patterns, rows=None) -> np.ndarray:
+        """patterns x rows boolean matrix of substring hits."""
+        width = self.size if rows is None else len(rows)
+        result = np.zeros((len(patterns), width), dtype=bool)
+        keys = [pattern.encode("utf-8") for pattern in patterns]
+        # Each distinct name is searched once; an empty one is in every row
+        distinct = list(dict.fromkeys(filter(None, keys)))
+        if b"" in keys:
+            result[[idx for idx, key in enumerate(keys) if not key]] = True
+        if not distinct or not width:
+            return result
+
+        buffer, starts = self._scan_buffer(rows)
+        hits = self._hits(buffer, distinct)
+        found = np.zeros((len(distinct), width), dtype=bool)
+        if len(hits):
+            found[hits[:, 0], np.searchsorted(starts, hits[:, 1], side="right") - 1] = True
+        slots = {key: slot for slot, key in enumerate(distinct)}
+        for idx, key in enumerate(keys):
+            if key:
+                result[idx] = found[slots[key]]
+        return result
+
+
+class TokenIncidence:
+    """Sparse companies x vocabulary matrix of clean company name tokens.
+
+    Each company's word set is a run of token IDs in a CSR ``indices``
+    array; a token's ID is its position in the sorted array of token hashes.
+    """
+
+    def __init__(self, arrays):
+        self.token_hashes = arrays["tokens.hashes"]
+        indptr = arrays["tokens.indptr"]
+        indices = arrays["tokens.indices"]
+        self.matrix = sparse.csr_matrix(
+            (np.ones(len(indices), dtype=np.int8), indices, indptr),
+            shape=(len(indptr) - 1, len(self.token_hashes)),
+        )
+
+    @staticmethod
+    def build(word_sets):
+        vocabulary = {}
+        indptr, indices = [0], []
+        for words in word_sets:
+            for word in words:
+                indices.append(vocabulary.setdefault(word, len(vocabulary)))
+            indptr.append(len(indices))
+
+        hashes = stable_hash(list(vocabulary))
+        order = np.argsort(hashes, kind="stable")
+        token_ids = np.empty(len(order), dtype=np.int32)
+        token_ids[order] = np.arange(len(order), dtype=np.int32)
+        return {
+            "tokens.hashes": hashes[order],
+            "tokens.indptr": np.asarray(indptr, dtype=np.int32),
+            "tokens.indices": token_ids[np.asarray(indices, dtype=np.int64)],
+        }
+
+    def token_ids(self, words):
+        """IDs of the known tokens among ``words``."""
+        if not words or not len(self.token_hashes):
+            return []
+        hashes = stable_hash(list(words))
+        positions = np.minimum(np.searchsorted(self.token_hashes, hashes), len(self.token_hashes) - 1)
+        return positions[self.token_hashes[positions] == hashes].tolist()
+
+    def overlap(self, word_sets, rows=None) -> np.ndarray:
+        """entities x rows boolean matrix: True where any token is shared."""
+        indptr, indices = [0], []
+        for words in word_sets:
+            indices.extend(self.token_ids(words))
+            indptr.append(len(indices))
+
+        entities = sparse.csr_matrix(
+            (np.ones(len(indices), dtype=np.int32), indices, indptr),
+            shape=(len(word_sets), len(self.token_hashes)),
+        )
+        companies = self.matrix if rows is None else self.matrix[rows]
+        # companies @ entities.T keeps the large operand in CSR, no conversion
+        return (companies @ entities.T).T.toarray() > 0
@@ -1,7 +1,5 @@
-import joblib  # type: ignore
-from src.utils.text_processing import preprocess_text
+from src.services.classifier import predict_one
 
 def is_finance_article(text):
-    # load and use the model:
-    loaded_pipeline = joblib.load("./src/models/finance_news_classifier_v2.joblib")
-    return loaded_pipeline.predict([text])
+    # The model is loaded once by src.services.classifier and reused here
+    return predict_one(text)
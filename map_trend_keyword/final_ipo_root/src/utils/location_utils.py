@@ -1,24 +1,80 @@
-import pgeocode  # type: ignore
-import pycountry  # type: ignore
-import pandas as pd  # type:ignore
+import gzip
+import os
+from functools import lru_cache
+import yaml  # type: ignore
+from src.utils.text_processing import normalize_name
 
-nomi_in = pgeocode.Nominatim("IN")
+# Load config.yaml
+with open("config.yaml", "r") as file:
+    config = yaml.safe_load(file)
 
-def is_country(name):
-    """Check if a name is a country."""
-    try:
-        return pycountry.countries.lookup(name) is not None
-    except LookupError:
-        return False
+LOCATION_CONFIG = config.get("location", {})
+GAZETTEER_PATH = LOCATION_CONFIG.get("gazetteer_path", "./data/location_gazetteer.txt.gz")
+LOOKUP_CACHE_SIZE = LOCATION_CONFIG.get("lookup_cache_size", 65536)
 
-def classify_location(name):
-    """Classify a name as a City, State, or Country."""
-    name = name.strip().title()
-    if is_country(name):
-        return "True"
+_gazetteer = None
+
+
+def location_key(name):
+    """Normalized form used for both gazetteer entries and lookups."""
+    return " ".join(normalize_name(name).split())
+
+
+def build_gazetteer():
+    """Collect normalized place, state and country names.
+
+    Sources are the pgeocode India postal dataset (place and state names of
+    rows that have a state) and every string field pycountry matches in
+    ``countries.lookup`` (names, official/common names and codes).
+    """
+    import pgeocode  # type: ignore
+    import pycountry  # type: ignore
+
+    names = set()
+    for country in pycountry.countries:
+        for value in country._fields.values():
+            if isinstance(value, str):
+                names.add(location_key(value))
+
+    india = pgeocode.Nominatim("IN")._data
+    india = india[india["state_name"].notna()]
+    for column in ("place_name", "state_name"):
+        names.update(location_key(value) for value in india[column].dropna().unique())
 
-    india_result = nomi_in.query_location(name)
-    if not india_result.empty and pd.notna(india_result.iloc[0]["state_name"]):
-        return "True"
+    names.discard("")
+    return frozenset(names)
+
+
+def save_gazetteer(names, path=GAZETTEER_PATH):
+    """Write the gazetteer as sorted, gzip'd newline-separated names."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = path + ".tmp"
+    with gzip.open(tmp_path, "wt", encoding="utf-8") as file:
+        file.write("\n".join(sorted(names)))
+    os.replace(tmp_path, path)
+
+
+def load_gazetteer(path=GAZETTEER_PATH):
+    """Load the gazetteer from disk, building and saving it on first use."""
+    global _gazetteer
+    if _gazetteer is None:
+        if os.path.exists(path):
+            with gzip.open(path, "rt", encoding="utf-8") as file:
+                _gazetteer = frozenset(file.read().split("\n"))
+        else:
+            print(f"Building location gazetteer at {path}...")
+            _gazetteer = build_gazetteer()
+            save_gazetteer(_gazetteer, path)
+    return _gazetteer
+
+
+@lru_cache(maxsize=LOOKUP_CACHE_SIZE)
+def classify_location(name):
+    """Classify a name as a City, State, or Country.
 
-    return "False"
+    Returns "True" when the normalized name is a known Indian place or state
+    name or a country name/code, using a set lookup on the prebuilt gazetteer.
+    """
+    return "True" if location_key(name) in load_gazetteer() else "False"
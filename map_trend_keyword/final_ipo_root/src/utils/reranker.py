@@ -1,7 +1,7 @@
-from rank_bm25 import BM25Okapi # type: ignore
 from typing import List
+from src.services.bm25_index import bm25_index
 
-def bm25_rerank_matches(matches: List[dict], query: str) -> List[dict]:
+def bm25_rerank_matches(matches: List[dict], query: str, query_terms=None) -> List[dict]:
     if not matches:
         return []
 
@@ -9,14 +9,13 @@ def bm25_rerank_matches(matches: List[dict], query: str) -> List[dict]:
     documents = [
         (match["entity_name"] + " " + match.get("context", "")) for match in matches
     ]
-    tokenized_corpus = [doc.lower().split() for doc in documents]
-    tokenized_query = query.lower().split()
-
-    bm25 = BM25Okapi(tokenized_corpus)
-    scores = bm25.get_scores(tokenized_query)
+    # IDF comes from every article processed so far, not just these matches
+    if query_terms is None:
+        query_terms = bm25_index.query_terms(query)
+    scores = bm25_index.score(documents, *query_terms)
 
     # Attach scores to matches and sort
     for match, score in zip(matches, scores):
-        match["bm25_score"] = score
+        match["bm25_score"] = float(score)
 
-    return sorted(matches, key=lambda x: x["bm25_score"], reverse=True)    
\ No newline at end of file
+    return sorted(matches, key=lambda x: x["bm25_score"], reverse=True)
@@ -1,12 +1,17 @@
 import re
+from typing import List, Optional
 
-def preprocess_text(input_text: str, max_length: int = 10000) -> str:
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])\s+")
+
+def preprocess_text(input_text: str, max_length: Optional[int] = 10000) -> str:
     input_text = re.sub(r"[\x00-\x1F\x7F-\x9F]", " ", input_text)
     input_text = re.sub(
         r"[^\w\s.,()]", " ", input_text
     )  # Replace all special characters except .,() with space
     input_text = re.sub(r"\s+", " ", input_text).strip()
     input_text = input_text.encode("utf-8", "ignore").decode("utf-8")
+    if max_length is None:
+        return input_text
     return (
         input_text[:max_length] + "..." if len(input_text) > max_length else input_text
     )
@@ -17,3 +22,38 @@ def normalize_name(name: str) -> str:
 def remove_common_words(text: str) -> str:
     common_words = {"limited", "ltd", "corp", "company"}
     return " ".join([word for word in text.split() if word.lower() not in common_words])
+
+def split_into_chunks(text: str, max_chars: int = 2000, overlap_sentences: int = 1) -> List[str]:
+    """Split text on sentence boundaries into chunks of at most ``max_chars``.
+
+    Each chunk after the first repeats the last ``overlap_sentences`` sentences
+    of the previous one, so an entity straddling a boundary is still seen
+    whole. Sentences longer than ``max_chars`` are cut on word boundaries.
+    """
+    sentences = []
+    for sentence in SENTENCE_BOUNDARY.split(text.strip()):
+        while len(sentence) > max_chars:
+            cut = sentence.rfind(" ", 0, max_chars)
+            cut = cut if cut > 0 else max_chars
+            sentences.append(sentence[:cut])
+            sentence = sentence[cut:].strip()
+        if sentence:
+            sentences.append(sentence)
+
+    chunks = []
+    current = []
+    current_len = 0
+    for sentence in sentences:
+        if current and current_len + len(sentence) + 1 > max_chars:
+            chunks.append(" ".join(current))
+            current = current[-overlap_sentences:] if overlap_sentences else []
+            current_len = sum(len(s) + 1 for s in current)
+            # Drop overlap that would not leave room for the new sentence
+            while current and current_len + len(sentence) + 1 > max_chars:
+                current_len -= len(current.pop(0)) + 1
+        current.append(sentence)
+        current_len += len(sentence) + 1
+
+    if current:
+        chunks.append(" ".join(current))
+    return chunks
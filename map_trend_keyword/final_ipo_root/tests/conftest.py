@@ -0,0 +1,7 @@
+import os
+import sys
+
+# Modules import as ``src.…`` and read config.yaml relative to the project root
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
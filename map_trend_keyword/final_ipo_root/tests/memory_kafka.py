@@ -0,0 +1,187 @@
+"""In-memory stand-in for the parts of kafka-python the enrichment stage uses.
+
+``InMemoryBroker`` keeps partitioned topics and committed group offsets;
+``InMemoryConsumer`` and ``InMemoryProducer`` mirror ``KafkaConsumer`` /
+``KafkaProducer`` closely enough (poll, commit, seek, send().get(), flush)
+to run ``EnrichmentWorker`` without a broker. Consumers in the same group
+split the topic's partitions between them, and a new member triggers a
+rebalance that restarts everyone from their group's committed offsets.
+"""
+import threading
+import time
+import zlib
+from collections import namedtuple
+
+TopicPartition = namedtuple("TopicPartition", ["topic", "partition"])
+ConsumerRecord = namedtuple("ConsumerRecord", ["topic", "partition", "offset", "key", "value"])
+RecordMetadata = namedtuple("RecordMetadata", ["topic", "partition", "offset"])
+
+
+class InMemoryBroker:
+    def __init__(self, partitions=4):
+        self.default_partitions = partitions
+        self._topics = {}
+        self._committed = {}
+        self._members = {}
+        self._generation = 0
+        self._lock = threading.Condition()
+
+    def create_topic(self, topic, partitions=None):
+        with self._lock:
+            self._topics.setdefault(topic, [[] for _ in range(partitions or self.default_partitions)])
+
+    def append(self, topic, key, value, partition=None):
+        with self._lock:
+            self.create_topic(topic)
+            partitions = self._topics[topic]
+            if partition is None:
+                partition = zlib.crc32(key or b"") % len(partitions)
+            log = partitions[partition]
+            log.append((key, value))
+            self._lock.notify_all()
+            return RecordMetadata(topic, partition, len(log) - 1)
+
+    def messages(self, topic):
+        """Every value in ``topic``, partition by partition."""
+        with self._lock:
+            return [value for log in self._topics.get(topic, []) for _, value in log]
+
+    def committed(self, group_id, partition):
+        with self._lock:
+            return self._committed.get((group_id, partition))
+
+    def lag(self, group_id, topic):
+        """Records in ``topic`` not yet committed by ``group_id``."""
+        with self._lock:
+            return sum(
+                len(log) - self._committed.get((group_id, TopicPartition(topic, p)), 0)
+                for p, log in enumerate(self._topics.get(topic, []))
+            )
+
+    # Group membership: range assignment over each subscribed topic
+    def join(self, group_id, member, topics):
+        with self._lock:
+            for topic in topics:
+                self.create_topic(topic)
+            self._members.setdefault(group_id, {})[member] = topics
+            self._generation += 1
+
+    def leave(self, group_id, member):
+        with self._lock:
+            self._members.get(group_id, {}).pop(member, None)
+            self._generation += 1
+
+    def assignment(self, group_id, member):
+        with self._lock:
+            members = sorted(self._members.get(group_id, {}), key=id)
+            if member not in members:
+                return self._generation, []
+            assigned = []
+            for topic in self._members[group_id][member]:
+                for partition in range(len(self._topics[topic])):
+                    if members[partition % len(members)] is member:
+                        assigned.append(TopicPartition(topic, partition))
+            return self._generation, assigned
+
+    def fetch(self, partition, offset, limit):
+        with self._lock:
+            log = self._topics[partition.topic][partition.partition]
+            return [
+                ConsumerRecord(partition.topic, partition.partition, position, key, value)
+                for position, (key, value) in enumerate(log[offset:offset + limit], start=offset)
+            ]
+
+    def commit(self, group_id, offsets):
+        with self._lock:
+            for partition, offset in offsets.items():
+                self._committed[(group_id, partition)] = offset
+
+    def wait(self, timeout):
+        with self._lock:
+            self._lock.wait(timeout)
+
+
+class InMemoryConsumer:
+    """``KafkaConsumer`` look-alike with manual commits (enable_auto_commit=False)."""
+
+    def __init__(self, *topics, broker, group_id, value_deserializer=None):
+        self.broker = broker
+        self.group_id = group_id
+        self.value_deserializer = value_deserializer or (lambda value: value)
+        self._generation = None
+        self._positions = {}
+        broker.join(group_id, self, topics)
+
+    def _sync_assignment(self):
+        generation, assigned = self.broker.assignment(self.group_id, self)
+        if generation != self._generation:
+            # Rebalanced: resume every partition from the group's commit
+            self._generation = generation
+            self._positions = {
+                partition: self.broker.committed(self.group_id, partition) or 0
+                for partition in assigned
+            }
+
+    def assignment(self):
+        self._sync_assignment()
+        return set(self._positions)
+
+    def poll(self, timeout_ms=0, max_records=500):
+        deadline = time.monotonic() + timeout_ms / 1000
+        while True:
+            self._sync_assignment()
+            batch = {}
+            remaining = max_records
+            for partition, position in sorted(self._positions.items()):
+                if remaining <= 0:
+                    break
+                records = self.broker.fetch(partition, position, remaining)
+                if records:
+                    batch[partition] = [
+                        record._replace(value=self.value_deserializer(record.value)) for record in records
+                    ]
+                    self._positions[partition] = records[-1].offset + 1
+                    remaining -= len(records)
+            if batch or time.monotonic() >= deadline:
+                return batch
+            self.broker.wait(min(0.05, max(0.0, deadline - time.monotonic())))
+
+    def seek(self, partition, offset):
+        self._positions[partition] = offset
+
+    def commit(self, offsets=None):
+        """Commit ``{partition: next_offset}``, or every consumed position."""
+        self._sync_assignment()
+        if offsets is None:
+            offsets = dict(self._positions)
+        self.broker.commit(self.group_id, offsets)
+
+    def close(self):
+        self.broker.leave(self.group_id, self)
+
+
+class _SendFuture:
+    def __init__(self, metadata):
+        self._metadata = metadata
+
+    def get(self, timeout=None):
+        return self._metadata
+
+
+class InMemoryProducer:
+    """``KafkaProducer`` look-alike; sends are acknowledged immediately."""
+
+    def __init__(self, broker, value_serializer=None, key_serializer=None):
+        self.broker = broker
+        self.value_serializer = value_serializer or (lambda value: value)
+        self.key_serializer = key_serializer or (lambda key: key)
+
+    def send(self, topic, value=None, key=None):
+        key = self.key_serializer(key) if key is not None else None
+        return _SendFuture(self.broker.append(topic, key, self.value_serializer(value)))
+
+    def flush(self, timeout=None):
+        pass
+
+    def close(self):
+        pass
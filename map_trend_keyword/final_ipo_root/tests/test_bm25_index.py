@@ -0,0 +1,53 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from src.services import bm25_index as bm25_module
+from src.services.bm25_index import Bm25Index, bm25_index_for
+
+
+def worker_idf(version, path, term):
+    return float(bm25_index_for(version, path).idf([term])[0])
+
+
+def test_forked_worker_reloads_newer_stats(tmp_path, monkeypatch):
+    path = str(tmp_path / "bm25_index.npz")
+    index = Bm25Index()
+    monkeypatch.setattr(bm25_module, "bm25_index", index)
+    index.observe([["tata", "steel"], ["infosys"]])
+    index.save(path)
+    started_at = index.version
+    started_idf = float(index.idf(["steel"])[0])
+
+    with ProcessPoolExecutor(1, mp_context=multiprocessing.get_context("fork")) as pool:
+        pool.submit(int).result()  # The worker now holds a copy of the index
+        index.observe([["steel"]] * 8)
+        index.save(path)
+        stale = pool.submit(worker_idf, started_at, path, "steel").result()
+        reloaded = pool.submit(worker_idf, index.version, path, "steel").result()
+
+    assert index.version == 10
+    # A version the worker already has reuses its copy; a newer one reloads the file
+    assert stale == started_idf
+    assert reloaded == float(index.idf(["steel"])[0])
+    assert stale > reloaded
+
+
+def test_save_keeps_the_most_frequent_terms(tmp_path):
+    path = str(tmp_path / "bm25_index.npz")
+    index = Bm25Index(max_terms=3)
+    index.observe([["a", "b", "c"], ["b", "c", "d"], ["c", "d"], ["e"]])
+    unseen = index.idf(["zzz"])[0]
+    index.save(path)
+
+    assert index.term_ids == {"b": 0, "c": 1, "d": 2}
+    assert index.doc_freq[:3].tolist() == [2, 3, 2]
+    assert index.idf(["a"])[0] == unseen
+
+    loaded = Bm25Index()
+    loaded.load(path)
+    assert loaded.term_ids == index.term_ids and loaded.n_docs == 4 and loaded.version == 4
+    assert np.allclose(loaded.idf(["b", "c", "d"]), index.idf(["b", "c", "d"]))
+
+    # A dropped term is counted from scratch if it turns up again
+    index.observe([["a"]])
+    assert index.term_ids["a"] == 3 and index.doc_freq[3] == 1
@@ -0,0 +1,132 @@
+import pytest
+from tests.memory_kafka import InMemoryBroker, InMemoryConsumer, InMemoryProducer
+from src.services import enrichment
+from src.services.enrichment import EnrichmentWorker
+
+INPUT_TOPIC = "trend_capture"
+OUTPUT_TOPIC = "trend_enriched"
+DEAD_LETTER_TOPIC = "trend_enrichment_dead_letter"
+GROUP_ID = "test"
+
+
+async def fake_enrich_articles(articles):
+    # Like the real pipeline, chokes on a record whose content is not text
+    for article in articles:
+        if not isinstance(article["content"], str):
+            raise TypeError("content must be str")
+    return [{"status": True, "matches": [], "ArticleID": article["ArticleID"]} for article in articles], False
+
+
+def encode_key(key):
+    return str(key).encode("utf-8")
+
+
+class FlakyProducer(InMemoryProducer):
+    """Fails the next ``failures`` sends."""
+
+    def __init__(self, broker, failures):
+        super().__init__(broker, key_serializer=encode_key)
+        self.failures = failures
+
+    def send(self, topic, value=None, key=None):
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("simulated broker error")
+        return super().send(topic, value=value, key=key)
+
+
+@pytest.fixture
+def broker(monkeypatch):
+    monkeypatch.setattr(enrichment, "enrich_articles", fake_enrich_articles)
+    return InMemoryBroker(partitions=1)
+
+
+def publish(broker, contents):
+    producer = InMemoryProducer(broker, key_serializer=encode_key)
+    for n, content in enumerate(contents):
+        producer.send(INPUT_TOPIC, value={"ArticleID": str(n), "title": "t", "content": content}, key=str(n))
+
+
+def make_worker(broker, producer=None, max_attempts=3):
+    consumer = InMemoryConsumer(INPUT_TOPIC, broker=broker, group_id=GROUP_ID)
+    return EnrichmentWorker(
+        consumer, producer or InMemoryProducer(broker, key_serializer=encode_key), output_topic=OUTPUT_TOPIC,
+        dead_letter_topic=DEAD_LETTER_TOPIC, batch_size=10, poll_timeout_ms=0,
+        max_attempts=max_attempts, retry_backoff=0,
+    )
+
+
+def published_ids(broker, topic=OUTPUT_TOPIC):
+    return sorted(value["ArticleID"] for value in broker.messages(topic))
+
+
+def test_commits_only_after_the_batch_is_published(broker):
+    publish(broker, ["a", "b", "c"])
+    worker = make_worker(broker, FlakyProducer(broker, failures=1))
+    assert worker.run_once() == 0
+    assert broker.lag(GROUP_ID, INPUT_TOPIC) == 3
+    assert worker.run_once() == 3
+    assert broker.lag(GROUP_ID, INPUT_TOPIC) == 0
+    assert published_ids(broker) == ["0", "1", "2"]
+    assert worker.enriched == 3
+    worker.close()
+
+
+def test_failed_batch_is_rewound_and_read_again(broker):
+    publish(broker, ["a", "b"])
+    worker = make_worker(broker, FlakyProducer(broker, failures=1))
+    polled = []
+    poll = worker.consumer.poll
+
+    def recording_poll(**kwargs):
+        batch = poll(**kwargs)
+        polled.append([record.offset for records in batch.values() for record in records])
+        return batch
+
+    worker.consumer.poll = recording_poll
+    worker.run_once()
+    worker.run_once()
+    assert polled == [[0, 1], [0, 1]]
+    worker.close()
+
+
+def test_batch_that_raises_is_dead_lettered_after_max_attempts(broker):
+    publish(broker, ["a", 17, "c"])
+    worker = make_worker(broker, max_attempts=3)
+    assert worker.run_once() == 0
+    assert worker.run_once() == 0
+    # The last attempt isolates the bad record; the rest are still enriched
+    assert worker.run_once() == 3
+    assert broker.lag(GROUP_ID, INPUT_TOPIC) == 0
+    assert published_ids(broker) == ["0", "2"]
+    [dead] = broker.messages(DEAD_LETTER_TOPIC)
+    assert dead["offset"] == 1 and dead["value"]["content"] == 17 and "content must be str" in dead["error"]
+    assert (worker.enriched, worker.dead_lettered, worker.attempts) == (2, 1, 0)
+    worker.close()
+
+
+def test_publish_failures_are_dead_lettered_after_max_attempts(broker):
+    publish(broker, ["a", "b"])
+    producer = FlakyProducer(broker, failures=3)
+    worker = make_worker(broker, producer, max_attempts=3)
+    assert [worker.run_once() for _ in range(3)] == [0, 0, 2]
+    assert broker.lag(GROUP_ID, INPUT_TOPIC) == 0
+    assert published_ids(broker) == []
+    assert sorted(value["value"]["ArticleID"] for value in broker.messages(DEAD_LETTER_TOPIC)) == ["0", "1"]
+    worker.close()
+
+
+def test_batch_is_retried_when_dead_lettering_fails_too(broker):
+    publish(broker, ["a", "b"])
+    producer = FlakyProducer(broker, failures=100)
+    worker = make_worker(broker, producer, max_attempts=2)
+    assert [worker.run_once() for _ in range(3)] == [0, 0, 0]
+    # Nothing reached either topic, so nothing is committed
+    assert broker.lag(GROUP_ID, INPUT_TOPIC) == 2
+    assert broker.messages(DEAD_LETTER_TOPIC) == []
+
+    producer.failures = 0
+    assert worker.run_once() == 2
+    assert broker.lag(GROUP_ID, INPUT_TOPIC) == 0
+    assert published_ids(broker) == ["0", "1"]
+    worker.close()
@@ -0,0 +1,19 @@
+import threading
+from src.services.metrics import Histogram
+
+
+def test_histogram_observations_from_many_threads_all_count():
+    histogram = Histogram("test_seconds", "Test.", (0.1, 1.0), ("stage",))
+
+    def observe():
+        for n in range(20000):
+            histogram.observe(n % 3 * 0.5, "match")
+
+    threads = [threading.Thread(target=observe) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    lines = histogram.render()
+    assert 'test_seconds_count{stage="match"} 160000' in lines
+    assert 'test_seconds_bucket{stage="match",le="+Inf"} 160000' in lines
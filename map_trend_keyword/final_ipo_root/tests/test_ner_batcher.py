@@ -0,0 +1,42 @@
+import asyncio
+import gc
+from src.services.ner_batcher import NerMicroBatcher
+
+
+def test_batches_in_flight_are_kept_and_drained():
+    sent = []
+
+    async def post_batch(payloads):
+        await asyncio.sleep(0.05)
+        gc.collect()  # An unreferenced send task would be collected here
+        sent.append(payloads)
+        return [payload * 10 for payload in payloads]
+
+    async def run():
+        batcher = NerMicroBatcher(post_batch, max_batch_size=2, max_wait_ms=1000)
+        callers = [asyncio.ensure_future(batcher.submit(n)) for n in range(5)]
+        await asyncio.sleep(0)
+        assert len(batcher._tasks) == 2  # Two full batches sending, one payload queued
+        await batcher.drain()
+        assert not batcher._tasks
+        return await asyncio.gather(*callers)
+
+    assert asyncio.run(run()) == [0, 10, 20, 30, 40]
+    assert sorted(map(len, sent)) == [1, 2, 2]
+
+
+def test_cancelled_batch_resolves_its_callers_to_none():
+    async def post_batch(payloads):
+        await asyncio.sleep(10)
+
+    async def run():
+        batcher = NerMicroBatcher(post_batch, max_batch_size=1)
+        caller = asyncio.ensure_future(batcher.submit("x"))
+        await asyncio.sleep(0)
+        for task in list(batcher._tasks):
+            task.cancel()
+        result = await caller
+        await batcher.drain()
+        return result, batcher.failed_batches
+
+    assert asyncio.run(run()) == (None, 1)
@@ -0,0 +1,76 @@
+import asyncio
+import threading
+import time
+from src.services.result_cache import DiskBackend, ResultCache
+
+
+class SlowDiskBackend(DiskBackend):
+    """Records the thread of every call and stalls like a busy disk."""
+
+    def __init__(self, path):
+        super().__init__(path)
+        self.threads = []
+
+    def get(self, key):
+        self.threads.append(threading.get_ident())
+        time.sleep(0.2)
+        return super().get(key)
+
+    def set(self, key, value, ttl):
+        self.threads.append(threading.get_ident())
+        time.sleep(0.2)
+        super().set(key, value, ttl)
+
+
+def test_disk_backend_runs_off_the_event_loop(tmp_path):
+    backend = SlowDiskBackend(str(tmp_path / "results.sqlite3"))
+    cache = ResultCache(backend, ttl=60, enabled=True)
+    computed = []
+
+    async def compute():
+        computed.append(1)
+        return {"matches": ["a"]}
+
+    async def ticker():
+        ticks = 0
+        while not done.is_set():
+            await asyncio.sleep(0.01)
+            ticks += 1
+        return ticks
+
+    async def run():
+        key = cache.make_key("text", 1)
+        ticking = asyncio.ensure_future(ticker())
+        first = await cache.get_or_compute(key, compute)
+        second = await cache.get_or_compute(key, compute)
+        done.set()
+        return first, second, await ticking
+
+    done = threading.Event()
+    loop_thread = threading.get_ident()
+    first, second, ticks = asyncio.run(run())
+    assert first == ({"matches": ["a"]}, "miss")
+    assert second == ({"matches": ["a"]}, "hit")
+    assert len(computed) == 1
+    # Three 0.2s disk calls; the loop kept running through them
+    assert ticks > 20
+    assert backend.threads and loop_thread not in backend.threads
+
+
+def test_concurrent_claims_coalesce_while_the_disk_lookup_is_pending(tmp_path):
+    cache = ResultCache(SlowDiskBackend(str(tmp_path / "results.sqlite3")), ttl=60, enabled=True)
+    computed = []
+
+    async def compute():
+        computed.append(1)
+        await asyncio.sleep(0.05)
+        return {"matches": []}
+
+    async def run():
+        key = cache.make_key("text", 1)
+        return await asyncio.gather(*(cache.get_or_compute(key, compute) for _ in range(3)))
+
+    statuses = sorted(status for _, status in asyncio.run(run()))
+    assert statuses == ["coalesced", "coalesced", "miss"]
+    assert len(computed) == 1
+    assert not cache._inflight
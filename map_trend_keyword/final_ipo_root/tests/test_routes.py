@@ -0,0 +1,77 @@
+import asyncio
+import json
+from types import SimpleNamespace
+import pytest
+from fastapi import BackgroundTasks  # type: ignore
+from src.api import routes
+from src.services.executor import ExecutorSaturated
+from src.services.result_cache import MemoryBackend, ResultCache
+
+
+class SaturatingExecutor:
+    """Runs stages inline, then reports the pool full after ``capacity`` calls."""
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+
+    async def run(self, func, *args):
+        if not self.capacity:
+            raise ExecutorSaturated("0 CPU tasks left")
+        self.capacity -= 1
+        return func(*args)
+
+
+@pytest.fixture
+def stream(monkeypatch):
+    async def iter_chunk_entities(chunks):
+        for index, _ in enumerate(chunks):
+            yield index, {"html_chunk_2": {f"company {index}": [f"company {index}"]}}
+
+    def match_article(extracted_data, snapshot_version):
+        names = extracted_data["html_chunk_2"]
+        return [{"company_code": name, "entity_name": name} for name in names], snapshot_version
+
+    cache = ResultCache(MemoryBackend(), ttl=60, enabled=True)
+    monkeypatch.setattr(routes, "result_cache", cache)
+    monkeypatch.setattr(routes, "snapshot_manager", SimpleNamespace(current=lambda: SimpleNamespace(version="v1")))
+    monkeypatch.setattr(routes, "article_chunks", lambda text: ["first", "second"])
+    monkeypatch.setattr(routes, "iter_chunk_entities", iter_chunk_entities)
+    monkeypatch.setattr(routes, "match_article", match_article)
+    monkeypatch.setattr(routes, "rerank_articles", lambda matches, texts, version=None: (matches, [[]] * len(matches)))
+
+    def run(capacity):
+        monkeypatch.setattr(routes, "cpu_executor", SaturatingExecutor(capacity))
+
+        async def collect():
+            lines = routes.stream_extraction("query", "clean text", BackgroundTasks())
+            return [json.loads(line) async for line in lines]
+
+        return asyncio.run(collect()), cache
+
+    return run
+
+
+def test_saturation_mid_stream_ends_with_an_error_line(stream):
+    # Match and rerank of the first chunk fit; the second chunk's match does not
+    lines, cache = stream(capacity=2)
+    assert [line.get("chunk") for line in lines] == [0, None]
+    assert lines[-1] == {"status": False, "error": routes.SERVER_BUSY_MESSAGE}
+    assert not cache._inflight
+
+
+def test_stream_completes_with_capacity(stream):
+    lines, cache = stream(capacity=100)
+    assert [line.get("chunk") for line in lines] == [0, 1, None]
+    assert lines[-1]["status"] is True and lines[-1]["cache"] == "miss"
+
+
+def test_client_disconnect_releases_the_cache_key(stream):
+    stream(capacity=100)  # Installs the stubs
+
+    async def disconnect_after_first_line():
+        lines = routes.stream_extraction("query", "clean text", BackgroundTasks())
+        await lines.__anext__()
+        await lines.aclose()
+        return routes.result_cache._inflight
+
+    assert asyncio.run(disconnect_after_first_line()) == {}
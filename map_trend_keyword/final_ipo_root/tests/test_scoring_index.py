@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+from src.services import scoring_index
+from src.services.scoring_index import SubstringIndex
+
+NAMES = ["tata steel", "tata motors", "jsw steel", "société générale", "steel authority", "hindalco"]
+SHORT = ["tata steel", "tata motors", "jsw", "socgen", "sail", "hindalco"]
+TICKER = ["tatasteel", "tatamotors", "jswsteel", "gle", "sail", "hindalco"]
+
+
+def expected(patterns, rows):
+    return np.array([
+        [any(pattern in field for field in (NAMES[row], SHORT[row], TICKER[row])) for row in rows]
+        for pattern in patterns
+    ], dtype=bool).reshape(len(patterns), len(rows))
+
+
+@pytest.mark.parametrize("automaton_min_patterns", [1, 1000], ids=["aho-corasick", "regex"])
+def test_matrix_matches_a_scan_per_pattern(monkeypatch, automaton_min_patterns):
+    monkeypatch.setattr(scoring_index, "AUTOMATON_MIN_PATTERNS", automaton_min_patterns)
+    index = SubstringIndex(SubstringIndex.build(NAMES, SHORT, TICKER))
+    # Nested and overlapping names, a repeat, non-ASCII text and misses
+    patterns = ["steel", "tata", "tata steel", "steel", "générale", "é", "sail", "alco", "infosys", "l a"]
+
+    assert (index.matrix(patterns) == expected(patterns, range(len(NAMES)))).all()
+    rows = np.array([1, 2, 3, 5])
+    assert (index.matrix(patterns, rows) == expected(patterns, rows)).all()
+    assert index.rows_containing("steel").tolist() == [0, 2, 4]
+
+
+def test_empty_pattern_and_empty_rows():
+    index = SubstringIndex(SubstringIndex.build(NAMES, SHORT, TICKER))
+
+    assert index.matrix(["", "jsw"]).tolist() == [[True] * 6, [False, False, True, False, False, False]]
+    assert index.matrix(["jsw"], np.array([], dtype=np.int64)).shape == (1, 0)
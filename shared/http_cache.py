@@ -0,0 +1,188 @@
+"""On-disk cache of HTTP GET responses with conditional revalidation.
+
+Client-agnostic: the caller looks a URL up, sends the returned validators
+with its own HTTP client and hands the response back. interface/ and
+map_trend_keyword/automation/ import it through a symlink to this file, so
+the Flask app and the RSS producer share one implementation and can share
+one cache file (SQLite in WAL mode, safe across processes and threads).
+Every call blocks on SQLite; async callers run them in a thread.
+
+    entry = cache.lookup(url)
+    if entry is not None and entry.fresh:
+        body = entry.body                                 # hit, no request
+    else:
+        response = get(url, headers=cache.validators(entry))
+        if response.status_code == 304:
+            body = cache.revalidated(url, response.headers, entry)
+        elif response.status_code == 200:
+            body = response.content
+            cache.store(url, response.headers, body)
+"""
+import re
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+from email.utils import parsedate_to_datetime
+
+_MAX_AGE = re.compile(r"max-age\s*=\s*(\d+)", re.I)
+
+
+class CachedResponse(namedtuple("CachedResponse", "body etag last_modified expires_at")):
+    @property
+    def fresh(self):
+        return self.expires_at > time.time()
+
+
+class HTTPCache:
+    """Responses keyed by URL, evicted least recently used beyond ``max_bytes``.
+
+    Freshness follows ``Cache-Control: max-age`` and ``Expires``. Without
+    them a response carrying an ``ETag`` or ``Last-Modified`` is revalidated
+    on every use (a cheap 304 when unchanged), and one with no validators is
+    reused for ``default_ttl`` (or the ``ttl`` given to ``store``) seconds
+    and then downloaded again.
+    ``no-store`` responses are not kept.
+    """
+
+    def __init__(self, path, max_bytes=256 * 2**20, default_ttl=300):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self.evictions = 0
+        self._local = threading.local()
+        # Guards the counters and _size, which every caller thread updates
+        self._lock = threading.Lock()
+        conn = self._conn()
+        conn.execute(
+            """CREATE TABLE IF NOT EXISTS responses (
+                url TEXT PRIMARY KEY,
+                body BLOB NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                expires_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                size INTEGER NOT NULL
+            )"""
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at)")
+        conn.commit()
+        self._size = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "not_modified": self.not_modified,
+                "evictions": self.evictions,
+                "bytes": self._size,
+            }
+
+    def lookup(self, url):
+        """The cached response of ``url``, or None; a fresh one counts as a hit."""
+        conn = self._conn()
+        row = conn.execute(
+            "SELECT body, etag, last_modified, expires_at FROM responses WHERE url = ?", (url,)
+        ).fetchone()
+        if row is None:
+            return None
+        entry = CachedResponse(*row)
+        if entry.fresh:
+            with self._lock:
+                self.hits += 1
+            conn.execute("UPDATE responses SET accessed_at = ? WHERE url = ?", (time.time(), url))
+            conn.commit()
+        return entry
+
+    def validators(self, entry):
+        """Request headers that let the server answer 304 for ``entry``."""
+        headers = {}
+        if entry is not None:
+            if entry.etag:
+                headers["If-None-Match"] = entry.etag
+            if entry.last_modified:
+                headers["If-Modified-Since"] = entry.last_modified
+        return headers
+
+    def _expires_at(self, headers, has_validators, ttl=None):
+        cache_control = headers.get("Cache-Control") or ""
+        now = time.time()
+        if "no-cache" in cache_control.lower():
+            return now
+        max_age = _MAX_AGE.search(cache_control)
+        if max_age:
+            return now + int(max_age.group(1))
+        if headers.get("Expires"):
+            try:
+                return parsedate_to_datetime(headers["Expires"]).timestamp()
+            except (TypeError, ValueError):
+                return now
+        return now if has_validators else now + (self.default_ttl if ttl is None else ttl)
+
+    def store(self, url, headers, body, ttl=None):
+        """Keep a 200 response (counted as a miss)."""
+        with self._lock:
+            self.misses += 1
+        if "no-store" in (headers.get("Cache-Control") or "").lower() or len(body) > self.max_bytes:
+            return
+        etag = headers.get("ETag")
+        last_modified = headers.get("Last-Modified")
+        expires_at = self._expires_at(headers, bool(etag or last_modified), ttl)
+        conn = self._conn()
+        old = conn.execute("SELECT size FROM responses WHERE url = ?", (url,)).fetchone()
+        conn.execute(
+            "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (url, body, etag, last_modified, expires_at, time.time(), len(body)),
+        )
+        conn.commit()
+        with self._lock:
+            self._size += len(body) - (old[0] if old else 0)
+            over = self._size > self.max_bytes
+        if over:
+            self._evict()
+
+    def revalidated(self, url, headers, entry):
+        """Record a 304 for ``entry``; returns its body."""
+        with self._lock:
+            self.not_modified += 1
+        etag = headers.get("ETag") or entry.etag
+        last_modified = headers.get("Last-Modified") or entry.last_modified
+        now = time.time()
+        conn = self._conn()
+        conn.execute(
+            "UPDATE responses SET etag = ?, last_modified = ?, expires_at = ?, accessed_at = ? WHERE url = ?",
+            (etag, last_modified, self._expires_at(headers, bool(etag or last_modified)), now, url),
+        )
+        conn.commit()
+        return entry.body
+
+    def _evict(self):
+        # Down to 90% so a full cache does not evict on every store
+        conn = self._conn()
+        with self._lock:
+            self._size = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+            target = self.max_bytes * 0.9
+            while self._size > target:
+                rows = conn.execute("SELECT url, size FROM responses ORDER BY accessed_at LIMIT 100").fetchall()
+                if not rows:
+                    break
+                for url, size in rows:
+                    conn.execute("DELETE FROM responses WHERE url = ?", (url,))
+                    self._size -= size
+                    self.evictions += 1
+                    if self._size <= target:
+                        break
+                conn.commit()